@@ -16,7 +16,7 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 from base import IInterface, ObserverCollection, Plugin, Settings, implements
-from web.base import IWebRequestHandler, WebResponseJson
+from web.base import IWebRequestHandler, WebResponse, WebResponseJson, WebResponseStream
 from board import Board
 from tellduslive.base import ITelldusLiveObserver, TelldusLive
 
@@ -25,6 +25,12 @@ from jose import jwt, JWSError, JWTError
 class IApiCallHandler(IInterface):
 	"""IInterface for plugin implementing API calls"""
 
+class ApiResponseStream(WebResponseStream):
+	"""
+	Return this from an API call to stream the response as is instead of encoding the
+	returned value as json.
+	"""
+
 class ApiManager(Plugin):
 	implements(IWebRequestHandler)
 	implements(ITelldusLiveObserver)
@@ -164,6 +170,8 @@ class ApiManager(Plugin):
 				return WebResponseJson({'error': str(error)})
 			if retval is True:
 				retval = {'status': 'success'}
+			if isinstance(retval, WebResponse):
+				return retval
 			return WebResponseJson(retval)
 		return WebResponseJson(
 			{'error': 'The method %s/%s does not exist' % (module, action)},
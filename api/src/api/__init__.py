@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-from .ApiManager import ApiManager, IApiCallHandler, apicall
+from .ApiManager import ApiManager, ApiResponseStream, IApiCallHandler, apicall
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import collections
+import heapq
+import itertools
 import logging
 try:
 	import pkg_resources
@@ -59,12 +62,13 @@ class Application(object):
 		self.running = True
 		self.exitCode = 0
 		self.shutdown = []
-		self.scheduledTasks = []
+		self.scheduledTasks = []  # Heap ordered by the next runtime
 		self.waitingMaintenanceJobs = []
 		self.maintenanceJobHandler = None
 		self.pluginContext = PluginContext()
 		self.__isJoining = False
-		self.__tasks = []
+		self.__scheduledCounter = itertools.count()
+		self.__tasks = collections.deque()
 		self.__taskLock = threading.Condition(threading.Lock())
 		signal.signal(signal.SIGINT, self.__signal)
 		signal.signal(signal.SIGTERM, self.__signal)
@@ -110,25 +114,28 @@ class Application(object):
 		:param dict kwargs: Any keyworded args to be supplied to the function. Supplied as \*\*kwargs.
 
 		.. note::
-		    The interval in which this task is run is not exact and can be delayed
-		    one minute depending on the server load.
+		    The task is run by the main thread and may be delayed if the main thread
+		    is busy with other tasks.
 		"""
 		seconds = seconds + (minutes*60) + (hours*3600) + (days*86400)
-		nextRuntime = int(time.time())
+		nextRuntime = time.time()
 		if not runAtOnce:
 			nextRuntime = nextRuntime + seconds
 		if args is None:
 			args = []
 		if kwargs is None:
 			kwargs = {}
-		self.scheduledTasks.append({
+		job = {
 			'interval': seconds,
 			'strictInterval': strictInterval,
 			'nextRuntime': nextRuntime,
 			'func': func,
 			'args': args,
 			'kwargs': kwargs,
-		})
+		}
+		with self.__taskLock:
+			self.__pushScheduledTask(job)
+			self.__taskLock.notify()
 
 	def registerShutdown(self, func):
 		"""
@@ -255,31 +262,30 @@ class Application(object):
 				Application.printBacktrace(traceback.extract_tb(exc_traceback))
 
 	def __nextTask(self):
-		self.__taskLock.acquire()
-		try:  # pylint: disable=R1702
-			while True:
-				if self.__isJoining:
-					break
+		with self.__taskLock:
+			while not self.__isJoining:
 				# Check scheduled tasks first
 				timestamp = time.time()
-				for job in self.scheduledTasks:
-					if timestamp >= job['nextRuntime']:
-						if job['strictInterval']:
-							while job['nextRuntime'] < timestamp:
-								job['nextRuntime'] = job['nextRuntime'] + job['interval']
-						else:
-							job['nextRuntime'] = timestamp + job['interval']
-						return (job['func'], job['args'], job['kwargs'])
+				if self.scheduledTasks and self.scheduledTasks[0][0] <= timestamp:
+					(__nextRuntime, __counter, job) = heapq.heappop(self.scheduledTasks)
+					if job['strictInterval']:
+						while job['nextRuntime'] <= timestamp:
+							job['nextRuntime'] = job['nextRuntime'] + job['interval']
+					else:
+						job['nextRuntime'] = timestamp + job['interval']
+					self.__pushScheduledTask(job)
+					return (job['func'], job['args'], job['kwargs'])
 				if self.__tasks:
-					# There is a task. Return
-					break
-				# Wait for new task. If no new task, timeout after 60s to check scheduled tasks
-				self.__taskLock.wait(60)
+					return self.__tasks.popleft()
+				# Wait for a new task or until the next scheduled task is due. Never wait longer than 60s
+				# so signals are still handled.
+				timeout = 60
+				if self.scheduledTasks:
+					timeout = max(0, min(timeout, self.scheduledTasks[0][0] - timestamp))
+				self.__taskLock.wait(timeout)
+			return (None, None, None)
 
-			if self.__tasks == []:
-				return (None, None, None)
-			return self.__tasks.pop(0)
-		finally:
-			self.__taskLock.release()
+	def __pushScheduledTask(self, job):
+		heapq.heappush(self.scheduledTasks, (job['nextRuntime'], next(self.__scheduledCounter), job))
 
 from .SignalManager import SignalManager  # pylint: disable=C0413
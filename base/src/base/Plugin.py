@@ -6,6 +6,7 @@ from six import add_metaclass
 class PluginContext(object):
 	def __init__(self):
 		self.components = {}
+		self.observers = {}  # Resolved observers for each interface
 
 	def request(self, name):
 		if name not in PluginMeta._plugins:
@@ -23,13 +24,17 @@ class Observers(object):
 	def __getattr__(self, name):
 		if not hasattr(self.interface, name):
 			raise AttributeError("'%s' object has no attribute '%s'" % (repr(self.interface), name))
+		methods = []
+		for o in self.observers:
+			try:
+				methods.append(getattr(o, name))
+			except:
+				continue
 		def fn(*args, **kwargs):
-			for o in self.observers:
-				try:
-					m = getattr(o, name)
-				except:
-					continue
+			for m in methods:
 				m(*args, **kwargs)
+		# Store the dispatcher so it is found without calling __getattr__ the next time
+		setattr(self, name, fn)
 		return fn
 
 	def __len__(self):
@@ -44,16 +49,24 @@ class ObserverCollection(property):
 		self.interface = interface
 
 	def extensions(self, component):
-		classes = PluginMeta._registry.get(self.interface, ())
 		if not hasattr(component, 'context'):
 			raise AttributeError("'%s' object has no attribute '%s'" % (repr(component), 'context'))
+		cache = component.context.observers
+		generation = PluginMeta._generation
+		cached = cache.get(self.interface)
+		if cached is not None and cached[0] == generation:
+			return cached[1]
+		classes = PluginMeta._registry.get(self.interface, ())
 		c = []
 		for cls in classes:
 			try:
 				c.append(cls(component.context))
 			except Exception as e:
 				logging.exception(e)
-		return Observers(self.interface, c)
+		observers = Observers(self.interface, c)
+		# Kept until the next plugin is loaded
+		cache[self.interface] = (generation, observers)
+		return observers
 
 class IInterface(object):
 	"""Base class for interfaces"""
@@ -61,9 +74,11 @@ class IInterface(object):
 class PluginMeta(type):
 	_registry = {}
 	_plugins = {}
+	_generation = 0  # Increased every time a plugin is loaded. Used to invalidate caches.
 
 	def __new__(mcs, name, bases, d):
 		newClass = type.__new__(mcs, name, bases, d)
+		PluginMeta._generation += 1
 		PluginMeta._plugins['%s.%s' % (newClass.__module__, newClass.__name__)] = newClass
 		for cls in newClass.__mro__:
 			for interface in cls.__dict__.get('_implements', []):
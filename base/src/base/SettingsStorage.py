@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from configobj import ConfigObj, ParseError
+import six
+
+from .Application import Application
+from .TimerService import TimerService
+
+class SettingsStorage(object):
+	"""
+	Storage backend for :class:`Settings`. This backend rewrites the whole configuration file on
+	every write. Writes are delayed and at most one write is done every five minutes. The writes
+	are made by the main thread, not the shared timer thread.
+	"""
+
+	def __init__(self, filename):
+		super(SettingsStorage, self).__init__()
+		self.filename = filename
+		self.config = None
+		self.lock = threading.RLock()
+		self._lastWrite = None
+		self._writeTimer = None
+
+	def load(self):
+		"""Load the configuration file. If this fails the backup is loaded instead."""
+		path = self.filename
+		try:
+			# Check existence and size of config. If size is 0 then consider is broken
+			if not os.path.isfile(path) or os.stat(path).st_size == 0:
+				raise ParseError('Empty config file')
+			self.config = ConfigObj(path)
+			return self.config
+		except ParseError as error:
+			logging.critical('Could not load settings file: %s', error)
+		# Loading failed. Try backup.
+		# Copy faulty config for later analysis
+		if os.path.isfile(path):
+			shutil.copy(path, '%s.err' % path)
+		try:
+			# Read backup
+			if not os.path.isfile('%s.bak' % path):
+				raise ParseError('No config bak file')
+			self.config = ConfigObj('%s.bak' % path)
+			self.config.filename = path
+			# Success, copy a backup of this file for later analysis
+			shutil.copy('%s.bak' % path, '%s.bak.err' % path)
+			return self.config
+		except ParseError as error:
+			logging.critical('Could not load backup settings file: %s', error)
+		# Start with empty one
+		self.config = ConfigObj()
+		self.config.filename = path
+		return self.config
+
+	def removeValue(self, section, name):
+		"""Called after a value has been removed from the configuration"""
+		del section, name
+		self._scheduleWrite()
+
+	def setValue(self, section, name, value):
+		"""Called after a value has been changed in the configuration"""
+		del section, name, value
+		self._scheduleWrite()
+
+	def shutdown(self):
+		if self._writeTimer is not None:
+			self._writeTimer.cancel()
+			self._writeTimeout()
+
+	def writeSnapshot(self):
+		"""Write the complete configuration to disk"""
+		with self.lock:
+			self._lastWrite = time.time()
+			if not self._writeConfig():
+				return
+		Application.signal('configurationWritten', self.filename)
+
+	def _scheduleWrite(self):
+		if not Application().running:
+			# Shutting down. Changes made by other shutdown handlers must be written directly since
+			# a pending timer would delay the exit.
+			if self._writeTimer is not None:
+				self._writeTimer.cancel()
+			self._writeTimeout()
+			return
+		if self._writeTimer is not None:
+			return
+		delay = 1.0 if self._lastWrite is None or (time.time() - self._lastWrite) > 300 else 300.0
+		self._writeTimer = TimerService().callLater(delay, Application().queue, self._writeTimeout)
+
+	def _writeConfig(self):
+		with open('%s.1' % self.filename, 'wb') as fd:
+			self.config.write(fd)
+			fd.flush()
+		# Create backup
+		statinfo = os.stat('%s.1' % self.filename)
+		if statinfo.st_size == 0:
+			logging.critical('Would have saved an empty file. Abort!')
+			return False
+		shutil.copy('%s.1' % self.filename, '%s.bak' % self.filename)
+		# Do not us shutils for rename. We must ensure an atomic operation here
+		os.rename('%s.1' % self.filename, self.filename)
+		return True
+
+	def _writeTimeout(self):
+		self._writeTimer = None
+		self.writeSnapshot()
+
+class SettingsJournal(SettingsStorage):
+	"""
+	Storage backend for :class:`Settings` keeping a journal of changed values next to the
+	configuration file. Each change is appended to the journal within a second, so the cost of
+	persisting a value only depends on the size of the value. The journal is merged into the
+	configuration file (compacted) when it grows too large, once an hour or at shutdown.
+
+	The ``configurationWritten`` signal is only sent when the configuration file is written, that
+	is on compaction. Observers, like the configuration backup, may see a change up to
+	:attr:`COMPACT_INTERVAL` seconds after it was made.
+
+	The configuration file keeps the same format as :class:`SettingsStorage` and an existing
+	configuration file is used as is. The backup and error files are handled the same way.
+	"""
+
+	JOURNAL_DELAY = 1.0  #: Seconds to collect changes before they are appended to the journal
+	COMPACT_INTERVAL = 3600  #: Compact the journal at least this often (in seconds) if not empty
+	COMPACT_SIZE = 262144  #: Compact the journal when it is larger than this (in bytes)
+
+	def __init__(self, filename):
+		super(SettingsJournal, self).__init__(filename)
+		self.journalFilename = '%s.journal' % filename
+		self.__pending = {}
+
+	def load(self):
+		config = super(SettingsJournal, self).load()
+		self._lastWrite = time.time()
+		self.__replay(config)
+		return config
+
+	def removeValue(self, section, name):
+		with self.lock:
+			self.__pending[(section, name)] = ()
+		self._scheduleWrite()
+
+	def setValue(self, section, name, value):
+		with self.lock:
+			self.__pending[(section, name)] = (value,)
+		self._scheduleWrite()
+
+	def shutdown(self):
+		if self._writeTimer is not None:
+			self._writeTimer.cancel()
+			self._writeTimer = None
+		if self.__pending or self.__journalSize() > 0:
+			# Leave a complete configuration file behind
+			self.writeSnapshot()
+
+	def _scheduleWrite(self):
+		if not Application().running:
+			# Shutting down, append directly
+			self.__appendPending()
+			return
+		if self._writeTimer is not None:
+			return
+		self._writeTimer = TimerService().callLater(
+			SettingsJournal.JOURNAL_DELAY, Application().queue, self._writeTimeout
+		)
+
+	def _writeConfig(self):
+		# Make sure everything in the snapshot is in the journal. If we crash before the journal is
+		# truncated replaying it will then lead to the same configuration.
+		self.__appendPending()
+		if not super(SettingsJournal, self)._writeConfig():
+			return False
+		open(self.journalFilename, 'wb').close()
+		return True
+
+	def _writeTimeout(self):
+		self._writeTimer = None
+		self.__appendPending()
+		size = self.__journalSize()
+		if size == 0:
+			return
+		if size > SettingsJournal.COMPACT_SIZE \
+		   or (time.time() - self._lastWrite) > SettingsJournal.COMPACT_INTERVAL:
+			self.writeSnapshot()
+
+	def __appendPending(self):
+		with self.lock:
+			if not self.__pending:
+				return
+			lines = []
+			for (section, name), change in self.__pending.items():
+				lines.append(json.dumps([section, name] + list(change), separators=(',', ':')))
+			self.__pending = {}
+			with open(self.journalFilename, 'ab') as fd:
+				fd.write('%s\n' % '\n'.join(lines))
+				fd.flush()
+
+	def __journalSize(self):
+		try:
+			return os.stat(self.journalFilename).st_size
+		except OSError:
+			return 0
+
+	def __replay(self, config):
+		if not os.path.isfile(self.journalFilename):
+			return
+		offset = 0
+		count = 0
+		broken = False
+		with open(self.journalFilename, 'rb') as fd:
+			for line in fd:
+				try:
+					if not line.endswith('\n'):
+						raise ValueError('Incomplete line')
+					change = [SettingsJournal.__native(x) for x in json.loads(line)]
+					section, name = change[0], change[1]
+				except (ValueError, IndexError, TypeError) as error:
+					# Most probably a partially written last line. Everything before it is still valid.
+					logging.critical('Could not replay settings journal: %s', error)
+					broken = True
+					break
+				if section not in config:
+					config[section] = {}
+				if len(change) > 2:
+					config[section][name] = change[2]
+				else:
+					config[section].pop(name, None)
+				offset = offset + len(line)
+				count = count + 1
+		if broken:
+			# Copy faulty journal for later analysis and cut off the broken part
+			shutil.copy(self.journalFilename, '%s.err' % self.journalFilename)
+			with open(self.journalFilename, 'r+b') as fd:
+				fd.truncate(offset)
+		logging.info('Replayed %i changes from the settings journal', count)
+
+	@staticmethod
+	def __native(value):
+		if six.PY2 and isinstance(value, six.text_type):
+			# Keep the same string type as when the value was set
+			return value.encode('utf-8')
+		return value
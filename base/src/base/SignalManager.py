@@ -4,7 +4,7 @@ import sys
 import types
 
 from .Application import Application
-from .Plugin import IInterface, ObserverCollection, Plugin
+from .Plugin import IInterface, ObserverCollection, Plugin, PluginMeta
 
 class ISignalObserver(IInterface):
 	"""Implement this IInterface to recieve signals using the decorator :py:func:`@slot <base.slot>`"""
@@ -24,12 +24,57 @@ class SignalManager(Plugin):
 	observers = ObserverCollection(ISignalObserver)
 	signals = {}
 
+	def __init__(self):
+		self.__index = {}
+		self.__indexGeneration = None
+
 	def sendSignal(self, msg, *args, **kwargs):
-		for observer in self.observers:
-			for func in getattr(observer, '_applicationSlots', {}).get(msg, []):
-				Application().queue(func, observer, *args, **kwargs)
-			for func in getattr(observer, '_applicationSlots', {}).get('', []):
-				Application().queue(func, observer, msg, *args, **kwargs)
+		app = Application()
+		for observer, func, sendName in self.__slotsForSignal(msg):
+			if sendName:
+				app.queue(func, observer, msg, *args, **kwargs)
+			else:
+				app.queue(func, observer, *args, **kwargs)
+
+	def sendSignals(self, signals):
+		"""
+		Send several signals at once. All slots are called by the main thread from one
+		task instead of queueing one task per slot.
+
+		:param list signals: A list of tuples with the signal name, a list of args and a
+		  dict of kwargs.
+		"""
+		calls = []
+		for msg, args, kwargs in signals:
+			for observer, func, sendName in self.__slotsForSignal(msg):
+				calls.append((func, observer, (msg,) + tuple(args) if sendName else args, kwargs))
+		if calls:
+			Application().queue(SignalManager.__callSlots, calls)
+
+	def __slotsForSignal(self, msg):
+		if self.__indexGeneration != PluginMeta._generation:  # pylint: disable=W0212
+			# Plugins has been loaded, rebuild the index
+			self.__index = {}
+			self.__indexGeneration = PluginMeta._generation  # pylint: disable=W0212
+		slots = self.__index.get(msg)
+		if slots is None:
+			slots = []
+			for observer in self.observers:
+				applicationSlots = getattr(observer, '_applicationSlots', {})
+				for func in applicationSlots.get(msg, []):
+					slots.append((observer, func, False))
+				for func in applicationSlots.get('', []):
+					slots.append((observer, func, True))
+			self.__index[msg] = slots
+		return slots
+
+	@staticmethod
+	def __callSlots(calls):
+		for func, observer, args, kwargs in calls:
+			try:
+				func(observer, *args, **kwargs)
+			except Exception as error:
+				Application.printException(error)
 
 	@staticmethod
 	def slot(message=''):
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import atexit
+import heapq
+import itertools
+import threading
+import time
+
+from .Application import Application
+
+class TimerHandle(object):
+	"""
+	A handle to a call scheduled with :func:`TimerService.callLater`.
+	"""
+	def __init__(self, deadline, func, args, kwargs):
+		self.deadline = deadline
+		self.func = func
+		self.args = args
+		self.kwargs = kwargs
+		self.cancelled = False
+		self.called = False
+
+	def active(self):
+		""":returns: True if the call has not been run or cancelled yet"""
+		return not self.cancelled and not self.called
+
+	def cancel(self):
+		"""Cancel the call. Does nothing if the call has already been run."""
+		self.cancelled = True
+
+class TimerService(object):
+	"""
+	Runs delayed calls from one shared thread. Use this instead of creating a
+	:class:`threading.Timer` for every delayed call. There is only one instance
+	of this object. The default constructor returns the instance of this object.
+
+	All calls are made in the timer thread, one at a time. Calls that may take a
+	long time must be handed over to another thread, for example using
+	:func:`Application.queue() <base.Application.queue>`.
+	"""
+	_instance = None
+
+	def __new__(cls, *args, **kwargs):
+		if not cls._instance:
+			cls._instance = super(TimerService, cls).__new__(cls, *args, **kwargs)
+			cls._instance.__initialize()
+		return cls._instance
+
+	def __initialize(self):
+		self.__timers = []  # Heap ordered by deadline
+		self.__counter = itertools.count()
+		self.__condition = threading.Condition(threading.Lock())
+		self.__running = True
+		self.__thread = None
+		atexit.register(self.__stop)
+
+	def callLater(self, delay, func, *args, **kwargs):
+		"""
+		Call a function after a delay.
+
+		:param float delay: The delay in seconds
+		:param func func: The function to be called. Any extra parameters are passed on to this.
+		:returns: a :class:`TimerHandle` that can be used to cancel the call
+		"""
+		handle = TimerHandle(time.time() + delay, func, args, kwargs)
+		with self.__condition:
+			heapq.heappush(self.__timers, (handle.deadline, next(self.__counter), handle))
+			if self.__thread is None:
+				self.__thread = threading.Thread(target=self.__run, name='Timer service')
+				self.__thread.daemon = True
+				self.__thread.start()
+			elif self.__timers[0][2] is handle:
+				# New first timer, wake up the thread
+				self.__condition.notify()
+		return handle
+
+	def __run(self):
+		while True:
+			handle = self.__nextTimer()
+			if handle is None:
+				return
+			try:
+				handle.func(*handle.args, **handle.kwargs)
+			except Exception as error:
+				Application.printException(error)
+
+	def __nextTimer(self):
+		with self.__condition:
+			while self.__running:
+				while self.__timers and self.__timers[0][2].cancelled:
+					heapq.heappop(self.__timers)
+				if not self.__timers:
+					self.__condition.wait()
+					continue
+				timeout = self.__timers[0][0] - time.time()
+				if timeout <= 0:
+					handle = heapq.heappop(self.__timers)[2]
+					handle.called = True
+					return handle
+				self.__condition.wait(timeout)
+			return None
+
+	def __stop(self):
+		with self.__condition:
+			self.__running = False
+			self.__condition.notify()
+		if self.__thread is not None:
+			self.__thread.join(1)
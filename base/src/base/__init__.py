@@ -15,3 +15,4 @@ from .Configuration import \
 from .Plugin import IInterface, Plugin, PluginContext, ObserverCollection, implements
 from .Settings import Settings
 from .SignalManager import ISignalObserver, SignalManager, signal, slot
+from .TimerService import TimerHandle, TimerService
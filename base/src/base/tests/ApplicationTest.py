@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import signal
+import sys
+import unittest
+
+from mock import MagicMock, patch
+
+from ..Application import Application
+
+class ApplicationTest(unittest.TestCase):
+	def setUp(self):
+		self.now = 1000.0
+		module = sys.modules['base.Application']
+		# A separate instance, leave the shared application untouched
+		self.patchers = [
+			patch.object(Application, '_instance', None),
+			patch.object(Application, '_initialized', False),
+			patch.object(Application, '_mainThread', None),
+			patch.object(signal, 'signal'),
+			patch.object(module, 'time', MagicMock(time=lambda: self.now)),
+		]
+		for patcher in self.patchers:
+			patcher.start()
+		self.app = Application(run=False)
+		self.nextTask = self.app._Application__nextTask  # pylint: disable=protected-access
+		self.waits = []
+
+	def tearDown(self):
+		for patcher in reversed(self.patchers):
+			patcher.stop()
+
+	def wait(self, onWait):
+		def __wait(timeout):
+			self.waits.append(timeout)
+			onWait()
+		self.app._Application__taskLock.wait = __wait  # pylint: disable=protected-access
+
+	def testQueueOrder(self):
+		for i in range(5):
+			self.app.queue(i, i)
+		self.assertEqual([self.nextTask() for __unused in range(5)], [(i, (i,), {}) for i in range(5)])
+
+	def testScheduledSameTime(self):
+		for i in range(5):
+			self.app.registerScheduledTask(i, seconds=10, runAtOnce=True)
+		self.app.queue('queued')
+		# Due scheduled tasks run first, in the order they were registered
+		tasks = [self.nextTask()[0] for __unused in range(6)]
+		self.assertEqual(tasks, [0, 1, 2, 3, 4, 'queued'])
+
+	def testWaitTimeout(self):
+		def __advance():
+			self.now += self.waits[-1]
+		self.wait(__advance)
+		self.app.registerScheduledTask('late', seconds=30)
+		self.app.registerScheduledTask('early', seconds=5)
+		# The wait ends when the next scheduled task is due
+		tasks = [self.nextTask()[0] for __unused in range(7)]
+		self.assertEqual(tasks, ['early']*5 + ['late', 'early'])
+		self.assertEqual(self.waits, [5]*6)
+
+	def testWaitTimeoutMax(self):
+		# Without scheduled tasks the wait is limited so signals are handled
+		tasks = self.app._Application__tasks  # pylint: disable=protected-access
+		self.wait(lambda: tasks.append(('queued', (), {})))
+		self.assertEqual(self.nextTask()[0], 'queued')
+		self.assertEqual(self.waits, [60])
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..Plugin import IInterface, ObserverCollection, Plugin, PluginContext, implements
+
+# run this with python -m unittest base.tests in the tellstick.sh-shell
+
+class ITestObserver(IInterface):
+	def ping(value):  # pylint: disable=E0213
+		"""Sent by :class:`Caller`"""
+
+class Caller(Plugin):
+	observers = ObserverCollection(ITestObserver)
+
+class PluginTest(unittest.TestCase):
+	def testLateObserver(self):
+		received = []
+		class First(Plugin):
+			implements(ITestObserver)
+
+			def ping(self, value):  # pylint: disable=R0201
+				received.append(('first', value))
+
+		caller = Caller(PluginContext())
+		caller.observers.ping(1)
+		caller.observers.ping(2)
+		self.assertEqual(received, [('first', 1), ('first', 2)])
+
+		class Second(Plugin):
+			implements(ITestObserver)
+
+			def ping(self, value):  # pylint: disable=R0201
+				received.append(('second', value))
+
+		del received[:]
+		caller.observers.ping(3)
+		self.assertEqual(received, [('first', 3), ('second', 3)])
+		self.assertEqual(len(caller.observers), 2)
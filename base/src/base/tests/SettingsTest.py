@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from ..Application import Application
+from ..SettingsStorage import SettingsJournal
+
+# run this with python -m unittest base.tests in the tellstick.sh-shell
+
+class SettingsJournalTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.signalPatcher = patch.object(Application, 'signal')
+		self.signalPatcher.start()
+		self.path = tempfile.mkdtemp()
+		self.filename = os.path.join(self.path, 'Telldus.conf')
+		with open(self.filename, 'w') as fd:
+			fd.write('[telldus]\nname = "old"\nkeep = 1\n')
+
+	def tearDown(self):
+		self.signalPatcher.stop()
+		shutil.rmtree(self.path)
+
+	def journal(self):
+		storage = SettingsJournal(self.filename)
+		config = storage.load()
+		return storage, config
+
+	def testReplay(self):
+		storage, config = self.journal()
+		self.assertEqual('old', config['telldus']['name'], 'Existing file was not loaded')
+		config['telldus']['name'] = 'new'
+		storage.setValue('telldus', 'name', 'new')
+		del config['telldus']['keep']
+		storage.removeValue('telldus', 'keep')
+		storage._writeTimer.cancel()  # pylint: disable=protected-access
+		storage._writeTimeout()  # pylint: disable=protected-access
+		storage, config = self.journal()
+		self.assertEqual('new', config['telldus']['name'], 'Changed value was not replayed')
+		self.assertNotIn('keep', config['telldus'], 'Removed value was not replayed')
+
+	def testBrokenJournal(self):
+		with open('%s.journal' % self.filename, 'w') as fd:
+			fd.write('["telldus","name","new"]\n["telldus","na')
+		storage, config = self.journal()
+		self.assertEqual('new', config['telldus']['name'], 'Valid part of journal was not replayed')
+		self.assertTrue(os.path.isfile('%s.journal.err' % self.filename), 'No error copy was made')
+		storage.setValue('telldus', 'other', 1)
+		storage._writeTimer.cancel()  # pylint: disable=protected-access
+		storage._writeTimeout()  # pylint: disable=protected-access
+		storage, config = self.journal()
+		self.assertEqual(1, config['telldus']['other'], 'Journal was not truncated after error')
+
+	def testWriteInMainThread(self):
+		storage, __config = self.journal()
+		storage.setValue('telldus', 'name', 'new')
+		timer = storage._writeTimer  # pylint: disable=protected-access
+		timer.cancel()
+		# The timer thread only hands the write over to the main thread
+		self.assertEqual(timer.func, Application().queue)
+		self.assertEqual(timer.args, (storage._writeTimeout,))  # pylint: disable=protected-access
+
+	def testCompact(self):
+		storage, config = self.journal()
+		config['telldus']['name'] = 'new'
+		storage.setValue('telldus', 'name', 'new')
+		storage.shutdown()
+		self.assertEqual(0, os.stat('%s.journal' % self.filename).st_size, 'Journal not compacted')
+		self.assertTrue(os.path.isfile('%s.bak' % self.filename), 'No backup was written')
+		storage, config = self.journal()
+		self.assertEqual('new', config['telldus']['name'], 'Value not written to configuration')
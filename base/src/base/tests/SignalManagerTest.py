@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from mock import patch
+
+from ..Application import Application
+from ..Plugin import Plugin, PluginContext, PluginMeta, implements
+from ..SignalManager import ISignalObserver, SignalManager, slot
+
+# run this with python -m unittest base.tests in the tellstick.sh-shell
+
+class SignalManagerTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		# Only the observers loaded by the test
+		self.registryPatcher = patch.dict(PluginMeta._registry, {ISignalObserver: []})  # pylint: disable=W0212
+		self.registryPatcher.start()
+		self.queuePatcher = patch.object(
+			Application, 'queue', side_effect=lambda func, *args, **kwargs: func(*args, **kwargs)
+		)
+		self.queuePatcher.start()
+		self.context = PluginContext()
+		self.received = []
+
+	def tearDown(self):
+		self.queuePatcher.stop()
+		self.registryPatcher.stop()
+
+	def testLoadedAfterFirstSignal(self):
+		received = self.received
+		class First(Plugin):
+			implements(ISignalObserver)
+
+			@slot('testSignal')
+			def testSignal(self, value):  # pylint: disable=R0201
+				received.append(('first', value))
+
+		manager = SignalManager(self.context)
+		manager.sendSignal('testSignal', 1)
+		self.assertEqual(received, [('first', 1)])
+
+		class Second(Plugin):
+			implements(ISignalObserver)
+
+			@slot('testSignal')
+			def testSignal(self, value):  # pylint: disable=R0201
+				received.append(('second', value))
+
+			@slot()
+			def anySignal(self, name, value):  # pylint: disable=R0201
+				received.append(('any', name, value))
+
+		del received[:]
+		manager.sendSignal('testSignal', 2)
+		self.assertEqual(received, [('first', 2), ('second', 2), ('any', 'testSignal', 2)])
+
+	def testSendSignals(self):
+		received = self.received
+		class Receiver(Plugin):
+			implements(ISignalObserver)
+
+			@slot('testSignal')
+			def testSignal(self, value):  # pylint: disable=R0201
+				received.append(value)
+
+			@slot('failingSignal')
+			def failingSignal(self):  # pylint: disable=R0201
+				raise ValueError('Failing slot')
+
+		del Receiver
+		with patch.object(Application, 'printException'):
+			SignalManager(self.context).sendSignals([
+				('testSignal', (1,), {}),
+				('failingSignal', (), {}),
+				('testSignal', (), {'value': 2}),
+				('unknownSignal', (), {}),
+			])
+		# One main thread task for the burst, a failing slot does not stop the others
+		self.assertEqual(Application.queue.call_count, 1)  # pylint: disable=E1101
+		self.assertEqual(received, [1, 2])
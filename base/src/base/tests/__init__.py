@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+
+from .ApplicationTest import ApplicationTest
+from .PluginTest import PluginTest
+from .SettingsTest import SettingsJournalTest
+from .SignalManagerTest import SignalManagerTest
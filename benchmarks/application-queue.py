@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the throughput of the main thread task queue and how late scheduled tasks are run.
+# run this with python benchmarks/application-queue.py in the tellstick.sh-shell
+
+import threading
+import time
+
+from base import Application
+
+TASKS = 100000
+THREADS = 8
+
+class Benchmark(object):
+	def __init__(self, app):
+		self.app = app
+		self.count = 0
+		self.started = None
+		self.lateness = []
+		self.expected = None
+
+	def task(self):
+		self.count = self.count + 1
+		if self.count == TASKS:
+			elapsed = time.time() - self.started
+			print('%i tasks from %i threads: %.3f s (%.0f tasks/s)' % (
+				TASKS, THREADS, elapsed, TASKS / elapsed
+			))
+			self.expected = time.time() + 1
+			self.app.registerScheduledTask(self.scheduled, seconds=1)
+
+	def scheduled(self):
+		self.lateness.append(time.time() - self.expected)
+		self.expected = self.expected + 1
+		if len(self.lateness) == 5:
+			print('Scheduled task lateness: max %.1f ms' % (max(self.lateness) * 1000))
+			self.app.quit()
+
+	def worker(self):
+		for __i in range(TASKS // THREADS):
+			self.app.queue(self.task)
+
+	def start(self):
+		self.started = time.time()
+		for __i in range(THREADS):
+			threading.Thread(target=self.worker).start()
+
+def main():
+	app = Application(run=False)
+	benchmark = Benchmark(app)
+	app.queue(benchmark.start)
+	try:
+		app.run(startup=[])
+	except SystemExit:
+		pass
+
+if __name__ == '__main__':
+	main()
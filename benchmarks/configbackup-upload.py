@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures time and peak memory for preparing the configuration backup upload, for the old
+# in memory implementation and the streaming ConfigBackup. The request body is consumed
+# locally instead of being sent.
+# run this with python benchmarks/configbackup-upload.py in the tellstick.sh-shell
+
+import bz2
+import os
+import resource
+import shutil
+from StringIO import StringIO
+import struct
+import sys
+import tempfile
+import time
+
+from Crypto.Cipher import AES
+from pbkdf2 import PBKDF2
+
+from tellduslive.base.ConfigBackup import ConfigBackup
+
+PASSWORD = 'secret'
+
+def inMemory(path):
+	# The implementation before ConfigBackup
+	with open(path, 'rb') as fd:
+		payload = bz2.compress(fd.read())
+	iv = os.urandom(16)  # pylint: disable=C0103
+	encryptor = AES.new(PBKDF2(PASSWORD, iv).read(32), AES.MODE_CBC, iv)
+	buff = StringIO()
+	buff.write(struct.pack('<Q', len(payload)))
+	buff.write(iv)
+	if len(payload) % 16 != 0:
+		payload += ' ' * (16 - len(payload) % 16)
+	buff.write(encryptor.encrypt(payload))
+	return len(buff.getvalue())
+
+def streaming(path, iv=None):  # pylint: disable=C0103
+	with open(path, 'rb') as fd:
+		ConfigBackup.contentHash(fd)
+		fd.seek(0)
+		compressed = ConfigBackup.compress(fd)
+	with compressed:
+		length = compressed.tell()
+		compressed.seek(0)
+		chunks = ConfigBackup.multipart('boundary', '000000000000', ConfigBackup.encrypt(
+			compressed, length, PASSWORD, iv or os.urandom(16)
+		))
+		return sum(len(chunk) for chunk in chunks)
+
+def retry(path):
+	# Same content again, the IV and the derived key are reused
+	return streaming(path, iv=b'0' * 16)
+
+def peakRss():
+	# Kilobytes on Linux
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def measure(func, path):
+	# Run in a child process since the peak cannot be reset
+	read, write = os.pipe()
+	pid = os.fork()
+	if pid == 0:
+		os.close(read)
+		if func is retry:
+			retry(path)
+		before = peakRss()
+		began = time.time()
+		func(path)
+		os.write(write, '%f %i' % ((time.time() - began) * 1000, peakRss() - before))
+		os._exit(0)  # pylint: disable=protected-access
+	os.close(write)
+	result = os.read(read, 100)
+	os.close(read)
+	os.waitpid(pid, 0)
+	(elapsed, memory) = result.split()
+	return float(elapsed), int(memory)
+
+def main():
+	directory = tempfile.mkdtemp()
+	path = os.path.join(directory, 'Telldus.conf')
+	print('%10s %20s %20s %20s' % ('config', 'in memory ms/kB', 'streaming ms/kB', 'retry ms/kB'))
+	try:
+		for size in (100, 1000, 10000):
+			with open(path, 'w') as fd:
+				for i in range(size * 1024 // 64):
+					fd.write('[[device%i]]\nname = "Device %i"\nstate = %i\n' % (i, i, i % 3))
+			results = [measure(func, path) for func in (inMemory, streaming, retry)]
+			print('%7i kB %s' % (size, ' '.join('%11.1f %8i' % result for result in results)))
+			sys.stdout.flush()
+	finally:
+		shutil.rmtree(directory)
+
+if __name__ == '__main__':
+	main()
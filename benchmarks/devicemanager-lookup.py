@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures device lookups in DeviceManager and RF433 with 1k and 10k devices and compares
+# them with scanning the device lists.
+# run this with python benchmarks/devicemanager-lookup.py in the tellstick.sh-shell
+
+import random
+import sys
+import timeit
+
+from mock import MagicMock, patch
+
+from base import Application, PluginContext
+from telldus import DeviceManager, Sensor
+from rf433.CommandMatcher import CommandMatcher
+from rf433.RF433 import DeviceNode, RF433, SensorNode
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class BenchmarkSensor(Sensor):
+	def __init__(self, localId):
+		super(BenchmarkSensor, self).__init__()
+		self._localId = localId
+
+	def localId(self):
+		return self._localId
+
+	def typeString(self):
+		return 'benchmark%i' % (self._localId % 10)
+
+def createManager(count):
+	module = sys.modules['telldus.DeviceManager']
+	with patch.object(module, 'Settings', MemorySettings), patch.object(module, 'TelldusLive'):
+		manager = DeviceManager(PluginContext())
+	for i in range(count):
+		sensor = BenchmarkSensor(i)
+		sensor.setName('Sensor %i' % i)
+		manager.addDevice(sensor)
+	return manager
+
+def createRF433(count):
+	rf433 = object.__new__(RF433)
+	rf433.devices = []
+	rf433.sensors = []
+	rf433.sensorIndex = {}
+	rf433.matcher = CommandMatcher()
+	rf433.rawEnabled = False
+	rf433.deviceManager = MagicMock()
+	for i in range(count):
+		device = DeviceNode(None, rf433.matcher)
+		device.setParams({
+			'protocol': 'arctech',
+			'model': 'selflearning-switch',
+			'protocolParams': {'house': str(1000 + i), 'unit': str(i % 16 + 1)},
+		})
+		device.setState = MagicMock()
+		rf433.devices.append(device)
+		sensor = SensorNode()
+		sensor.setParams({'protocol': 'fineoffset', 'model': 'temperature', 'sensorId': i})
+		rf433.sensors.append(sensor)
+		rf433.sensorIndex[sensor.key()] = sensor
+	return rf433
+
+def scanDevice(manager, deviceId):
+	for device in manager.devices:
+		if device.id() == deviceId:
+			return device
+	return None
+
+def scanSensor(rf433, key):
+	for sensor in rf433.sensors:
+		if sensor.compare(*key):
+			return sensor
+	return None
+
+def report(name, count, indexed, scanned, number):
+	print('%-32s %6i %12.2f %12.2f' % (name, count, indexed * 1e6 / number, scanned * 1e6 / number))
+
+def main():
+	Application(run=False)
+	print('%-32s %6s %12s %12s' % ('lookup', 'count', 'index (us)', 'scan (us)'))
+	for count in (1000, 10000):
+		manager = createManager(count)
+		ids = [random.randint(1, count) for _ in range(1000)]
+		number = len(ids)
+		report(
+			'DeviceManager.device()', count,
+			timeit.timeit(lambda: [manager.device(x) for x in ids], number=1),
+			timeit.timeit(lambda: [scanDevice(manager, x) for x in ids], number=1),
+			number
+		)
+		names = ['Sensor %i' % (x - 1) for x in ids]
+		report(
+			'DeviceManager.findByName()', count,
+			timeit.timeit(lambda: [manager.findByName(x) for x in names], number=1),
+			timeit.timeit(lambda: [[d for d in manager.devices if d.name() == x][0] for x in names], number=1),
+			number
+		)
+		report(
+			'DeviceManager.retrieveDevices()', count,
+			timeit.timeit(lambda: manager.retrieveDevices('benchmark3'), number=100),
+			timeit.timeit(lambda: [d for d in manager.devices if d.typeString() == 'benchmark3'], number=100),
+			100
+		)
+
+		rf433 = createRF433(count)
+		messages = [{
+			'protocol': 'arctech',
+			'model': 'selflearning',
+			'method': 1,
+			'house': str(1000 + x),
+			'unit': str(x % 16 + 1),
+			'group': '0',
+		} for x in ids]
+		# The scan is the old implementation without any index
+		def scanCommand(msg):
+			for device in rf433.devices:
+				params = device.params()['protocolParams']
+				if params['house'] == msg['house'] and params['unit'] == msg['unit']:
+					device.setState(msg['method'], None)
+		report(
+			'RF433.decodeCommandData()', count,
+			timeit.timeit(lambda: [rf433.decodeCommandData(x) for x in messages], number=1),
+			timeit.timeit(lambda: [scanCommand(x) for x in messages], number=1),
+			number
+		)
+		keys = [('fineoffset', 'temperature', x) for x in ids]
+		report(
+			'RF433 sensor lookup', count,
+			timeit.timeit(lambda: [rf433.sensorIndex.get(x) for x in keys], number=1),
+			timeit.timeit(lambda: [scanSensor(rf433, x) for x in keys], number=1),
+			number
+		)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the work done by DeviceManager when Live! registers, for 200 and 1000 devices and
+# sensors: the first report, a reconnect to a server without delta reports and a reconnect
+# to a server that has acknowledged the previous reports.
+# run this with python benchmarks/devicemanager-report.py in the tellstick.sh-shell
+
+import sys
+import time
+
+from mock import MagicMock, patch
+
+from base import Application, PluginContext
+from telldus import Device, DeviceManager, Sensor
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class BenchmarkDevice(Device):
+	def __init__(self, localId):
+		super(BenchmarkDevice, self).__init__()
+		self._localId = localId
+
+	def localId(self):
+		return self._localId
+
+	def methods(self):
+		return Device.TURNON | Device.TURNOFF | Device.DIM
+
+	def parameters(self):
+		return {
+			'protocol': 'arctech',
+			'model': 'selflearning-dimmer',
+			'house': str(1000 + self._localId),
+			'unit': str(self._localId % 16 + 1),
+			'group': '0',
+		}
+
+	def typeString(self):
+		return 'benchmark'
+
+class BenchmarkSensor(Sensor):
+	def __init__(self, localId):
+		super(BenchmarkSensor, self).__init__()
+		self._localId = localId
+
+	def localId(self):
+		return self._localId
+
+	def typeString(self):
+		return 'benchmarksensor'
+
+def createManager(count):
+	module = sys.modules['telldus.DeviceManager']
+	with patch.object(module, 'Settings', MemorySettings), patch.object(module, 'TelldusLive'):
+		manager = DeviceManager(PluginContext())
+	manager.live.registered = False
+	for i in range(count):
+		device = BenchmarkDevice(i)
+		device.setName('Device %i' % i)
+		device.setMetadata('icon', 'lamp')
+		manager.addDevice(device)
+		sensor = BenchmarkSensor(i)
+		sensor.setName('Sensor %i' % i)
+		manager.addDevice(sensor)
+		sensor.setSensorValues([
+			{'type': Device.TEMPERATURE, 'value': 20 + i % 10, 'scale': 0},
+			{'type': Device.HUMIDITY, 'value': 40 + i % 20, 'scale': 0},
+		])
+	manager.live.registered = True
+	return manager
+
+def register(manager, deltaReport):
+	manager.live.send = MagicMock()
+	began = time.time()
+	manager.liveRegistered({'deltaReport': deltaReport} if deltaReport is not None else {}, False)
+	# The signing is done in the connection thread, but encoding is included
+	size = sum(len(call[0][0].toByteArray()) for call in manager.live.send.call_args_list)
+	elapsed = time.time() - began
+	return (manager.live.send.call_args_list, elapsed, size)
+
+def acknowledge(manager, sent):
+	for call in sent:
+		msg = call[0][0]
+		header = msg.argument(1).toNative()
+		if not isinstance(header, dict) or 'session' not in header:
+			continue
+		ack = MagicMock()
+		ack.argument.return_value.toNative.return_value = {
+			'report': 'devices' if msg.name().startswith('devices') else 'sensors',
+			'session': header['session'],
+			'version': header['version'],
+		}
+		manager._DeviceManager__handleReportAck(ack)  # pylint: disable=protected-access
+
+def main():
+	Application(run=False)
+	print('%-34s %10s %10s' % ('', 'ms', 'bytes'))
+	for count in (200, 1000):
+		manager = createManager(count)
+		print('%i devices and %i sensors' % (count, count))
+		__sent, elapsed, size = register(manager, None)
+		print('  %-32s %10.1f %10i' % ('first report', elapsed * 1000, size))
+		__sent, elapsed, size = register(manager, None)
+		print('  %-32s %10.1f %10i' % ('reconnect, full reports', elapsed * 1000, size))
+		sent, elapsed, size = register(manager, {})
+		print('  %-32s %10.1f %10i' % ('reconnect, delta supported', elapsed * 1000, size))
+		acknowledge(manager, sent)
+		devicesReport = manager._DeviceManager__devicesReport  # pylint: disable=protected-access
+		sensorsReport = manager._DeviceManager__sensorsReport  # pylint: disable=protected-access
+		acknowledged = {
+			'devices': {'session': devicesReport.session, 'version': devicesReport.acknowledged},
+			'sensors': {'session': sensorsReport.session, 'version': sensorsReport.acknowledged},
+		}
+		__sent, elapsed, size = register(manager, acknowledged)
+		print('  %-32s %10.1f %10i' % ('reconnect, nothing changed', elapsed * 1000, size))
+		for device in manager.devices[:count // 50]:
+			device.setState(Device.TURNON)
+		__sent, elapsed, size = register(manager, acknowledged)
+		print('  %-32s %10.1f %10i' % ('reconnect, 1% changed', elapsed * 1000, size))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the cost of persisting the devices in DeviceManager versus the number of devices.
+# run this with python benchmarks/devicemanager-save.py in the tellstick.sh-shell
+
+import sys
+import timeit
+
+from mock import patch
+
+from base import Application, PluginContext
+from telldus import DeviceManager, Sensor
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class BenchmarkSensor(Sensor):
+	def __init__(self, localId):
+		super(BenchmarkSensor, self).__init__()
+		self._localId = localId
+
+	def localId(self):
+		return self._localId
+
+	def params(self):
+		return {'protocol': 'fineoffset', 'model': 'temperaturehumidity', 'sensorId': self._localId}
+
+	def typeString(self):
+		return '433'
+
+def createManager(count):
+	module = sys.modules['telldus.DeviceManager']
+	with patch.object(module, 'Settings', MemorySettings), patch.object(module, 'TelldusLive'):
+		manager = DeviceManager(PluginContext())
+	for i in range(count):
+		sensor = BenchmarkSensor(i)
+		sensor.setId(i + 1)
+		sensor._sensorValues = {  # pylint: disable=protected-access
+			1: [{'value': '21.5', 'scale': 0, 'lastUpdated': 1500000000}],
+			2: [{'value': '45', 'scale': 0, 'lastUpdated': 1500000000}],
+		}
+		sensor.setManager(manager)
+		manager.devices.append(sensor)
+	return manager
+
+def main():
+	Application(run=False)
+	print('%8s %14s %14s' % ('devices', 'full (ms)', 'one dirty (ms)'))
+	for count in (10, 100, 500, 1000, 5000):
+		manager = createManager(count)
+		flush = manager._DeviceManager__flush  # pylint: disable=protected-access
+		sensor = manager.devices[count // 2]
+		def saveAll():
+			manager.save()
+			flush()
+		def saveOne():
+			manager.save(sensor)
+			flush()
+		saveAll()  # Prime the cache
+		number = max(5, 5000 // count)
+		full = min(timeit.repeat(saveAll, number=number, repeat=3)) / number
+		incremental = min(timeit.repeat(saveOne, number=number, repeat=3)) / number
+		print('%8i %14.3f %14.3f' % (count, full * 1000, incremental * 1000))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Receives signed messages from a local stand-in for the Live! server through
+# ServerConnection. The server writes the stream in random chunks, with several messages per
+# write and messages split over writes, padding and messages with bad signatures. Every
+# message must be received intact and in order.
+# run this with python benchmarks/liveconnection-loopback.py in the tellstick.sh-shell
+
+import logging
+import random
+import socket
+import threading
+import time
+
+from base import Application
+from tellduslive.base import LiveMessage
+from tellduslive.base.ServerConnection import ServerConnection
+
+PRIVATE_KEY = 'secret'
+
+def createStream(rand, count, maxSize):
+	stream = []
+	for i in range(count):
+		msg = LiveMessage('command')
+		msg.append({'ACK': i, 'data': 'x' * rand.randint(0, maxSize)})
+		signed = msg.toSignedMessage('sha1', PRIVATE_KEY)
+		if rand.randint(0, 20) == 0:
+			# A message that must be dropped
+			stream.append(msg.toSignedMessage('sha1', 'wrong'))
+		if rand.randint(0, 20) == 0:
+			signed = signed + '='
+		stream.append(signed)
+	return ''.join(stream)
+
+def serve(server, stream, seed):
+	rand = random.Random(seed)
+	conn, __address = server.accept()
+	start = 0
+	while start < len(stream):
+		end = start + rand.choice([1, 100, 1500, 16384, 65536, 300000])
+		conn.sendall(stream[start:end])
+		start = end
+	# Let the client close the connection
+	conn.recv(1)
+	conn.close()
+
+def run(count, maxSize, seed):
+	rand = random.Random(seed)
+	stream = createStream(rand, count, maxSize)
+	server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+	server.bind(('127.0.0.1', 0))
+	server.listen(1)
+	thread = threading.Thread(target=serve, args=(server, stream, seed))
+	thread.start()
+
+	conn = ServerConnection()
+	conn.useSSL = False
+	conn.privateKey = PRIVATE_KEY
+	# connect() adds 2 to the port for unencrypted connections
+	conn.connect('127.0.0.1', server.getsockname()[1] - 2)
+	began = time.time()
+	received = 0
+	while received < count:
+		state = conn.process()
+		if state == ServerConnection.DISCONNECTED:
+			raise Exception('Disconnected after %i messages' % received)
+		msg = conn.popMessage()
+		while msg is not None:
+			ack = msg.argument(0).dictVal['ACK'].intVal
+			if ack != received:
+				raise Exception('Expected message %i, got %i' % (received, ack))
+			received = received + 1
+			msg = conn.popMessage()
+	elapsed = time.time() - began
+	conn.close()
+	thread.join()
+	server.close()
+	print('%8i %10i %12.1f %10.1f' % (
+		count, maxSize, count / elapsed, len(stream) / elapsed / 1024 / 1024
+	))
+
+def main():
+	Application(run=False)
+	# The messages with bad signatures are logged
+	logging.getLogger().setLevel(logging.ERROR)
+	print('%8s %10s %12s %10s' % ('messages', 'max size', 'messages/s', 'MB/s'))
+	for seed, (count, maxSize) in enumerate([(5000, 100), (2000, 5000), (200, 200000)]):
+		run(count, maxSize, seed)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the latency of the Live! connection against a local fake server: the round trip
+# from a command to its ACK and the time to register again after the server drops the
+# connection.
+# run this with python benchmarks/livelink-latency.py in the tellstick.sh-shell
+
+import logging
+import time
+
+from mock import patch
+
+from base import Application, PluginContext
+from board import Board
+from tellduslive.base import LiveMessage, TelldusLive
+from tellduslive.tests.FakeLiveServer import FakeLiveServer
+
+COMMANDS = 1000
+RECONNECTS = 5
+
+def percentile(values, fraction):
+	values = sorted(values)
+	return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main():
+	Application(run=False)
+	logging.getLogger().setLevel(logging.ERROR)
+	server = FakeLiveServer('secret')
+	with patch.object(Board, 'firmwareVersion', return_value='1.0'), \
+	     patch.object(TelldusLive, 'RECONNECT_MIN', 0.1):
+		live = TelldusLive(PluginContext())
+		live.conn.useSSL = False
+		live.conn.publicKey = 'public'
+		live.conn.privateKey = 'secret'
+		live.serverList.popServer = server.address
+		live.thread.start()
+		server.receive('Register')
+
+		latencies = []
+		for i in range(COMMANDS):
+			msg = LiveMessage('command')
+			msg.append({'ACK': i})
+			began = time.time()
+			server.send(msg)
+			server.receive('ACK')
+			latencies.append(time.time() - began)
+		print('command -> ACK, %i commands' % COMMANDS)
+		print('  p50 %8.3f ms' % (percentile(latencies, 0.5) * 1000))
+		print('  p99 %8.3f ms' % (percentile(latencies, 0.99) * 1000))
+
+		reconnects = []
+		for _ in range(RECONNECTS):
+			began = time.time()
+			server.disconnect()
+			server.receive('Register', timeout=30)
+			reconnects.append(time.time() - began)
+			live.reconnectAttempts = 0
+		print('server disconnect -> Register, %i times' % RECONNECTS)
+		print('  avg %8.3f s (backoff from %.1f s)' % (
+			sum(reconnects) / len(reconnects), TelldusLive.RECONNECT_MIN
+		))
+
+		began = time.time()
+		live.stop()
+		live.thread.join()
+		print('stop %8.3f ms' % ((time.time() - began) * 1000))
+	server.close()
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures encoding and decoding of large Live! messages, like the DevicesReport and
+# SensorsReport sent for 1k devices/sensors.
+# run this with python benchmarks/livemessage-codec.py in the tellstick.sh-shell
+
+import hashlib
+import timeit
+import uuid
+
+from tellduslive.base import LiveMessage
+
+def devicesReport(count):
+	lst = []
+	for i in range(count):
+		lst.append({
+			'id': i + 1,
+			'uuid': str(uuid.uuid4()),
+			'name': u'Device nr %i åäö' % i,
+			'methods': 19,
+			'state': 2,
+			'stateValue': '',
+			'stateValues': {},
+			'protocol': 'arctech',
+			'model': 'selflearning-switch',
+			'parametersHash': hashlib.sha1(str(i)).hexdigest(),
+			'metadataHash': hashlib.sha1(str(-i)).hexdigest(),
+			'transport': '433',
+			'ignored': False,
+		})
+	return lst
+
+def sensorsReport(count):
+	lst = []
+	for i in range(count):
+		lst.append([{
+			'name': 'Sensor %i' % i,
+			'protocol': 'fineoffset',
+			'model': 'temperaturehumidity',
+			'sensor_id': i + 1,
+			'channelId': i % 256,
+			'battery': 254,
+		}, [
+			{'type': 1, 'lastUp': '1500000000', 'value': '21.5', 'scale': 0},
+			{'type': 2, 'lastUp': '1500000000', 'value': '45', 'scale': 0},
+		]])
+	return lst
+
+def measure(name, func, number):
+	elapsed = min(timeit.repeat(func, number=number, repeat=3)) / number
+	print('  %-24s %10.2f ms' % (name, elapsed * 1000))
+
+def benchmark(name, data, number):
+	print('%s (%i bytes)' % (name, len(build(name, data).toByteArray())))
+	msg = build(name, data)
+	raw = msg.toByteArray()
+	signed = msg.toSignedMessage('sha1', 'secret')
+	measure('build', lambda: build(name, data), number)
+	measure('encode', msg.toByteArray, number)
+	measure('build+sign', lambda: build(name, data).toSignedMessage('sha1', 'secret'), number)
+	measure('decode', lambda: LiveMessage.fromByteArray(raw), number)
+	measure('decode+toNative', lambda: LiveMessage.fromByteArray(raw).argument(0).toNative(), number)
+	def receive():
+		msg = LiveMessage.fromSignedMessage(signed, 'sha1', 'secret')
+		if msg is None:
+			raise Exception('Signature mismatch')
+		return msg.argument(0).toNative()
+	measure('receive signed', receive, number)
+	measure('receive signed, name', lambda: LiveMessage.fromSignedMessage(signed, 'sha1', 'secret').name(), number)
+
+def build(name, data):
+	msg = LiveMessage(name)
+	msg.append(data)
+	return msg
+
+def main():
+	for count in (100, 1000):
+		benchmark('DevicesReport', devicesReport(count), 10)
+		benchmark('SensorsReport', sensorsReport(count), 10)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures bytes on the wire and CPU time in the connection thread for the device and sensor
+# reports of 200 and 1000 devices, with and without the negotiated zlib compression.
+# run this with python benchmarks/livemessage-compression.py in the tellstick.sh-shell
+
+import imp
+import os
+import time
+
+from mock import MagicMock
+
+from base import Application
+from tellduslive.base.ServerConnection import ServerConnection
+
+ROUNDS = 20
+
+def loadReportBenchmark():
+	path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'devicemanager-report.py')
+	return imp.load_source('devicemanagerreport', path)
+
+def reports(count):
+	manager = loadReportBenchmark().createManager(count)
+	manager.live.send = MagicMock()
+	manager.liveRegistered({}, False)
+	return [call[0][0] for call in manager.live.send.call_args_list]
+
+def measure(conn, msg):
+	began = time.clock()
+	for _ in range(ROUNDS):
+		size = len(conn.signedMessage(msg))
+	return (size, (time.clock() - began) * 1000 / ROUNDS)
+
+def main():
+	Application(run=False)
+	conn = ServerConnection()
+	conn.privateKey = 'secret'
+	print('%-20s %10s %10s %10s %10s' % ('', 'bytes', 'ms', 'zlib bytes', 'zlib ms'))
+	for count in (200, 1000):
+		print('%i devices and %i sensors' % (count, count))
+		for msg in reports(count):
+			conn.compression = None
+			plainSize, plainTime = measure(conn, msg)
+			conn.compression = 'zlib'
+			size, elapsed = measure(conn, msg)
+			print('  %-18s %10i %10.2f %10i %10.2f' % (msg.name(), plainSize, plainTime, size, elapsed))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the peak memory used while building and signing a full SensorsReport, with and
+# without creating intermediate LiveMessageToken objects for the report.
+# run this with python benchmarks/livemessage-memory.py in the tellstick.sh-shell
+
+import os
+import resource
+import sys
+
+from tellduslive.base import LiveMessage
+from tellduslive.base.LiveMessageToken import LiveMessageToken
+
+VALUE_TYPES = (1, 2, 4, 64)
+
+def sensorsReport(count):
+	# Same layout as DeviceManager.__sendSensorReport()
+	lst = []
+	for i in range(count):
+		lst.append([{
+			'name': 'Sensor %i' % i,
+			'protocol': 'fineoffset',
+			'model': 'temperaturehumidity',
+			'sensor_id': i + 1,
+			'channelId': i % 256,
+			'battery': 254,
+		}, [{
+			'type': valueType,
+			'lastUp': str(1500000000 + i),
+			'value': str(20.5 + i % 10),
+			'scale': 0,
+		} for valueType in VALUE_TYPES]])
+	return lst
+
+def withTokens(lst):
+	token = LiveMessageToken(lst)
+	message = LiveMessageToken('SensorsReport').toByteArray() + token.toByteArray()
+	envelope = LiveMessage(LiveMessage.signatureForMessage(message, 'sha1', 'secret'))
+	envelope.append(message)
+	return envelope.toByteArray()
+
+def direct(lst):
+	msg = LiveMessage('SensorsReport')
+	msg.append(lst)
+	return msg.toSignedMessage('sha1', 'secret')
+
+def peakRss():
+	# Kilobytes on Linux
+	return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def measure(func, count):
+	# Run in a child process since the peak cannot be reset
+	read, write = os.pipe()
+	pid = os.fork()
+	if pid == 0:
+		os.close(read)
+		lst = sensorsReport(count)
+		before = peakRss()
+		func(lst)
+		os.write(write, str(peakRss() - before))
+		os._exit(0)  # pylint: disable=protected-access
+	os.close(write)
+	result = os.read(read, 100)
+	os.close(read)
+	os.waitpid(pid, 0)
+	return int(result)
+
+def main():
+	print('%8s %14s %14s' % ('sensors', 'tokens (kB)', 'direct (kB)'))
+	for count in (300, 1000, 3000):
+		print('%8i %14i %14i' % (count, measure(withTokens, count), measure(direct, count)))
+		sys.stdout.flush()
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures how long an interactive command waits when a scene has just queued commands for
+# 30 devices, repeated by an event. The TellStick is simulated on a pty and answers every
+# command after a fixed airtime.
+# run this with python benchmarks/rf433-command-queue.py in the tellstick.sh-shell
+
+import os
+import threading
+import time
+import tty
+
+from mock import MagicMock, patch
+
+from base import Application
+from rf433.Adapter import Adapter
+from rf433.RF433Msg import RF433Msg
+
+DEVICES = 30
+AIRTIME = 0.05  # Seconds the simulated TellStick needs for every command
+
+def tellstick(master, running):
+	buffer = ''
+	while running.is_set():
+		buffer = buffer + os.read(master, 1024)
+		while '+' in buffer:
+			command, buffer = buffer.split('+', 1)
+			time.sleep(AIRTIME)
+			os.write(master, '+%s\r\n' % command[0])
+
+def run(adapter, priorities):
+	while adapter.dev is None:
+		time.sleep(0.1)
+	began = time.time()
+	for __repeat in range(2):
+		for i in range(DEVICES):
+			adapter.queue(RF433Msg(
+				'S', 'device%i' % i, priority=RF433Msg.LOW if priorities else RF433Msg.NORMAL,
+				key=i if priorities else None
+			))
+	interactive = threading.Event()
+	adapter.queue(RF433Msg(
+		'S', 'interactive', success=lambda __params: interactive.set(),
+		priority=RF433Msg.HIGH if priorities else RF433Msg.NORMAL
+	))
+	interactive.wait()
+	latency = time.time() - began
+	while len(adapter.commandQueue) or adapter._Adapter__waitForResponse:  # pylint: disable=W0212
+		time.sleep(AIRTIME)
+	return latency, adapter.commandQueue.statistics()
+
+def main():
+	Application(run=False)
+	print('%-16s %12s %8s %10s %12s' % ('', 'interactive', 'sent', 'collapsed', 'airtime avg'))
+	for name, priorities in (('fifo', False), ('priority queue', True)):
+		master, slave = os.openpty()
+		tty.setraw(master)
+		running = threading.Event()
+		running.set()
+		thread = threading.Thread(target=tellstick, args=(master, running))
+		thread.daemon = True
+		thread.start()
+		with patch.object(Application, 'queue', lambda __self, func, *args: func(*args)):
+			adapter = Adapter(MagicMock(), os.ttyname(slave))
+			latency, statistics = run(adapter, priorities)
+			adapter._Adapter__stop()  # pylint: disable=W0212
+			adapter.join()
+		running.clear()
+		print('%-16s %10.2f s %8i %10i %10.3f s' % (
+			name, latency, statistics['sent'], statistics['collapsed'], statistics['airtimeAvg']
+		))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the time for DeviceNode to encode and queue a command with every protocol.
+# "uncached" resets the device parameters before every command, a new protocol object is
+# created and the command encoded every time like before. "cached" repeats the command.
+# run this with python benchmarks/rf433-protocol-encode.py in the tellstick.sh-shell
+
+import timeit
+
+from base import Application
+from telldus import Device
+from rf433.RF433 import DeviceNode
+
+ROUNDS = 2000
+
+DEVICES = [
+	('arctech', 'codeswitch', {'house': 'C', 'unit': '3'}, Device.TURNON, None),
+	('arctech', 'selflearning-dimmer', {'house': '12345', 'unit': '2'}, Device.DIM, 128),
+	('brateck', '', {'house': '01-1-01-'}, Device.UP, None),
+	('comen', 'selflearning-switch', {'house': '99', 'unit': '1'}, Device.TURNOFF, None),
+	('everflourish', 'selflearning', {'house': '1234', 'unit': '2'}, Device.TURNON, None),
+	('fuhaote', 'codeswitch', {'code': '0101011100'}, Device.TURNOFF, None),
+	('hasta', 'selflearning', {'house': '4660', 'unit': '2'}, Device.DOWN, None),
+	('hasta', 'selflearningv2', {'house': '4660', 'unit': '2'}, Device.DOWN, None),
+	('ikea', 'selflearning', {'system': '2', 'units': '1,3', 'fade': 'true'}, Device.DIM, 100),
+	('kangtai', 'selflearning', {'house': '4660', 'unit': '3'}, Device.TURNON, None),
+	('kangtai', 'selflearning-dimmer', {'house': '4660', 'unit': '3'}, Device.DIM, 200),
+	('risingsun', 'selflearning', {'house': '12345', 'unit': '3'}, Device.TURNON, None),
+	('risingsun', 'codeswitch', {'house': '2', 'unit': '3'}, Device.TURNON, None),
+	('sartano', 'codeswitch', {'code': '0101010101'}, Device.TURNOFF, None),
+	('silvanchip', 'kp100', {'house': '123'}, Device.UP, None),
+	('silvanchip', 'ecosavers', {'house': '123', 'unit': '2'}, Device.TURNON, None),
+	('silvanchip', 'selflearning', {'house': '123'}, Device.TURNON, None),
+	('upm', 'selflearning', {'house': '2049', 'unit': '3'}, Device.TURNON, None),
+	('waveman', 'codeswitch', {'house': 'B', 'unit': '4'}, Device.TURNOFF, None),
+	('x10', 'codeswitch', {'house': 'H', 'unit': '9'}, Device.TURNON, None),
+	('yidong', 'selflearning', {'unit': '3'}, Device.TURNON, None),
+]
+
+class Controller(object):
+	def queue(self, msg):
+		pass
+
+def main():
+	Application(run=False)
+	controller = Controller()
+	print('%-34s %12s %12s' % ('', 'uncached us', 'cached us'))
+	totals = [0.0, 0.0]
+	for (protocol, model, params, method, level) in DEVICES:
+		device = DeviceNode(controller)
+		settings = {'protocol': protocol, 'model': model, 'protocolParams': dict(params)}
+		device.setParams(settings)
+
+		def cached():
+			device.methods()
+			device._command(method, level, None, None)  # pylint: disable=W0212
+
+		def uncached():
+			device.setParams(settings)
+			cached()
+
+		before = min(timeit.repeat(uncached, number=ROUNDS, repeat=3)) / ROUNDS * 1e6
+		after = min(timeit.repeat(cached, number=ROUNDS, repeat=3)) / ROUNDS * 1e6
+		totals[0] += before
+		totals[1] += after
+		print('%-34s %12.1f %12.1f' % ('%s:%s' % (protocol, model), before, after))
+	print('%-34s %12.1f %12.1f' % ('total', totals[0], totals[1]))
+
+if __name__ == '__main__':
+	main()
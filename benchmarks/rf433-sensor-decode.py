@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the throughput of the 433 sensor decoders, one frame at a time as received from
+# the TellStick and a batch of captured frames at once.
+# run this with python benchmarks/rf433-sensor-decode.py in the tellstick.sh-shell
+
+import logging
+import random
+import timeit
+
+from base import Application
+from rf433.Protocol import Protocol
+from rf433.ProtocolFineoffset import ProtocolFineoffset
+from rf433.RF433Msg import RF433Msg
+
+FRAMES = 2000  # For every model
+OREGON = [
+	('EA4C', 48, [0, 3]), ('1A2D', 64, [3, 2]), ('F824', 56, [1, 2]), ('1984', 64, [1, 2]),
+	('2914', 64, [0, 1]), ('C844', 40, [0, 1]), ('D874', 40, [0]),
+]
+
+def oregonFrame(model, bits, checksumNibbles):
+	# Try all values of the checksum until the frame is valid
+	value = random.getrandbits(bits)
+	for checksum in range(16 ** len(checksumNibbles)):
+		for i, nibble in enumerate(checksumNibbles):
+			shift = 4 * (len(checksumNibbles) - 1 - i)
+			value = (value & ~(0xF << 4*nibble)) | (((checksum >> shift) & 0xF) << 4*nibble)
+		frame = 'Wclass:sensor;protocol:oregon;model:%s;data:%X;' % (model, value)
+		if Protocol.protocolInstance('oregon').decodeData(RF433Msg.parseResponse(frame)[1]):
+			return frame
+	return frame
+
+def fineoffsetFrame():
+	value = (random.getrandbits(8) << 20) | (random.randint(0, 400) << 8) | random.randint(0, 100)
+	value = (value << 8) | ProtocolFineoffset().calculateChecksum(value)
+	return 'Wclass:sensor;protocol:fineoffset;data:%010X;' % value
+
+def capture():
+	frames = {}
+	for (model, bits, checksumNibbles) in OREGON:
+		frames['oregon %s' % model] = [
+			oregonFrame(model, bits, checksumNibbles) for __i in range(FRAMES)
+		]
+	frames['fineoffset'] = [fineoffsetFrame() for __i in range(FRAMES)]
+	frames['mandolyn'] = [
+		'Wclass:sensor;protocol:mandolyn;data:0x%08X;' % random.getrandbits(32)
+		for __i in range(FRAMES)
+	]
+	return frames
+
+def decodeFrames(protocol, frames):
+	return [Protocol.protocolInstance(protocol).decodeData(dict(params)) for params in frames]
+
+def decodeBatch(protocol, frames):
+	return Protocol.protocolInstance(protocol).decodeBatch([dict(params) for params in frames])
+
+def main():
+	Application(run=False)
+	logging.disable(logging.WARNING)
+	random.seed(433)
+	print('%-16s %16s %16s' % ('', 'frames/s', 'batch frames/s'))
+	for name, frames in sorted(capture().items()):
+		frames = [RF433Msg.parseResponse(frame)[1] for frame in frames]
+		protocol = name.split(' ')[0]
+		single = min(timeit.repeat(lambda: decodeFrames(protocol, frames), number=1, repeat=5))
+		batch = min(timeit.repeat(lambda: decodeBatch(protocol, frames), number=1, repeat=5))
+		print('%-16s %16i %16i' % (name, len(frames) / single, len(frames) / batch))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Measures the main thread work for incoming 433 sensor packets when every reading is
+# retransmitted six times, with and without dropping the retransmissions in the adapter.
+# run this with python benchmarks/rf433-sensor-ingest.py in the tellstick.sh-shell
+
+import sys
+import time
+
+from mock import MagicMock, patch
+
+from base import Application, PluginContext
+from telldus import DeviceManager
+from rf433.CommandMatcher import CommandMatcher
+from rf433.PacketFilter import PacketFilter
+from rf433.ProtocolFineoffset import ProtocolFineoffset
+from rf433.RF433 import RF433
+from rf433.RF433Msg import RF433Msg
+
+SENSORS = 200
+READINGS = 20
+RETRANSMISSIONS = 6
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class FakeAdapter(object):
+	def __init__(self, window):
+		self.packetFilter = PacketFilter(window)
+
+def packet(sensorId, temperature):
+	value = (sensorId << 20) | (int(temperature * 10) << 8) | 45
+	value = (value << 8) | ProtocolFineoffset().calculateChecksum(value)
+	return 'Wclass:sensor;protocol:fineoffset;data:%010X;' % value
+
+def createRF433(window):
+	module = sys.modules['telldus.DeviceManager']
+	with patch.object(module, 'Settings', MemorySettings), patch.object(module, 'TelldusLive'):
+		manager = DeviceManager(PluginContext())
+	manager.live.registered = True
+	rf433 = object.__new__(RF433)
+	rf433.devices = []
+	rf433.sensors = []
+	rf433.sensorIndex = {}
+	rf433.matcher = CommandMatcher()
+	rf433.rawEnabled = False
+	rf433.live = MagicMock()
+	rf433.deviceManager = manager
+	rf433.dev = FakeAdapter(window)
+	return rf433
+
+def run(window):
+	rf433 = createRF433(window)
+	manager = rf433.deviceManager
+	sendSensorEvents = manager._DeviceManager__sendSensorEvents  # pylint: disable=protected-access
+	mainThread = 0.0
+	decoded = 0
+	for reading in range(READINGS):
+		for sensorId in range(SENSORS):
+			raw = packet(sensorId, 20 + reading * 0.1)
+			for _ in range(RETRANSMISSIONS):
+				# Adapter thread
+				cmd, params = RF433Msg.parseResponse(raw[:-1])
+				if not rf433.dev.packetFilter.accept(params):
+					continue
+				# Main thread
+				began = time.time()
+				rf433.decodeData(cmd, params)
+				mainThread = mainThread + time.time() - began
+				decoded = decoded + 1
+		# The timer sending sensor events
+		began = time.time()
+		sendSensorEvents()
+		mainThread = mainThread + time.time() - began
+		# Pretend time passes between the readings
+		for sensor in rf433.sensors:
+			for values in sensor._sensorValues.values():  # pylint: disable=protected-access
+				for value in values:
+					value['lastUpdated'] = value['lastUpdated'] - 60
+	readings = SENSORS * READINGS
+	statistics = manager.statistics()
+	print('%-14s %9i %9i %12.1f %9i %9i' % (
+		'window %.1fs' % window,
+		rf433.dev.packetFilter.duplicates,
+		decoded,
+		mainThread * 1e6 / readings,
+		statistics['sensorUpdates'],
+		statistics['sensorEventsSent'],
+	))
+
+def main():
+	Application(run=False)
+	print('%i sensors, %i readings each, every reading sent %i times' % (SENSORS, READINGS, RETRANSMISSIONS))
+	print('%-14s %9s %9s %12s %9s %9s' % ('', 'dropped', 'decoded', 'us/reading', 'updates', 'live msgs'))
+	run(0.0)
+	run(PacketFilter.WINDOW)
+
+if __name__ == '__main__':
+	main()
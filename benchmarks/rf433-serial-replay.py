@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Replays a capture of busy 433 traffic through a pty into the RF433 Adapter and measures
+# the CPU time used by the reader. The byte by byte reader used before LineBuffer is
+# included for comparison.
+# run this with python benchmarks/rf433-serial-replay.py in the tellstick.sh-shell
+
+import os
+import select
+import threading
+import time
+import tty
+
+from mock import MagicMock, patch
+import serial
+
+from base import Application
+from rf433.Adapter import Adapter
+from rf433.ProtocolFineoffset import ProtocolFineoffset
+from rf433.RF433Msg import RF433Msg
+
+FRAMES = 20000
+BURST = 6  # Frames written at a time, sensors sends the same frame several times
+
+def capture():
+	frames = []
+	for i in range(FRAMES // BURST):
+		if i % 4 == 0:
+			frame = '+Wclass:command;protocol:arctech;model:selflearning;data:0x%08X;' % (i * 7919)
+		else:
+			value = ((i % 250) << 20) | ((200 + i % 50) << 8) | 45
+			value = (value << 8) | ProtocolFineoffset().calculateChecksum(value)
+			frame = '+Wclass:sensor;protocol:fineoffset;data:%010X;' % value
+		frames.append((frame + '\r\n') * BURST)
+	return frames
+
+class Counter(object):
+	def __init__(self):
+		self.count = 0
+		self.done = threading.Event()
+
+	def queue(self, __app, __func, *__args):
+		self.count = self.count + 1
+		if self.count == FRAMES // BURST * BURST:
+			self.done.set()
+
+def byteReader(dev, counter):
+	# The reader before LineBuffer, one select and one read per byte
+	buffer = ''
+	while not counter.done.is_set():
+		r, __w, __e = select.select([dev.fileno()], [], [], 1)
+		if dev.fileno() not in r:
+			continue
+		x = dev.read()
+		if x == '\r':
+			continue
+		if x == '+':
+			buffer = ''
+			continue
+		if x == '\n':
+			(cmd, params) = RF433Msg.parseResponse(buffer)
+			if cmd is not None:
+				counter.queue(None, None, cmd, params)
+			continue
+		buffer = buffer + x
+
+def replay(frames, master, counter):
+	began = time.time()
+	cpu = sum(os.times()[:2])
+	for burst in frames:
+		os.write(master, burst)
+	counter.done.wait(120)
+	return (time.time() - began, sum(os.times()[:2]) - cpu)
+
+def openPty():
+	master, slave = os.openpty()
+	tty.setraw(master)
+	return master, os.ttyname(slave), slave
+
+def main():
+	Application(run=False)
+	frames = capture()
+	print('%i frames, %i bytes' % (FRAMES, sum(len(x) for x in frames)))
+	print('%-14s %10s %10s' % ('', 'wall s', 'cpu s'))
+
+	master, name, slave = openPty()
+	counter = Counter()
+	dev = serial.serial_for_url(name, 115200, timeout=0)
+	thread = threading.Thread(target=byteReader, args=(dev, counter))
+	thread.start()
+	print('%-14s %10.2f %10.2f' % (('byte by byte',) + replay(frames, master, counter)))
+	thread.join()
+	dev.close()
+	os.close(master)
+	os.close(slave)
+
+	master, name, slave = openPty()
+	counter = Counter()
+	with patch.object(Application, 'queue', counter.queue):
+		adapter = Adapter(MagicMock(), name)
+		while adapter.dev is None:
+			time.sleep(0.1)
+		print('%-14s %10.2f %10.2f' % (('LineBuffer',) + replay(frames, master, counter)))
+		adapter._Adapter__stop()  # pylint: disable=protected-access
+		adapter.join()
+	os.close(master)
+	os.close(slave)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Ingests one million sensor values into the sensor history and times a few queries.
+# run this with python benchmarks/sensorhistory-ingest.py in the tellstick.sh-shell
+
+import random
+import time
+
+from telldus.SensorHistory import SensorSeries
+
+SAMPLES = 1000000
+SENSORS = 100
+
+def main():
+	series = [SensorSeries() for _ in range(SENSORS)]
+	now = int(time.time())
+	start = now - SAMPLES // SENSORS * 60
+	began = time.time()
+	for i in range(SAMPLES):
+		series[i % SENSORS].add(start + (i // SENSORS) * 60, random.uniform(-20, 30))
+	elapsed = time.time() - began
+	print('Ingest: %i values in %.2fs (%.1f us/value)' % (SAMPLES, elapsed, elapsed * 1e6 / SAMPLES))
+
+	queries = (
+		('Last hour, raw', lambda s: list(s.values(now - 3600))),
+		('Last day, 5 minutes', lambda s: list(s.buckets(300, now - 86400))),
+		('Last week, hourly', lambda s: list(s.buckets(3600, now - 7 * 86400))),
+		('Everything, daily', lambda s: list(s.buckets(86400))),
+	)
+	for name, query in queries:
+		began = time.time()
+		for sensor in series:
+			rows = query(sensor)
+		elapsed = time.time() - began
+		print('%s: %i rows, %.1f us/query' % (name, len(rows), elapsed * 1e6 / SENSORS))
+
+	began = time.time()
+	size = sum(len(repr(s.serialize())) for s in series)
+	print('Serialize: %i bytes in %.1f ms' % (size, (time.time() - began) * 1000))
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Compares threading.Timer with the shared TimerService for a burst of delayed calls.
+# Reports the number of threads used and how late the calls are made.
+# run this with python benchmarks/timer-service.py in the tellstick.sh-shell
+
+import random
+import threading
+import time
+
+from base import TimerService
+
+CALLS = 200
+
+class Burst(object):
+	def __init__(self):
+		self.lateness = []
+		self.lock = threading.Lock()
+		self.done = threading.Event()
+		self.peakThreads = 0
+
+	def called(self, expected):
+		with self.lock:
+			self.lateness.append(time.time() - expected)
+			self.peakThreads = max(self.peakThreads, threading.active_count())
+			if len(self.lateness) == CALLS:
+				self.done.set()
+
+	def report(self, name):
+		self.done.wait()
+		self.lateness.sort()
+		print('%-16s threads: %4i  latency avg: %6.2f ms  max: %6.2f ms' % (
+			name,
+			self.peakThreads,
+			sum(self.lateness) / len(self.lateness) * 1000,
+			self.lateness[-1] * 1000,
+		))
+
+def threadingTimer(delay, func, *args):
+	timer = threading.Timer(delay, func, args)
+	timer.start()
+	return timer
+
+def timerService(delay, func, *args):
+	return TimerService().callLater(delay, func, *args)
+
+def main():
+	random.seed(1)
+	delays = [random.uniform(0.5, 2.0) for __i in range(CALLS)]
+	for name, callLater in (('threading.Timer', threadingTimer), ('TimerService', timerService)):
+		burst = Burst()
+		for delay in delays:
+			callLater(delay, burst.called, time.time() + delay)
+		burst.peakThreads = max(burst.peakThreads, threading.active_count())
+		burst.report(name)
+
+if __name__ == '__main__':
+	main()
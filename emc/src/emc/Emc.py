@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from base import Application, Plugin
+from base import Application, Plugin, TimerService
 from rf433 import RF433, RF433Msg
 try:
 	from zwave.telldus import TelldusZWave
@@ -8,14 +8,12 @@ try:
 except ImportError:
 	TelldusZWave = None
 
-from threading import Timer
-
 class Emc(Plugin):
 	def __init__(self):
 		Application().registerShutdown(self.__stop)
 		self.running = True
 		# Delay start to let everything load properly
-		Timer(10.0, self.resend).start()
+		TimerService().callLater(10.0, self.resend)
 
 	def __stop(self):
 		self.running = False
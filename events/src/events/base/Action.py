@@ -1,10 +1,9 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from threading import Timer
 import time
 
-from base import Application, mainthread, Settings
+from base import Application, mainthread, Settings, TimerService
 from tellduslive.base import LiveMessage
 
 class Action(object):
@@ -53,8 +52,7 @@ class Action(object):
 			# still waiting to execute this action, start a new delayTimer
 			if self.timeout:
 				self.timeout.cancel()
-			self.timeout = Timer(self.delayExecTime - time.time(), self.executeDelayed)
-			self.timeout.start()
+			self.timeout = TimerService().callLater(self.delayExecTime - time.time(), self.executeDelayed)
 
 	def execute(self, triggerInfo={}):  # pylint: disable=W0102
 		pass
@@ -89,8 +87,7 @@ class Action(object):
 		if self.timeout:
 			self.timeout.cancel()
 		self.triggerInfo = triggerInfo
-		self.timeout = Timer(self.delay, self.executeDelayed)
-		self.timeout.start()
+		self.timeout = TimerService().callLater(self.delay, self.executeDelayed)
 		self.delayExecTime = time.time() + self.delay
 		self.updateStoredAction()
 
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from threading import Timer
+from base import TimerService
 
 class ConditionContext(object):
 	EVALUATING, DONE = range(2)
@@ -51,8 +51,7 @@ class ConditionsEvaluation(object):
 	def evaluate(self):
 		self.state = ConditionsEvaluation.EVALUATING
 		# Start timeout if server doesn't reply
-		self.timeout = Timer(30.0, self.__failure)
-		self.timeout.start()
+		self.timeout = TimerService().callLater(30.0, self.__failure)
 		self.condition.validate(success=self.__success, failure=self.__failure)
 
 	def __success(self):
@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import bz2
+import hashlib
+import logging
+import os
+import struct
+from tempfile import SpooledTemporaryFile
+import threading
+import time
+import uuid
+
+from pbkdf2 import PBKDF2
+from Crypto.Cipher import AES
+import requests
+
+from board import Board
+
+class StreamBody(object):
+	"""
+	File like object reading the request body from a generator of chunks. The length is known in
+	advance so the request is sent with a Content-Length header instead of chunked transfer
+	encoding, which not all servers accept.
+	"""
+
+	def __init__(self, chunks, length):
+		self.chunks = chunks
+		self.length = length
+		self.buffer = b''
+
+	def __len__(self):
+		return self.length
+
+	def read(self, size=-1):
+		while size < 0 or len(self.buffer) < size:
+			chunk = next(self.chunks, None)
+			if chunk is None:
+				break
+			self.buffer += chunk
+		if size < 0:
+			size = len(self.buffer)
+		(data, self.buffer) = (self.buffer[:size], self.buffer[size:])
+		return data
+
+class ConfigBackup(object):
+	"""
+	Uploads an encrypted backup of the configuration to Live!. The file is compressed,
+	encrypted and uploaded in chunks by a background thread so neither the main thread nor
+	the memory usage depends on the size of the configuration.
+
+	The same content is never uploaded twice. A new IV is used for every new content, the
+	IV is only reused when the same content is retried.
+	"""
+
+	CHUNK_SIZE = 16384  #: Bytes read, compressed and encrypted at a time. Must be a multiple of 16
+	UPLOAD_INTERVAL = 86400  #: Only send the backup once per day
+	RETRY_INTERVAL = 3600  #: Seconds to wait before retrying a failed upload
+	SPOOL_SIZE = 262144  #: Compressed backups larger than this are spooled to disk
+
+	__keys = {}  # (password, iv) -> derived key
+	__keysLock = threading.Lock()
+
+	def __init__(self, hashFilename):
+		self.hashFilename = hashFilename
+		self.lastUpload = 0
+		self.lastAttempt = 0
+		self.uploadedHash = None
+		self.thread = None
+		self.__iv = (None, None)  # (hash, iv) of the last content encrypted
+		self.__lock = threading.Lock()
+		try:
+			with open(self.hashFilename, 'r') as fd:
+				self.uploadedHash = fd.read().strip() or None
+		except IOError:
+			pass
+
+	def backup(self, path):
+		"""Upload `path` in a background thread if a backup is due"""
+		now = time.time()
+		with self.__lock:
+			if self.thread is not None and self.thread.isAlive():
+				return
+			if now - self.lastUpload < ConfigBackup.UPLOAD_INTERVAL:
+				return
+			if now - self.lastAttempt < ConfigBackup.RETRY_INTERVAL:
+				return
+			self.lastAttempt = now
+			self.thread = threading.Thread(target=self.upload, args=(path,))
+			self.thread.daemon = True
+			self.thread.start()
+
+	def upload(self, path):
+		"""Compress, encrypt and upload the file. Blocks until done."""
+		try:
+			with open(path, 'rb') as fd:
+				digest = ConfigBackup.contentHash(fd)
+				if digest == self.uploadedHash:
+					logging.info('Configuration not changed since last backup')
+					self.lastUpload = time.time()
+					return True
+				fd.seek(0)
+				compressed = ConfigBackup.compress(fd)
+			with compressed:
+				(ivHash, iv) = self.__iv
+				if ivHash != digest:
+					iv = os.urandom(16)
+					self.__iv = (digest, iv)
+				length = compressed.tell()
+				compressed.seek(0)
+				uploadPath = 'http://%s/upload/config' % Board.liveServer()
+				logging.info('Upload backup to %s', uploadPath)
+				boundary = uuid.uuid4().hex
+				mac = Board.getMacAddr()
+				body = ConfigBackup.multipart(boundary, mac, ConfigBackup.encrypt(
+					compressed, length, Board.secret(), iv
+				))
+				response = requests.post(
+					uploadPath,
+					data=StreamBody(body, ConfigBackup.multipartLength(
+						boundary, mac, ConfigBackup.encryptedLength(length)
+					)),
+					headers={'Content-Type': 'multipart/form-data; boundary=%s' % boundary}
+				)
+				response.raise_for_status()
+		except Exception as error:
+			logging.error('Could not upload backup: %s', error)
+			return False
+		self.lastUpload = time.time()
+		self.uploadedHash = digest
+		try:
+			with open(self.hashFilename, 'w') as fd:
+				fd.write(digest)
+		except IOError as error:
+			logging.warning('Could not store backup hash: %s', error)
+		return True
+
+	@staticmethod
+	def compress(fd):
+		""":returns: a file like object, positioned at the end, with the bz2 compressed content"""
+		compressor = bz2.BZ2Compressor()
+		output = SpooledTemporaryFile(max_size=ConfigBackup.SPOOL_SIZE)
+		for data in iter(lambda: fd.read(ConfigBackup.CHUNK_SIZE), b''):
+			output.write(compressor.compress(data))
+		output.write(compressor.flush())
+		return output
+
+	@staticmethod
+	def deriveKey(password, iv):  # pylint: disable=C0103
+		"""The key derivation is slow, the key is reused for as long as the IV is"""
+		with ConfigBackup.__keysLock:
+			key = ConfigBackup.__keys.get((password, iv))
+			if key is None:
+				if len(ConfigBackup.__keys) >= 4:
+					ConfigBackup.__keys.clear()
+				key = PBKDF2(password, iv).read(32)
+				ConfigBackup.__keys[(password, iv)] = key
+			return key
+
+	@staticmethod
+	def encrypt(fd, length, password, iv):  # pylint: disable=C0103
+		"""
+		Generator encrypting the content of `fd` in chunks. The result is the payload length,
+		the IV and the encrypted payload padded with spaces.
+		"""
+		yield struct.pack('<Q', length) + iv
+		encryptor = AES.new(ConfigBackup.deriveKey(password, iv), AES.MODE_CBC, iv)
+		for data in iter(lambda: fd.read(ConfigBackup.CHUNK_SIZE), b''):
+			if len(data) % 16 != 0:
+				# Pad payload, only the last chunk can be short
+				data += b' ' * (16 - len(data) % 16)
+			yield encryptor.encrypt(data)
+
+	@staticmethod
+	def encryptedLength(length):
+		""":returns: the number of bytes :func:`encrypt` yields for a payload of `length` bytes"""
+		return 24 + (length + 15) // 16 * 16
+
+	@staticmethod
+	def contentHash(fd):
+		""":returns: the sha1 hex digest of the content"""
+		sha1 = hashlib.sha1()
+		for data in iter(lambda: fd.read(ConfigBackup.CHUNK_SIZE), b''):
+			sha1.update(data)
+		return sha1.hexdigest()
+
+	@staticmethod
+	def multipart(boundary, mac, chunks):
+		"""Generator for the form sent to the server, with the backup streamed from `chunks`"""
+		(head, tail) = ConfigBackup.__multipartFrame(boundary, mac)
+		yield head
+		for chunk in chunks:
+			yield chunk
+		yield tail
+
+	@staticmethod
+	def multipartLength(boundary, mac, length):
+		""":returns: the size of the form from :func:`multipart` with a backup of `length` bytes"""
+		(head, tail) = ConfigBackup.__multipartFrame(boundary, mac)
+		return len(head) + length + len(tail)
+
+	@staticmethod
+	def __multipartFrame(boundary, mac):
+		head = (
+			'--%s\r\nContent-Disposition: form-data; name="mac"\r\n\r\n%s\r\n'
+			'--%s\r\nContent-Disposition: form-data; name="Telldus.conf.bz2"; '
+			'filename="Telldus.conf.bz2"\r\n\r\n'
+		) % (boundary, mac, boundary)
+		return (head, '\r\n--%s--\r\n' % boundary)
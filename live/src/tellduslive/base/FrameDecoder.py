@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+class FrameDecoder(object):
+	"""
+	Splits the stream received from Telldus Live! into signed messages. A signed message is two
+	string tokens, the signature and the message, each prefixed with its length in hex. Data may
+	be fed in any chunks; messages split over several reads and several messages in one read are
+	both handled.
+	"""
+
+	MAX_FRAME = 16*1024*1024  #: Larger messages are treated as a broken stream
+	MAX_HEADER = 9  # Eight hex digits and the colon
+
+	def __init__(self):
+		self.__data = ''
+		self.__chunks = []
+		self.__chunksSize = 0
+		self.__needed = 0  # Don't try to decode until this many bytes are buffered
+
+	def __len__(self):
+		return len(self.__data) + self.__chunksSize
+
+	def feed(self, data):
+		"""Add received data"""
+		self.__chunks.append(data)
+		self.__chunksSize = self.__chunksSize + len(data)
+
+	def frames(self):
+		"""
+		Extract the complete messages buffered.
+
+		:returns: a list of signed messages, as accepted by :func:`LiveMessage.fromSignedMessage`
+		:raises ValueError: if the stream cannot be decoded
+		"""
+		if len(self) < self.__needed:
+			# Don't join large messages for every read
+			return []
+		if self.__chunks:
+			self.__chunks.insert(0, self.__data)
+			self.__data = ''.join(self.__chunks)
+			self.__chunks = []
+			self.__chunksSize = 0
+		data = self.__data
+		retval = []
+		start = 0
+		while True:
+			# Padding may be sent between messages
+			while start < len(data) and data[start] == '=':
+				start = start + 1
+			end = self.__stringEnd(data, start)
+			if end is not None:
+				end = self.__stringEnd(data, end)
+			if end is None or end > len(data):
+				break
+			retval.append(data[start:end])
+			start = end
+		self.__data = data[start:]
+		if end is None:
+			self.__needed = len(self.__data) + 1
+		else:
+			self.__needed = end - start
+		return retval
+
+	@staticmethod
+	def __stringEnd(data, start):
+		"""
+		:returns: the offset after the string token at `start`, which may be past the end of the
+		          data, or None if more data is needed to know
+		"""
+		index = data.find(':', start, start + FrameDecoder.MAX_HEADER)
+		if index < 0:
+			if len(data) - start >= FrameDecoder.MAX_HEADER:
+				raise ValueError('Invalid message header %r' % data[start:start+FrameDecoder.MAX_HEADER])
+			return None
+		try:
+			length = int(data[start:index], 16)
+		except ValueError:
+			raise ValueError('Invalid message header %r' % data[start:index])
+		if length < 0 or length > FrameDecoder.MAX_FRAME:
+			raise ValueError('Invalid message length %i' % length)
+		return index + 1 + length
@@ -3,33 +3,61 @@
 import hashlib
 from .LiveMessageToken import LiveMessageToken
 
-class LiveMessage():
+class LiveMessage(object):
 	def __init__(self, name = ""):
+		# Arguments not decoded are None in args. Their encoded data is stored at the same index
+		# in __encoded as a tuple (string, start, end).
+		self.args = []
+		self.__encoded = []
+		# For lazily decoded messages. The raw message and where to continue looking for more
+		# arguments, None when all have been found.
+		self.__raw = None
+		self.__next = None
 		if (name != ""):
-			self.args = [LiveMessageToken(name)]
-		else:
-			self.args = []
+			self.append(name)
 
 	def append(self, argument):
-		self.args.append(LiveMessageToken(argument))
+		"""
+		Append an argument. The argument is encoded directly, no tokens are created for it.
+		"""
+		self.__scan()
+		parts = []
+		LiveMessageToken.encodeValue(argument, parts.append)
+		encoded = ''.join(parts)
+		self.__encoded.append((encoded, 0, len(encoded)))
+		self.args.append(None)
 
 	def argument(self,index):
+		self.__scan(index+1)
 		if (len(self.args) > index+1):
-			return self.args[index+1]
+			token = self.args[index+1]
+			if token is None:
+				token = self.__materialize(index+1)
+			return token
 
 		return LiveMessageToken()
 
 	def count(self):
+		self.__scan()
 		return len(self.args)-1
 
 	def name(self):
 		return self.argument(-1).stringVal.lower()
 
 	def toByteArray(self):
-		retval = ''
-		for arg in self.args:
-			retval = retval + arg.toByteArray()
-		return retval
+		self.__scan()
+		parts = []
+		for i, arg in enumerate(self.args):
+			if arg is None:
+				# Not decoded, copy the encoded data
+				(string, start, end) = self.__encoded[i]
+				if start == 0 and end == len(string):
+					parts.append(string)
+				else:
+					parts.append(string[start:end])
+			else:
+				arg.encode(parts.append)
+		return ''.join(parts)
 
 	def toSignedMessage(self, hashMethod, privateKey):
 		message = self.toByteArray()
@@ -42,8 +70,49 @@ class LiveMessage():
 		rawMessage = self.argument(0).stringVal
 		return (self.signatureForMessage(rawMessage, hashMethod, privateKey) == signature)
 
+	def __scan(self, index=None):
+		"""
+		Find the arguments in a lazily decoded message up to and including `index`, or all if
+		`index` is None. Arguments before `index` are only skipped, the one at `index` is decoded.
+		"""
+		while self.__next is not None and (index is None or len(self.args) <= index):
+			start = self.__next
+			if start >= len(self.__raw):
+				self.__next = None
+				break
+			token = None
+			if len(self.args) == index:
+				(end, token) = LiveMessageToken.parseToken(self.__raw, start)
+				valueType = token.valueType
+			else:
+				(end, valueType) = LiveMessageToken.skipToken(self.__raw, start)
+			if valueType == LiveMessageToken.TYPE_INVALID:
+				self.__next = None
+				break
+			self.__encoded.append((self.__raw, start, end))
+			self.args.append(token)
+			self.__next = end
+
+	def __materialize(self, index):
+		(string, start, __end) = self.__encoded[index]
+		(__start, token) = LiveMessageToken.parseToken(string, start)
+		self.args[index] = token
+		return token
+
 	@staticmethod
-	def fromByteArray(rawString):
+	def fromByteArray(rawString, lazy=False):
+		"""
+		Decode a message.
+
+		:param lazy: If True nothing is decoded until needed. Each argument is decoded the first
+		             time it is accessed.
+		"""
+		if lazy:
+			msg = LiveMessage()
+			msg.__raw = rawString
+			msg.__next = 0
+			return msg
+
 		list = []
 		start = 0
 		while (start < len(rawString)):
@@ -54,8 +123,30 @@ class LiveMessage():
 
 		msg = LiveMessage()
 		msg.args = list
+		msg.__encoded = [None] * len(list)
 		return msg
 
+	@staticmethod
+	def fromSignedMessage(rawString, hashMethod, privateKey):
+		"""
+		Verify and decode a signed message, as created by :func:`toSignedMessage`. Only the
+		signature is decoded from the envelope. The payload is decoded lazily.
+
+		:returns: the message, or None if the signature does not match
+		"""
+		(start, signature) = LiveMessageToken.parseToken(rawString, 0)
+		if signature.valueType == LiveMessageToken.TYPE_INVALID:
+			return None
+		(end, valueType) = LiveMessageToken.skipToken(rawString, start)
+		rawMessage = ''
+		if valueType == LiveMessageToken.TYPE_STRING:
+			index = rawString.find(':', start)
+			rawMessage = rawString[index+1:end]
+		expected = LiveMessage.signatureForMessage(rawMessage, hashMethod, privateKey)
+		if expected != signature.stringVal.lower():
+			return None
+		return LiveMessage.fromByteArray(rawMessage, lazy=True)
+
 	@staticmethod
 	def signatureForMessage(msg, hashMethod, privateKey):
 		h = 0
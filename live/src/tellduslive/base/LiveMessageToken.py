@@ -7,167 +7,310 @@ import uuid
 class LiveMessageToken(object):
 	TYPE_INVALID, TYPE_INT, TYPE_STRING, TYPE_BASE64, TYPE_LIST, TYPE_DICTIONARY = list(range(6))
 
+	# Tokens are created in large numbers. Only store the type and one value.
+	__slots__ = ('valueType', 'value')
+
 	def __init__(self, value=None):
 		self.valueType = LiveMessageToken.TYPE_INVALID
-		self.stringVal = ''
-		self.intVal = 0
-		self.dictVal = {}
-		self.listVal = []
+		self.value = ''
 		if isinstance(value, six.integer_types):
 			self.valueType = self.TYPE_INT
-			self.intVal = value
+			self.value = value
 
 		elif isinstance(value, bool):
 			self.valueType = self.TYPE_INT
-			self.intVal = int(value)
+			self.value = int(value)
 
 		elif isinstance(value, six.string_types):
 			self.valueType = self.TYPE_STRING
-			self.stringVal = value
+			self.value = value
 
 		elif isinstance(value, list):
 			self.valueType = self.TYPE_LIST
-			for item in value:
-				self.listVal.append(LiveMessageToken(item))
+			self.value = [LiveMessageToken(item) for item in value]
 
 		elif isinstance(value, dict):
 			self.valueType = self.TYPE_DICTIONARY
-			for key in value:
-				self.dictVal[key] = LiveMessageToken(value[key])
+			self.value = {key: LiveMessageToken(item) for key, item in value.items()}
 
 		elif isinstance(value, float):
 			self.valueType = self.TYPE_STRING
-			self.stringVal = str(value)
+			self.value = str(value)
 		elif isinstance(value, uuid.UUID):
 			self.valueType = self.TYPE_STRING
-			self.stringVal = str(value)
+			self.value = str(value)
 
-	def toJSON(self):
+	@property
+	def dictVal(self):
+		""":returns: the dict if this is a dictionary token, otherwise an empty dict"""
+		if self.valueType == LiveMessageToken.TYPE_DICTIONARY:
+			return self.value
+		return {}
+
+	@property
+	def intVal(self):
+		""":returns: the value if this is an int token, otherwise 0"""
 		if self.valueType == LiveMessageToken.TYPE_INT:
-			return '%d' % self.intVal
+			return self.value
+		return 0
 
+	@property
+	def listVal(self):
+		""":returns: the list if this is a list token, otherwise an empty list"""
 		if self.valueType == LiveMessageToken.TYPE_LIST:
-			retval = '['
-			for token in self.listVal:
-				if len(retval) > 1:
-					retval = retval + ","
-				retval = retval + token.toJSON()
-			return retval + ']'
+			return self.value
+		return []
 
-		if self.valueType == LiveMessageToken.TYPE_DICTIONARY:
-			retval = '{'
-			for key in self.dictVal:
-				if len(retval) > 1:
-					retval = retval + ","
-				retval = retval + LiveMessageToken(key).toJSON() + "=" + self.dictVal[key].toJSON()
-			return retval + '}'
+	@property
+	def stringVal(self):
+		""":returns: the string if this is a string token, otherwise an empty string"""
+		if self.valueType in (LiveMessageToken.TYPE_STRING, LiveMessageToken.TYPE_BASE64):
+			return self.value
+		return ''
 
-		return self.stringVal
+	def toJSON(self):
+		parts = []
+		self.__toJSON(parts.append)
+		return ''.join(parts)
+
+	def __toJSON(self, append):
+		if self.valueType == LiveMessageToken.TYPE_INT:
+			append('%d' % self.value)
+
+		elif self.valueType == LiveMessageToken.TYPE_LIST:
+			append('[')
+			for i, token in enumerate(self.value):
+				if i > 0:
+					append(',')
+				token.__toJSON(append)
+			append(']')
+
+		elif self.valueType == LiveMessageToken.TYPE_DICTIONARY:
+			append('{')
+			for i, (key, token) in enumerate(self.value.items()):
+				if i > 0:
+					append(',')
+				LiveMessageToken(key).__toJSON(append)
+				append('=')
+				token.__toJSON(append)
+			append('}')
+
+		else:
+			append(self.stringVal)
 
 	def toNative(self):
 		if self.valueType == LiveMessageToken.TYPE_INT:
-			return self.intVal
+			return self.value
 
 		if self.valueType == LiveMessageToken.TYPE_LIST:
-			retval = []
-			for token in self.listVal:
-				retval.append(token.toNative())
-			return retval
+			return [token.toNative() for token in self.value]
 
 		if self.valueType == LiveMessageToken.TYPE_DICTIONARY:
-			retdict = {}
-			for key in self.dictVal:
-				retdict[key] = self.dictVal[key].toNative()
-			return retdict
+			return {key: token.toNative() for key, token in self.value.items()}
 
 		return self.stringVal
 
 	def toByteArray(self):
+		parts = []
+		self.encode(parts.append)
+		return ''.join(parts)
+
+	def encode(self, append):
+		"""
+		Encode this token. The output is passed in parts to the function `append`, normally
+		the append method of a list to be joined when all tokens are encoded.
+		"""
 		if self.valueType == LiveMessageToken.TYPE_INT:
-			return 'i%Xs' % self.intVal
+			append('i%Xs' % self.value)
 
-		if self.valueType == LiveMessageToken.TYPE_LIST:
-			retval = 'l'
-			for token in self.listVal:
-				retval = retval + token.toByteArray()
-			return retval + 's'
+		elif self.valueType == LiveMessageToken.TYPE_LIST:
+			append('l')
+			for token in self.value:
+				token.encode(append)
+			append('s')
 
-		if self.valueType == LiveMessageToken.TYPE_DICTIONARY:
-			retval = 'h'
-			for key in self.dictVal:
-				retval = retval + LiveMessageToken(str(key)).toByteArray() + self.dictVal[key].toByteArray()
-			return retval + 's'
+		elif self.valueType == LiveMessageToken.TYPE_DICTIONARY:
+			append('h')
+			for key, token in self.value.items():
+				key = str(key)
+				append('%X:%s' % (len(key), key))
+				token.encode(append)
+			append('s')
 
-		if six.PY2 and isinstance(self.stringVal, unicode):
-			stringVal = base64.b64encode(self.stringVal.encode('utf-8'))
-			return 'u%X:%s' % (len(stringVal), str(stringVal),)
+		elif six.PY2 and isinstance(self.value, unicode):
+			stringVal = base64.b64encode(self.value.encode('utf-8'))
+			append('u%X:%s' % (len(stringVal), stringVal))
 
-		return '%X:%s' % (len(self.stringVal), str(self.stringVal),)
+		else:
+			stringVal = str(self.stringVal)
+			append('%X:%s' % (len(stringVal), stringVal))
+
+	@staticmethod
+	def encodeValue(value, append):
+		"""
+		Encode a native value the same way as :func:`encode` would encode a token created from
+		it, without creating any tokens.
+		"""
+		if isinstance(value, six.integer_types):
+			append('i%Xs' % value)
+
+		elif six.PY2 and isinstance(value, unicode):
+			stringVal = base64.b64encode(value.encode('utf-8'))
+			append('u%X:%s' % (len(stringVal), stringVal))
+
+		elif isinstance(value, six.string_types):
+			append('%X:%s' % (len(value), value))
+
+		elif isinstance(value, list):
+			append('l')
+			for item in value:
+				LiveMessageToken.encodeValue(item, append)
+			append('s')
+
+		elif isinstance(value, dict):
+			append('h')
+			for key, item in value.items():
+				key = str(key)
+				append('%X:%s' % (len(key), key))
+				LiveMessageToken.encodeValue(item, append)
+			append('s')
+
+		elif isinstance(value, (float, uuid.UUID)):
+			stringVal = str(value)
+			append('%X:%s' % (len(stringVal), stringVal))
+
+		else:
+			append('0:')
 
 	@staticmethod
 	def parseToken(string, start):
+		"""
+		Parse one token from `string` starting at the offset `start`.
+
+		:returns: a tuple with the offset after the token and the token. If the token could not be
+		          parsed the token type is :attr:`TYPE_INVALID`.
+		"""
 		token = LiveMessageToken()
 		if start >= len(string):
 			return (start, token)
+		char = string[start]
 
-		if string[start] == 'i':
+		if char == 'i':
 			start += 1
 			index = string.find('s', start)
 			if index < 0:
 				return (start, token)
-
 			try:
-				token.intVal = int(string[start:index], 16)
-				token.valueType = LiveMessageToken.TYPE_INT
-				start = index + 1
-			except:
+				token.value = int(string[start:index], 16)
+			except ValueError:
 				return (start, token)
+			token.valueType = LiveMessageToken.TYPE_INT
+			return (index + 1, token)
 
-		elif string[start] == 'l':
+		if char == 'l':
 			start += 1
 			token.valueType = LiveMessageToken.TYPE_LIST
-			while start < len(string) and string[start] != 's':
-				start, listToken = LiveMessageToken.parseToken(string, start)
+			token.value = []
+			append = token.value.append
+			parseToken = LiveMessageToken.parseToken
+			end = len(string)
+			while start < end and string[start] != 's':
+				start, listToken = parseToken(string, start)
 				if listToken.valueType == LiveMessageToken.TYPE_INVALID:
 					break
-				token.listVal.append(listToken)
-			start += 1
+				append(listToken)
+			return (start + 1, token)
 
-		elif string[start] == 'h':
+		if char == 'h':
 			start += 1
 			token.valueType = LiveMessageToken.TYPE_DICTIONARY
-			while start < len(string) and string[start] != 's':
-				start, keyToken = LiveMessageToken.parseToken(string, start)
-				if keyToken.valueType == LiveMessageToken.TYPE_STRING:
-					key = keyToken.stringVal
-				elif keyToken.valueType == LiveMessageToken.TYPE_INT:
-					key = keyToken.intVal
-				else:
+			token.value = dictVal = {}
+			parseToken = LiveMessageToken.parseToken
+			end = len(string)
+			while start < end and string[start] != 's':
+				start, keyToken = parseToken(string, start)
+				if keyToken.valueType not in (LiveMessageToken.TYPE_STRING, LiveMessageToken.TYPE_INT):
 					break
-				start, valueToken = LiveMessageToken.parseToken(string, start)
+				start, valueToken = parseToken(string, start)
 				if valueToken.valueType == LiveMessageToken.TYPE_INVALID:
 					break
-				token.dictVal[key] = valueToken
-			start += 1
+				dictVal[keyToken.value] = valueToken
+			return (start + 1, token)
 
-		elif string[start] == 'u':  # Base64
-			start += 1
-			start, token = LiveMessageToken.parseToken(string, start)
+		if char == 'u':  # Base64
+			start, token = LiveMessageToken.parseToken(string, start + 1)
+			token.value = unicode(base64.decodestring(token.stringVal), 'utf-8')
 			token.valueType = LiveMessageToken.TYPE_BASE64
-			token.stringVal = unicode(base64.decodestring(token.stringVal), 'utf-8')
+			return (start, token)
 
-		else: #String
-			index = string.find(':', start)
-			if index < 0:
-				return (start, token)
+		# String
+		index = string.find(':', start)
+		if index < 0:
+			return (start, token)
+		try:
+			length = int(string[start:index], 16)
+		except ValueError:
+			return (start, token)
+		start = index + length + 1
+		token.value = string[index+1:start]
+		token.valueType = LiveMessageToken.TYPE_STRING
+		return (start, token)
+
+	@staticmethod
+	def skipToken(string, start):
+		"""
+		Find the end of the token starting at the offset `start` without decoding it. This
+		follows the same rules as :func:`parseToken` but does not create any tokens.
 
+		:returns: a tuple with the offset after the token and the token type
+		"""
+		end = len(string)
+		if start >= end:
+			return (start, LiveMessageToken.TYPE_INVALID)
+		char = string[start]
+
+		if char == 'i':
+			start += 1
+			index = string.find('s', start)
+			if index < 0:
+				return (start, LiveMessageToken.TYPE_INVALID)
 			try:
-				length = int(string[start:index], 16)
-			except:
-				return (start, token)
+				int(string[start:index], 16)
+			except ValueError:
+				return (start, LiveMessageToken.TYPE_INVALID)
+			return (index + 1, LiveMessageToken.TYPE_INT)
 
-			start = index + length + 1
-			token.stringVal = string[index+1:start]
-			token.valueType = LiveMessageToken.TYPE_STRING
+		if char == 'l':
+			start += 1
+			skipToken = LiveMessageToken.skipToken
+			while start < end and string[start] != 's':
+				start, valueType = skipToken(string, start)
+				if valueType == LiveMessageToken.TYPE_INVALID:
+					break
+			return (start + 1, LiveMessageToken.TYPE_LIST)
 
-		return (start, token)
+		if char == 'h':
+			start += 1
+			skipToken = LiveMessageToken.skipToken
+			while start < end and string[start] != 's':
+				start, valueType = skipToken(string, start)
+				if valueType not in (LiveMessageToken.TYPE_STRING, LiveMessageToken.TYPE_INT):
+					break
+				start, valueType = skipToken(string, start)
+				if valueType == LiveMessageToken.TYPE_INVALID:
+					break
+			return (start + 1, LiveMessageToken.TYPE_DICTIONARY)
+
+		if char == 'u':  # Base64
+			start, __valueType = LiveMessageToken.skipToken(string, start + 1)
+			return (start, LiveMessageToken.TYPE_BASE64)
+
+		# String
+		index = string.find(':', start)
+		if index < 0:
+			return (start, LiveMessageToken.TYPE_INVALID)
+		try:
+			length = int(string[start:index], 16)
+		except ValueError:
+			return (start, LiveMessageToken.TYPE_INVALID)
+		return (index + length + 1, LiveMessageToken.TYPE_STRING)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+from collections import deque
+import threading
+import time
+
+class SendQueueEntry(object):
+	__slots__ = ('msg', 'key', 'priority', 'enqueued')
+
+	def __init__(self, msg, key, priority, enqueued):
+		self.msg = msg
+		self.key = key
+		self.priority = priority
+		self.enqueued = enqueued
+
+class SendQueue(object):
+	"""
+	Queue for messages waiting to be sent to Telldus Live!. Adding messages never blocks and it
+	is safe to do so from any thread.
+
+	Messages superseded by a newer message are replaced in the queue, keeping the position of
+	the old message. For example only the latest SensorEvent for each sensor is kept.
+
+	The queue is bounded. When it is full, the oldest message with the lowest priority is
+	dropped to make room. If the new message has a lower priority than all queued messages, the
+	new message is dropped instead.
+	"""
+
+	HIGH, NORMAL, LOW = list(range(3))
+
+	MAX_SIZE = 1000  #: Default number of messages to hold
+
+	# Message names are in lower case, as returned by LiveMessage.name()
+	PRIORITIES = {
+		'ack': HIGH,
+		'ping': HIGH,
+		'register': HIGH,
+		'sendtoweb': LOW,
+		'sensorevent': LOW,
+	}
+
+	# Messages where a newer message replaces an older. The value is a function returning what
+	# identifies the message, besides the name.
+	COALESCE = {
+		'devicesreport': lambda msg: None,
+		'ping': lambda msg: None,
+		'sensorevent': lambda msg: msg.argument(0).dictVal.get('sensor_id').toNative(),
+		'sensorsreport': lambda msg: None,
+	}
+
+	def __init__(self, maxSize=MAX_SIZE):
+		self.maxSize = maxSize
+		self.__queues = (deque(), deque(), deque())
+		self.__keys = {}
+		self.__size = 0
+		self.__lock = threading.Lock()
+		self.maxDepth = 0
+		self.enqueued = 0
+		self.coalesced = 0
+		self.dropped = 0
+		self.sent = 0
+		self.bytesSent = 0
+		self.latencyTotal = 0.0
+		self.latencyMax = 0.0
+
+	def __len__(self):
+		return self.__size
+
+	def clear(self):
+		"""
+		Remove all queued messages. They are counted as dropped.
+
+		:returns: a list with the removed messages in the order they were queued
+		"""
+		with self.__lock:
+			entries = [entry for queue in self.__queues for entry in queue]
+			self.dropped = self.dropped + self.__size
+			for queue in self.__queues:
+				queue.clear()
+			self.__keys.clear()
+			self.__size = 0
+		entries.sort(key=lambda entry: entry.enqueued)
+		return [entry.msg for entry in entries]
+
+	def pop(self):
+		""":returns: the next entry to send or None if the queue is empty"""
+		with self.__lock:
+			for queue in self.__queues:
+				if queue:
+					entry = queue.popleft()
+					self.__forget(entry)
+					self.__size = self.__size - 1
+					return entry
+		return None
+
+	def put(self, msg, now=None):
+		"""
+		Add a message to the queue.
+
+		:returns: False if the message was dropped, True otherwise
+		"""
+		if now is None:
+			now = time.time()
+		name = msg.name()
+		priority = SendQueue.PRIORITIES.get(name, SendQueue.NORMAL)
+		key = None
+		if name in SendQueue.COALESCE:
+			try:
+				key = (name, SendQueue.COALESCE[name](msg))
+			except Exception as __error:
+				# Malformed, do not try to coalesce it
+				key = None
+		with self.__lock:
+			self.enqueued = self.enqueued + 1
+			if key is not None:
+				entry = self.__keys.get(key)
+				if entry is not None:
+					entry.msg = msg
+					self.coalesced = self.coalesced + 1
+					return True
+			if self.__size >= self.maxSize and not self.__dropLowest(priority):
+				self.dropped = self.dropped + 1
+				return False
+			entry = SendQueueEntry(msg, key, priority, now)
+			self.__queues[priority].append(entry)
+			if key is not None:
+				self.__keys[key] = entry
+			self.__size = self.__size + 1
+			self.maxDepth = max(self.maxDepth, self.__size)
+		return True
+
+	def markSent(self, entry, size, now=None):
+		"""Record that the message in `entry` has been written to the socket"""
+		if now is None:
+			now = time.time()
+		latency = max(now - entry.enqueued, 0.0)
+		with self.__lock:
+			self.sent = self.sent + 1
+			self.bytesSent = self.bytesSent + size
+			self.latencyTotal = self.latencyTotal + latency
+			self.latencyMax = max(self.latencyMax, latency)
+
+	def statistics(self):
+		""":returns: a dict with the queue metrics. Latencies are in seconds."""
+		with self.__lock:
+			return {
+				'depth': self.__size,
+				'maxDepth': self.maxDepth,
+				'maxSize': self.maxSize,
+				'enqueued': self.enqueued,
+				'coalesced': self.coalesced,
+				'dropped': self.dropped,
+				'sent': self.sent,
+				'bytesSent': self.bytesSent,
+				'latencyAvg': self.latencyTotal / self.sent if self.sent else 0.0,
+				'latencyMax': self.latencyMax,
+			}
+
+	def __dropLowest(self, priority):
+		for queue in reversed(self.__queues[priority:]):
+			if queue:
+				self.__forget(queue.popleft())
+				self.__size = self.__size - 1
+				self.dropped = self.dropped + 1
+				return True
+		return False
+
+	def __forget(self, entry):
+		if entry.key is not None and self.__keys.get(entry.key) is entry:
+			del self.__keys[entry.key]
@@ -1,16 +1,26 @@
 # -*- coding: utf-8 -*-
 
+from collections import deque
 import errno
+import fcntl
 import logging
+import os
 import select
 import socket
 import ssl
+import zlib
+from .FrameDecoder import FrameDecoder
 from .LiveMessage import LiveMessage
+from .SendQueue import SendQueue
 from base import Settings
 
 class ServerConnection(object):
 	CLOSED, CONNECTING, CONNECTED, READY, MSG_RECEIVED, DISCONNECTED = list(range(6))
 
+	RECV_SIZE = 65536
+	COMPRESSION_METHODS = ('zlib',)  #: Compression methods supported
+	COMPRESS_THRESHOLD = 4096  #: Only messages larger than this are compressed
+
 	def __init__(self):
 		self.publicKey = ''
 		self.privateKey = ''
@@ -18,11 +28,26 @@ class ServerConnection(object):
 		self.msgs = []
 		self.server = None
 		self.socket = None
+		self.decoder = FrameDecoder()
+		self.compression = None  # Compression method negotiated with the server
+		self.compressed = 0
+		self.bytesBeforeCompression = 0
+		self.bytesAfterCompression = 0
 		settings = Settings('tellduslive.config')
 		self.useSSL = settings.get('useSSL', True)
+		self.queue = SendQueue(settings.get('sendQueueSize', SendQueue.MAX_SIZE))
+		self.unsent = deque(maxlen=self.queue.maxSize)  # Messages removed from the queue on close
+		self.__writing = None  # [data, offset, entry] for the message being written
+		# Used to wake up the connection thread when messages are queued
+		self.__wakeupRead, self.__wakeupWrite = os.pipe()
+		for fd in (self.__wakeupRead, self.__wakeupWrite):
+			fcntl.fcntl(fd, fcntl.F_SETFL, fcntl.fcntl(fd, fcntl.F_GETFL) | os.O_NONBLOCK)
 
 	def close(self):
 		self.state = ServerConnection.CLOSED
+		# Messages queued for this connection are not valid for the next. They are kept so
+		# events can be sent again after reconnecting, see popUnsent().
+		self.unsent.extend(self.queue.clear())
 		try:
 			self.socket.shutdown(socket.SHUT_RDWR)
 			self.socket.close()
@@ -37,12 +62,23 @@ class ServerConnection(object):
 		logging.info("Connecting to %s:%i" % (address, port))
 		return True
 
+	def popUnsent(self):
+		""":returns: a list with the messages that were still queued when the connection closed"""
+		messages = []
+		while self.unsent:
+			messages.append(self.unsent.popleft())
+		return messages
+
 	def popMessage(self):
 		if len(self.msgs) == 0:
 			return None
 		return self.msgs.pop()
 
-	def process(self):
+	def process(self, timeout=5):
+		"""
+		Connect, send queued messages and read from the server. Blocks at most `timeout` seconds
+		waiting for the socket, or until :func:`wakeup` is called.
+		"""
 		if self.state == ServerConnection.CLOSED:
 			return ServerConnection.CLOSED
 		if self.state == ServerConnection.CONNECTING:
@@ -54,6 +90,9 @@ class ServerConnection(object):
 					self.socket = ctx.wrap_socket(newSocket)
 				else:
 					self.socket = newSocket
+				self.__writing = None
+				self.decoder = FrameDecoder()
+				self.compression = None
 				self.state = ServerConnection.CONNECTED
 			except socket.error as socketException:
 				(error, errorString) = socketException.args
@@ -76,103 +115,190 @@ class ServerConnection(object):
 
 		try:
 			fileno = self.socket.fileno()
-			readlist, __writelist, __xlist = select.select([fileno], [], [], 5)
+			writelist = [fileno] if self.__writing is not None or len(self.queue) else []
+			readlist, writelist, __xlist = select.select(
+				[fileno, self.__wakeupRead], writelist, [], max(timeout, 0)
+			)
 		except Exception as error:
 			logging.exception(error)
 			self.close()
 			return self.state
+		if self.__wakeupRead in readlist:
+			self.__clearWakeup()
+		if self.__writing is not None or len(self.queue):
+			self.__flush()
+			if self.state == ServerConnection.CLOSED:
+				return ServerConnection.DISCONNECTED
 		if fileno not in readlist:
 			return self.state
-		if self.useSSL:
-			resp = self._readSSL()
-		else:
-			resp = self._read()
-
-		if resp is None:
-			return ServerConnection.READY
-		if (resp == ''):
+		if not self.__receive():
 			logging.warning("Empty response, disconnected? %s", str(self.state))
 			if self.state == ServerConnection.CLOSED:
 				return ServerConnection.CLOSED
 			self.close()
 			return ServerConnection.DISCONNECTED
+		try:
+			frames = self.decoder.frames()
+		except ValueError as error:
+			logging.error("Could not decode data from server: %s", str(error))
+			self.close()
+			return ServerConnection.DISCONNECTED
 
-		envelope = LiveMessage.fromByteArray(resp)
-		if (not envelope.verifySignature('sha1', self.privateKey)):
-			logging.warning("Signature failed")
-			return ServerConnection.READY
-		self.msgs.insert(0, LiveMessage.fromByteArray(envelope.argument(0).stringVal))
-		return ServerConnection.MSG_RECEIVED
+		for frame in frames:
+			msg = LiveMessage.fromSignedMessage(frame, 'sha1', self.privateKey)
+			if msg is None:
+				logging.warning("Signature failed")
+				continue
+			if msg.name() == 'compressed':
+				msg = self.__decompress(msg)
+				if msg is None:
+					continue
+			self.msgs.insert(0, msg)
+		if len(self.msgs):
+			return ServerConnection.MSG_RECEIVED
+		return ServerConnection.READY
 
 	def send(self, msg):
+		"""
+		Queue a message to be sent. This never blocks and may be called from any thread. The
+		message is signed and written by the connection thread.
+
+		:returns: False if the message was dropped
+		"""
 		if self.state != ServerConnection.CONNECTED and self.state != ServerConnection.READY:
-			return
-		signedMessage = msg.toSignedMessage('sha1', self.privateKey)
+			return False
+		if not self.queue.put(msg):
+			logging.warning('Send queue full, dropping %s', msg.name())
+			return False
+		self.wakeup()
+		return True
+
+	def wait(self, timeout):
+		"""Sleep for `timeout` seconds or until :func:`wakeup` is called"""
+		readlist, __writelist, __xlist = select.select([self.__wakeupRead], [], [], max(timeout, 0))
+		if readlist:
+			self.__clearWakeup()
+
+	def wakeup(self):
+		"""Wake up the connection thread if it is waiting in :func:`process` or :func:`wait`"""
 		try:
-			if self.useSSL:
-				retry = True
-				while retry:
-					retry = False
-					try:
-						if len(signedMessage) % 16384 == 0:
-							# the server can't really handle
-							# messages evenly divided by 16384
-							# (SSL max size is 16384, and there
-							# is no sure way of knowing if more
-							# data is coming or not), add some
-							# padding
-							signedMessage = signedMessage + "="
-						self.socket.write(signedMessage)
-					except socket.error as error:
-						if isinstance(error.args, tuple):
-							if error[0] == socket.SSL_ERROR_WANT_WRITE:
-								# more to write
-								retry = True
-								continue
-			else:
-				self.socket.send(signedMessage)
-		except Exception as error:
-			logging.error('ERROR, could not write to socket. Close and reconnect')
-			logging.error(str(error))
-			self.close()
+			os.write(self.__wakeupWrite, 'x')
+		except OSError as __error:
+			# The pipe is full, the thread will wake up anyway
+			pass
+
+	def signedMessage(self, msg):
+		"""
+		Sign a message for sending. Large messages are compressed if the server supports it.
+		"""
+		if self.compression == 'zlib':
+			raw = msg.toByteArray()
+			if len(raw) >= ServerConnection.COMPRESS_THRESHOLD:
+				data = zlib.compress(raw)
+				if len(data) < len(raw):
+					self.compressed = self.compressed + 1
+					self.bytesBeforeCompression = self.bytesBeforeCompression + len(raw)
+					self.bytesAfterCompression = self.bytesAfterCompression + len(data)
+					msg = LiveMessage('compressed')
+					msg.append('zlib')
+					msg.append(data)
+		return msg.toSignedMessage('sha1', self.privateKey)
 
-	def _readSSL(self):
-		hasMoreData = True
-		resp = ''
-		buffSize = 1024
-		while (hasMoreData):
+	def statistics(self):
+		""":returns: a dict with metrics for the send queue and compression"""
+		statistics = self.queue.statistics()
+		statistics.update({
+			'compression': self.compression,
+			'compressed': self.compressed,
+			'bytesBeforeCompression': self.bytesBeforeCompression,
+			'bytesAfterCompression': self.bytesAfterCompression,
+		})
+		return statistics
+
+	def __clearWakeup(self):
+		try:
+			os.read(self.__wakeupRead, 1024)
+		except OSError as __error:
+			pass
+
+	@staticmethod
+	def __decompress(msg):
+		method = msg.argument(0).stringVal
+		if method != 'zlib':
+			logging.warning("Unsupported compression %s", method)
+			return None
+		try:
+			return LiveMessage.fromByteArray(zlib.decompress(msg.argument(1).stringVal), lazy=True)
+		except zlib.error as error:
+			logging.warning("Could not decompress message: %s", str(error))
+			return None
+
+	def __flush(self):
+		while True:
+			if self.__writing is None:
+				entry = self.queue.pop()
+				if entry is None:
+					return
+				signedMessage = self.signedMessage(entry.msg)
+				if self.useSSL and len(signedMessage) % 16384 == 0:
+					# the server can't really handle
+					# messages evenly divided by 16384
+					# (SSL max size is 16384, and there
+					# is no sure way of knowing if more
+					# data is coming or not), add some
+					# padding
+					signedMessage = signedMessage + "="
+				self.__writing = [signedMessage, 0, entry]
+			data, offset, entry = self.__writing
 			try:
-				data = self.socket.recv(buffSize)
-				if (len(data) < buffSize):
-					hasMoreData = False
-				resp += data
+				written = self.socket.send(data[offset:] if offset else data)
 			except ssl.SSLError as error:
-				if error.args[0] == ssl.SSL_ERROR_WANT_READ:
-					pass
-				else:
-					logging.error("SSLSocket error: %s", str(error))
-					return None
+				if error.args[0] in (ssl.SSL_ERROR_WANT_WRITE, ssl.SSL_ERROR_WANT_READ):
+					# Retry with the same data when the socket is writable
+					return
+				logging.error('ERROR, could not write to socket. Close and reconnect')
+				logging.error(str(error))
+				self.close()
+				return
 			except socket.error as error:
-				logging.error("Socket error: %s", str(error))
-				return None
-			except Exception as error:
+				if error.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+					return
+				logging.error('ERROR, could not write to socket. Close and reconnect')
 				logging.error(str(error))
-				return None
-		return resp
-
-	def _read(self):
-		hasMoreData = True
-		request = ''
-		buffSize = 1024
-		while (hasMoreData):
+				self.close()
+				return
+			if written == 0:
+				# SSL sockets returns 0 instead of raising when the write would block
+				return
+			offset = offset + written
+			if offset < len(data):
+				self.__writing[1] = offset
+				continue
+			self.__writing = None
+			self.queue.markSent(entry, len(data))
+
+	def __receive(self):
+		"""
+		Read all data available from the socket into the decoder.
+
+		:returns: False if the connection has been closed
+		"""
+		while True:
 			try:
-				packet = self.socket.recv(buffSize)
-				if (len(packet) < buffSize):
-					hasMoreData = False
-				request = request + packet
-			except socket.error as socketException:
-				(err, __errstr) = socketException.args
-				if (err == errno.EAGAIN):
-					return None
-				return ''  # is not alive
-		return request
+				data = self.socket.recv(ServerConnection.RECV_SIZE)
+			except ssl.SSLError as error:
+				if error.args[0] == ssl.SSL_ERROR_WANT_READ:
+					return True
+				logging.error("SSLSocket error: %s", str(error))
+				return False
+			except socket.error as error:
+				if error.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+					return True
+				logging.error("Socket error: %s", str(error))
+				return False
+			if data == '':
+				return False
+			self.decoder.feed(data)
+			if len(data) < ServerConnection.RECV_SIZE and not (self.useSSL and self.socket.pending()):
+				# Nothing more buffered, don't wait for EAGAIN
+				return True
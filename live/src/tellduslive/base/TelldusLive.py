@@ -1,18 +1,12 @@
 # -*- coding: utf-8 -*-
 
-import bz2
 import logging
 import os
 import random
 from StringIO import StringIO
-import struct
 import threading
 import time
 
-from pbkdf2 import PBKDF2
-from Crypto.Cipher import AES
-import requests
-
 from base import \
 	Application, \
 	Settings, \
@@ -25,6 +19,7 @@ from base import \
 	signal, \
 	slot
 from board import Board
+from .ConfigBackup import ConfigBackup
 from .ServerList import ServerList
 from .ServerConnection import ServerConnection
 from .LiveMessage import LiveMessage
@@ -45,6 +40,12 @@ class TelldusLive(Plugin):
 	implements(ISignalObserver)
 	observers = ObserverCollection(ITelldusLiveObserver)
 
+	PING_INTERVAL = 120  # Seconds of silence before sending a ping
+	PONG_TIMEOUT = 360  # Reconnect if nothing has been received for this long
+	RECONNECT_MIN = 10
+	RECONNECT_MAX = 300
+	NO_SERVERS_DELAY = 60
+
 	def __init__(self):
 		logging.info("Telldus Live! loading")
 		self.email = ''
@@ -54,12 +55,15 @@ class TelldusLive(Plugin):
 		self.registered = False
 		self.running = False
 		self.serverList = ServerList()
-		self.lastBackedUpConfig = 0
+		self.backup = ConfigBackup(os.path.join(Board.configDir(), 'ConfigBackup.sha1'))
 		Application().registerShutdown(self.stop)
 		self.settings = Settings('tellduslive.config')
 		self.uuid = self.settings['uuid']
 		self.conn = ServerConnection()
 		self.pingTimer = 0
+		self.pongTimer = 0
+		self.reconnectAt = 0
+		self.reconnectAttempts = 0
 		self.thread = threading.Thread(target=self.run)
 		if self.conn.publicKey != '':
 			# Only connect if the keys has been set.
@@ -67,24 +71,13 @@ class TelldusLive(Plugin):
 
 	@slot('configurationWritten')
 	def configurationWritten(self, path):
-		if time.time() - self.lastBackedUpConfig < 86400:
-			# Only send the backup once per day
-			return
-		self.lastBackedUpConfig = time.time()
-		uploadPath = 'http://%s/upload/config' % Board.liveServer()
-		logging.info('Upload backup to %s', uploadPath)
-		with open(path, 'rb') as fd:
-			fileData = fd.read()
-		fileData = bz2.compress(fileData)  # Compress it
-		fileData = TelldusLive.deviceSpecificEncrypt(fileData)  # Encrypt it
-		requests.post(
-			uploadPath,
-			data={'mac': Board.getMacAddr()},
-			files={'Telldus.conf.bz2': fileData}
-		)
+		# The upload is made by a background thread, at most once per day. The signal is sent when
+		# the settings journal is compacted, not for every saved change.
+		self.backup.backup(path)
 
 	@mainthread
 	def handleMessage(self, message):
+		"""Handle a message in the main thread, see :func:`dispatchMessage`"""
 		if (message.name() == "notregistered"):
 			self.email = ''
 			self.connected = True
@@ -112,22 +105,6 @@ class TelldusLive(Plugin):
 			self.refreshRequired = False
 			return
 
-		if (message.name() == "command"):
-			# Extract ACK and handle it
-			args = message.argument(0).dictVal
-			if 'ACK' in args:
-				msg = LiveMessage("ACK")
-				msg.append(args['ACK'].intVal)
-				self.send(msg)
-
-		if (message.name() == "pong"):
-			return
-
-		if (message.name() == "disconnect"):
-			self.conn.close()
-			self.__disconnected()
-			return
-
 		handled = False
 		for observer in self.observers:
 			for func in getattr(observer, '_telldusLiveHandlers', {}).get(message.name(), []):
@@ -136,6 +113,43 @@ class TelldusLive(Plugin):
 		if not handled:
 			logging.warning("Did not understand: %s", message.toByteArray())
 
+	def dispatchMessage(self, message):
+		"""
+		Handle a message received from the server. This is called in the connection thread.
+		Messages only concerning the connection are handled directly, the rest are passed on to
+		:func:`handleMessage` in the main thread.
+		"""
+		name = message.name()
+		if name == "pong":
+			return
+
+		if name == "disconnect":
+			self.conn.close()
+			self.__disconnected()
+			return
+
+		if name in ("registered", "notregistered"):
+			self.reconnectAttempts = 0
+
+		if name == "registered":
+			# The server selects one of the compression methods in our capabilities
+			compression = message.argument(0).dictVal.get('compression', None)
+			compression = compression.stringVal if compression is not None else None
+			if compression in ServerConnection.COMPRESSION_METHODS:
+				self.conn.compression = compression
+			else:
+				self.conn.compression = None
+
+		if name == "command":
+			# Extract ACK and handle it
+			args = message.argument(0).dictVal
+			if 'ACK' in args:
+				msg = LiveMessage("ACK")
+				msg.append(args['ACK'].intVal)
+				self.send(msg)
+
+		self.handleMessage(message)
+
 	def isConnected(self):
 		return self.connected
 
@@ -162,62 +176,67 @@ class TelldusLive(Plugin):
 
 	def run(self):
 		self.running = True
-
-		wait = 0
-		pongTimer, self.pingTimer = (0, 0)
 		while self.running:
-			if wait > 0:
-				wait = wait - 1
-				time.sleep(1)
+			now = time.time()
+			if self.reconnectAt > now:
+				self.conn.wait(self.reconnectAt - now)
 				continue
-			state = self.conn.process()
+			state = self.conn.process(self.__nextTimeout(now))
 			if state == ServerConnection.CLOSED:
 				server = self.serverList.popServer()
 				if not server:
-					wait = random.randint(60, 300)
-					logging.warning("No servers found, retry in %i seconds", wait)
+					self.__scheduleReconnect("No servers found", TelldusLive.NO_SERVERS_DELAY)
 					continue
 				if not self.conn.connect(server['address'], int(server['port'])):
-					wait = random.randint(60, 300)
-					logging.warning("Could not connect, retry in %i seconds", wait)
+					self.__scheduleReconnect("Could not connect", TelldusLive.NO_SERVERS_DELAY)
 
 			elif state == ServerConnection.CONNECTED:
-				if (pongTimer + 43200) < time.time():
+				if (self.pongTimer + 43200) < time.time():
 					# 12 hours since last online
 					self.refreshRequired = True
-				pongTimer, self.pingTimer = (time.time(), time.time())
+				self.pongTimer, self.pingTimer = (time.time(), time.time())
 				self.__sendRegisterMessage()
 
 			elif state == ServerConnection.MSG_RECEIVED:
+				self.pongTimer = time.time()
 				msg = self.conn.popMessage()
-				if msg is None:
-					continue
-				pongTimer = time.time()
-				self.handleMessage(msg)
+				while msg is not None:
+					self.dispatchMessage(msg)
+					msg = self.conn.popMessage()
 
 			elif state == ServerConnection.DISCONNECTED:
-				wait = random.randint(10, 50)
-				logging.warning("Disconnected, reconnect in %i seconds", wait)
+				self.__scheduleReconnect("Disconnected")
 				self.__disconnected()
 
 			else:
-				if (time.time() - pongTimer >= 360):  # No pong received
+				if (time.time() - self.pongTimer >= TelldusLive.PONG_TIMEOUT):  # No pong received
 					self.conn.close()
-					wait = random.randint(10, 50)
-					logging.warning("No pong received, disconnecting. Reconnect in %i seconds", wait)
+					self.__scheduleReconnect("No pong received, disconnecting")
 					self.__disconnected()
-				elif (time.time() - self.pingTimer >= 120):
+				elif (time.time() - self.pingTimer >= TelldusLive.PING_INTERVAL):
 					# Time to ping
 					self.conn.send(LiveMessage("Ping"))
 					self.pingTimer = time.time()
 
 	def stop(self):
 		self.running = False
+		self.conn.wakeup()
+
+	def popUnsent(self):
+		"""
+		:returns: a list with the messages that were not sent before the connection was lost.
+		          Each message is only returned once.
+		"""
+		return self.conn.popUnsent()
 
 	def send(self, message):
 		self.conn.send(message)
 		self.pingTimer = time.time()
 
+	def statistics(self):
+		""":returns: a dict with metrics for the messages sent to Live!"""
+		return self.conn.statistics()
+
 	def pushToWeb(self, module, action, data):
 		msg = LiveMessage("sendToWeb")
 		msg.append(module)
@@ -225,6 +244,24 @@ class TelldusLive(Plugin):
 		msg.append(data)
 		self.send(msg)
 
+	def __nextTimeout(self, now):
+		"""Returns the time until a ping must be sent or the pong times out"""
+		return min(
+			self.pingTimer + TelldusLive.PING_INTERVAL,
+			self.pongTimer + TelldusLive.PONG_TIMEOUT
+		) - now
+
+	def __scheduleReconnect(self, reason, minimum=0):
+		# Exponential backoff with jitter to not have all clients reconnect at the same time
+		delay = min(
+			TelldusLive.RECONNECT_MAX,
+			TelldusLive.RECONNECT_MIN * 2 ** min(self.reconnectAttempts, 10)
+		)
+		delay = max(minimum, random.uniform(delay / 2.0, delay))
+		self.reconnectAttempts = self.reconnectAttempts + 1
+		self.reconnectAt = time.time() + delay
+		logging.warning("%s, reconnect in %i seconds", reason, delay)
+
 	def __disconnected(self):
 		self.email = ''
 		self.connected = False
@@ -256,23 +293,18 @@ class TelldusLive(Plugin):
 			'protocol': 3,
 			'version': Board.firmwareVersion(),
 			'os': 'linux',
-			'os-version': 'telldus'
+			'os-version': 'telldus',
+			'capabilities': {
+				# Accepts report-ack and can send DevicesReportDelta/SensorsReportDelta
+				'deltaReport': 1,
+				# Large messages may be sent in a compressed envelope
+				'compression': list(ServerConnection.COMPRESSION_METHODS),
+			},
 		})
 		self.conn.send(msg)
 
 	@staticmethod
 	def deviceSpecificEncrypt(payload):
 		# TODO: Use security plugin once available
-		password = Board.secret()
 		iv = os.urandom(16)  # pylint: disable=C0103
-		key = PBKDF2(password, iv).read(32)
-		encryptor = AES.new(key, AES.MODE_CBC, iv)
-
-		buff = StringIO()
-		buff.write(struct.pack('<Q', len(payload)))
-		buff.write(iv)
-		if len(payload) % 16 != 0:
-			# Pad payload
-			payload += ' ' * (16 - len(payload) % 16)
-		buff.write(encryptor.encrypt(payload))
-		return buff.getvalue()
+		return ''.join(ConfigBackup.encrypt(StringIO(payload), len(payload), Board.secret(), iv))
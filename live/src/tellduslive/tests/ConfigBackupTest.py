@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import bz2
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+from Crypto.Cipher import AES
+from mock import MagicMock, patch
+from pbkdf2 import PBKDF2
+import requests
+
+from board import Board
+from ..base import TelldusLive
+from ..base.ConfigBackup import ConfigBackup
+
+def decrypt(data, password):
+	(length,) = struct.unpack('<Q', data[:8])
+	iv = data[8:24]  # pylint: disable=C0103
+	decryptor = AES.new(PBKDF2(password, iv).read(32), AES.MODE_CBC, iv)
+	return decryptor.decrypt(data[24:])[:length]
+
+class ConfigBackupTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.path = os.path.join(self.directory, 'Telldus.conf')
+		self.backup = ConfigBackup(os.path.join(self.directory, 'ConfigBackup.sha1'))
+		self.uploaded = []
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	def post(self, url, data, headers):
+		# Sent with a Content-Length, not chunked
+		prepared = requests.Request('POST', url, data=data, headers=headers).prepare()
+		self.assertNotIn('Transfer-Encoding', prepared.headers)
+		boundary = headers['Content-Type'].split('boundary=')[1]
+		# Read the same way as httplib
+		body = ''.join(iter(lambda: data.read(8192), ''))
+		self.assertEqual(prepared.headers['Content-Length'], str(len(body)))
+		self.assertTrue(body.endswith('\r\n--%s--\r\n' % boundary))
+		(form, payload) = body[:-len(boundary) - 8].split('\r\n\r\n', 2)[1:]
+		self.assertTrue(form.startswith('000000000000\r\n'))
+		self.uploaded.append(payload)
+		return MagicMock()
+
+	def testEncrypt(self):
+		payload = os.urandom(ConfigBackup.CHUNK_SIZE * 2 + 5)
+		encrypted = TelldusLive.deviceSpecificEncrypt(payload)
+		self.assertEqual(len(encrypted), 24 + len(payload) + 11)
+		self.assertEqual(decrypt(encrypted, Board.secret()), payload)
+
+	def testUpload(self):
+		content = ''.join('[section%i]\nvalue = %i\n' % (i, i) for i in range(5000))
+		with open(self.path, 'w') as fd:
+			fd.write(content)
+		with patch('requests.post', side_effect=self.post), \
+		     patch.object(Board, 'getMacAddr', return_value='000000000000'):
+			self.assertTrue(self.backup.upload(self.path))
+			self.assertEqual(len(self.uploaded), 1)
+			self.assertEqual(bz2.decompress(decrypt(self.uploaded[0], Board.secret())), content)
+			# Not changed, also after a restart
+			self.assertTrue(ConfigBackup(self.backup.hashFilename).upload(self.path))
+			self.assertEqual(len(self.uploaded), 1)
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+import Queue
+import socket
+import threading
+
+from ..base import LiveMessage
+from ..base.FrameDecoder import FrameDecoder
+
+class FakeLiveServer(object):
+	"""
+	A local stand-in for a Telldus Live! server. It accepts one unencrypted connection at a
+	time and records the messages received from the client.
+	"""
+
+	def __init__(self, privateKey):
+		self.privateKey = privateKey
+		self.received = Queue.Queue()
+		self.conn = None
+		self.connections = 0
+		self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+		self.socket.bind(('127.0.0.1', 0))
+		self.socket.listen(1)
+		self.thread = threading.Thread(target=self.run)
+		self.thread.daemon = True
+		self.thread.start()
+
+	def address(self):
+		"""Returns the server as returned from ServerList.popServer()"""
+		# ServerConnection adds 2 to the port for unencrypted connections
+		return {'address': '127.0.0.1', 'port': str(self.socket.getsockname()[1] - 2)}
+
+	def close(self):
+		self.disconnect()
+		self.socket.close()
+
+	def disconnect(self):
+		conn, self.conn = self.conn, None
+		if conn is not None:
+			try:
+				conn.shutdown(socket.SHUT_RDWR)
+			except socket.error as __error:
+				pass
+			conn.close()
+
+	def receive(self, name, timeout=5):
+		"""Wait for a message named `name`. Other messages are skipped."""
+		while True:
+			msg = self.received.get(timeout=timeout)
+			if msg.name() == name.lower():
+				return msg
+
+	def run(self):
+		while True:
+			try:
+				conn, __address = self.socket.accept()
+			except socket.error as __error:
+				return
+			self.conn = conn
+			self.connections = self.connections + 1
+			decoder = FrameDecoder()
+			while True:
+				try:
+					data = conn.recv(65536)
+				except socket.error as __error:
+					break
+				if data == '':
+					break
+				decoder.feed(data)
+				for frame in decoder.frames():
+					msg = LiveMessage.fromSignedMessage(frame, 'sha1', self.privateKey)
+					if msg is not None:
+						self.received.put(msg)
+
+	def send(self, msg):
+		self.conn.sendall(msg.toSignedMessage('sha1', self.privateKey))
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+
+from ..base import LiveMessage
+from ..base.FrameDecoder import FrameDecoder
+
+def signedMessage(rand, i):
+	msg = LiveMessage('Test')
+	msg.append(i)
+	msg.append('x' * rand.randint(0, 70000))
+	return msg.toSignedMessage('sha1', 'secret')
+
+class FrameDecoderTest(unittest.TestCase):
+	def testSplit(self):
+		rand = random.Random(4715)
+		messages = [signedMessage(rand, i) for i in range(30)]
+		# Add padding after one of the messages
+		messages[10] = messages[10] + '='
+		stream = ''.join(messages)
+		for _ in range(10):
+			decoder = FrameDecoder()
+			received = []
+			start = 0
+			while start < len(stream):
+				end = start + rand.choice([1, 7, 1024, 16384, 65536, 200000])
+				decoder.feed(stream[start:end])
+				received.extend(decoder.frames())
+				start = end
+			self.assertEqual(len(decoder), 0)
+			self.assertEqual(len(received), len(messages))
+			for i, frame in enumerate(received):
+				msg = LiveMessage.fromSignedMessage(frame, 'sha1', 'secret')
+				self.assertEqual(msg.argument(0).intVal, i)
+				self.assertEqual(frame, messages[i].rstrip('='))
+
+	def testInvalid(self):
+		decoder = FrameDecoder()
+		decoder.feed('28:')
+		self.assertEqual(decoder.frames(), [])
+		decoder = FrameDecoder()
+		decoder.feed('HTTP/1.1 400 Bad Request')
+		self.assertRaises(ValueError, decoder.frames)
+		decoder = FrameDecoder()
+		decoder.feed('1:xFFFFFFF:')
+		self.assertRaises(ValueError, decoder.frames)
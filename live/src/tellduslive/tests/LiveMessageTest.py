@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+import binascii
+import random
+import unittest
+
+import six
+
+from ..base import LiveMessage
+from ..base.LiveMessageToken import LiveMessageToken
+
+# run this with python -m unittest tellduslive.tests in the tellstick.sh-shell
+
+def randomString(rand, alphabet):
+	return ''.join(rand.choice(alphabet) for _ in range(rand.randint(0, 20)))
+
+def randomValue(rand, depth=0):
+	kind = rand.randint(0, 6 if depth < 4 else 3)
+	if kind == 0:
+		return rand.randint(-2**40, 2**40)
+	if kind == 1:
+		# Include the characters used as delimiters in the format
+		return randomString(rand, 'ailhsu:0123456789ABCDEF \n\x00\xff')
+	if kind == 2:
+		return six.text_type(randomString(rand, u'abcåäö€ :s'))
+	if kind == 3:
+		return rand.choice([True, False, 1.5, -0.25, None])
+	if kind == 4:
+		return [randomValue(rand, depth + 1) for _ in range(rand.randint(0, 5))]
+	return dict(
+		(randomString(rand, 'abcs:0123'), randomValue(rand, depth + 1))
+		for _ in range(rand.randint(0, 5))
+	)
+
+def expected(value):
+	"""The value as it is expected to be decoded"""
+	if isinstance(value, bool):
+		return int(value)
+	if isinstance(value, float):
+		return str(value)
+	if value is None:
+		return ''
+	if isinstance(value, list):
+		return [expected(x) for x in value]
+	if isinstance(value, dict):
+		return dict((str(key), expected(x)) for key, x in value.items())
+	return value
+
+class LiveMessageTest(unittest.TestCase):
+	def testWireFormat(self):
+		msg = LiveMessage('Test')
+		msg.append(255)
+		msg.append('abc')
+		msg.append([1, -1, ''])
+		msg.append({'key': True})
+		msg.append(u'å')
+		self.assertEqual(msg.toByteArray(), '4:TestiFFs3:abcli1si-1s0:sh3:keyi1ssu4:w6U=')
+
+	def testRoundTrip(self):
+		rand = random.Random(4711)
+		for _ in range(500):
+			values = [randomValue(rand) for _ in range(rand.randint(1, 3))]
+			msg = LiveMessage('Name')
+			for value in values:
+				msg.append(value)
+			decoded = LiveMessage.fromByteArray(msg.toByteArray())
+			self.assertEqual(decoded.name(), 'name')
+			self.assertEqual(decoded.count(), len(values))
+			for i, value in enumerate(values):
+				self.assertEqual(decoded.argument(i).toNative(), expected(value))
+			# Encoding the decoded message again must not change it. The order of the dict items
+			# may differ.
+			decoded = LiveMessage.fromByteArray(decoded.toByteArray())
+			for i, value in enumerate(values):
+				self.assertEqual(decoded.argument(i).toNative(), expected(value))
+
+	def testSignedMessage(self):
+		msg = LiveMessage('Test')
+		msg.append({'list': range(100)})
+		envelope = LiveMessage.fromByteArray(msg.toSignedMessage('sha1', 'secret'))
+		self.assertTrue(envelope.verifySignature('sha1', 'secret'))
+		self.assertFalse(envelope.verifySignature('sha1', 'wrong'))
+		inner = LiveMessage.fromByteArray(envelope.argument(0).stringVal)
+		self.assertEqual(inner.argument(0).toNative(), {'list': range(100)})
+
+	def testLazy(self):
+		rand = random.Random(4712)
+		for _ in range(200):
+			msg = LiveMessage('Name')
+			for _ in range(rand.randint(1, 3)):
+				msg.append(randomValue(rand))
+			raw = msg.toByteArray()
+			# Damage some of the messages
+			if rand.randint(0, 3) == 0:
+				raw = raw[:rand.randint(0, len(raw))]
+			try:
+				eager = LiveMessage.fromByteArray(raw)
+			except (binascii.Error, UnicodeDecodeError):
+				# Truncated base64 strings cannot be decoded
+				continue
+			lazy = LiveMessage.fromByteArray(raw, lazy=True)
+			self.assertEqual(lazy.count(), eager.count())
+			# Arguments not accessed are copied as is
+			self.assertTrue(raw.startswith(LiveMessage.fromByteArray(raw, lazy=True).toByteArray()))
+			self.assertEqual(lazy.name(), eager.name())
+			for i in range(eager.count()):
+				self.assertEqual(lazy.argument(i).toNative(), eager.argument(i).toNative())
+
+	def testSkipToken(self):
+		rand = random.Random(4713)
+		for _ in range(200):
+			raw = LiveMessageToken(randomValue(rand)).toByteArray()
+			raw = raw[:rand.randint(0, len(raw))]
+			try:
+				(offset, token) = LiveMessageToken.parseToken(raw, 0)
+			except (binascii.Error, UnicodeDecodeError):
+				continue
+			self.assertEqual(LiveMessageToken.skipToken(raw, 0), (offset, token.valueType))
+
+	def testFromSignedMessage(self):
+		msg = LiveMessage('Test')
+		msg.append({'list': range(100)})
+		signed = msg.toSignedMessage('sha1', 'secret')
+		self.assertIsNone(LiveMessage.fromSignedMessage(signed, 'sha1', 'wrong'))
+		self.assertIsNone(LiveMessage.fromSignedMessage(signed[:-1], 'sha1', 'secret'))
+		self.assertIsNone(LiveMessage.fromSignedMessage('', 'sha1', 'secret'))
+		received = LiveMessage.fromSignedMessage(signed, 'sha1', 'secret')
+		self.assertEqual(received.name(), 'test')
+		self.assertEqual(received.argument(0).toNative(), {'list': range(100)})
+		self.assertEqual(received.toByteArray(), msg.toByteArray())
+
+	def testEncodeValue(self):
+		rand = random.Random(4714)
+		for _ in range(200):
+			value = randomValue(rand)
+			parts = []
+			LiveMessageToken.encodeValue(value, parts.append)
+			(offset, token) = LiveMessageToken.parseToken(''.join(parts), 0)
+			self.assertEqual(offset, len(LiveMessageToken(value).toByteArray()))
+			self.assertEqual(token.toNative(), expected(value))
+
+	def testAppendToDecoded(self):
+		msg = LiveMessage('Test')
+		msg.append(1)
+		for decoded in (LiveMessage.fromByteArray(msg.toByteArray()), LiveMessage.fromByteArray(msg.toByteArray(), lazy=True)):
+			decoded.append([2])
+			self.assertEqual(decoded.count(), 2)
+			self.assertEqual(decoded.argument(0).intVal, 1)
+			self.assertEqual(decoded.argument(1).toNative(), [2])
+			self.assertEqual(decoded.toByteArray(), '4:Testi1sli2ss')
+
+	def testTruncated(self):
+		raw = LiveMessage('Test')
+		raw.append([1, 'abc', {'a': 2}])
+		raw = raw.toByteArray()
+		for i in range(len(raw)):
+			# Must not raise
+			LiveMessage.fromByteArray(raw[:i])
+		(offset, token) = LiveMessageToken.parseToken('iXYZs', 0)
+		self.assertEqual(token.valueType, LiveMessageToken.TYPE_INVALID)
+		self.assertEqual(offset, 1)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import socket
+import unittest
+
+from base import Application
+from ..base import LiveMessage
+from ..base.SendQueue import SendQueue
+from ..base.ServerConnection import ServerConnection
+
+def sensorEvent(sensorId, value):
+	msg = LiveMessage('SensorEvent')
+	msg.append({'sensor_id': sensorId})
+	msg.append([{'type': 1, 'value': value}])
+	return msg
+
+def names(queue):
+	retval = []
+	while True:
+		entry = queue.pop()
+		if entry is None:
+			return retval
+		retval.append(entry.msg.name())
+
+class SendQueueTest(unittest.TestCase):
+	def testCoalesce(self):
+		queue = SendQueue()
+		queue.put(sensorEvent(1, '20'))
+		queue.put(LiveMessage('DeviceEvent'))
+		queue.put(sensorEvent(2, '30'))
+		queue.put(sensorEvent(1, '21'))
+		self.assertEqual(len(queue), 3)
+		# DeviceEvent has higher priority. The newer sensor event keeps the position of the first
+		entry = queue.pop()
+		self.assertEqual(entry.msg.name(), 'deviceevent')
+		entry = queue.pop()
+		self.assertEqual(entry.msg.argument(1).toNative(), [{'type': 1, 'value': '21'}])
+		self.assertEqual(queue.statistics()['coalesced'], 1)
+		# Popped messages are not coalesced anymore
+		queue.put(sensorEvent(1, '22'))
+		self.assertEqual(len(queue), 2)
+
+	def testClear(self):
+		queue = SendQueue()
+		queue.put(sensorEvent(1, '20'), now=1)
+		queue.put(LiveMessage('DeviceEvent'), now=2)
+		queue.put(sensorEvent(1, '21'), now=3)
+		# Returned in the order they were queued, not by priority
+		self.assertEqual([msg.name() for msg in queue.clear()], ['sensorevent', 'deviceevent'])
+		self.assertEqual(len(queue), 0)
+		self.assertEqual(queue.statistics()['dropped'], 2)
+
+	def testPriority(self):
+		queue = SendQueue(maxSize=3)
+		self.assertTrue(queue.put(sensorEvent(1, '20')))
+		self.assertTrue(queue.put(LiveMessage('DeviceEvent')))
+		self.assertTrue(queue.put(LiveMessage('Register')))
+		# Full, the sensor event is dropped
+		self.assertTrue(queue.put(LiveMessage('DeviceAdded')))
+		# Full, nothing with lower priority to drop
+		self.assertFalse(queue.put(sensorEvent(2, '20')))
+		self.assertEqual(names(queue), ['register', 'deviceevent', 'deviceadded'])
+		statistics = queue.statistics()
+		self.assertEqual(statistics['dropped'], 2)
+		self.assertEqual(statistics['maxDepth'], 3)
+
+	def testServerConnection(self):
+		Application(run=False)
+		local, remote = socket.socketpair()
+		conn = ServerConnection()
+		conn.useSSL = False
+		conn.privateKey = 'secret'
+		conn.socket = local
+		conn.state = ServerConnection.CONNECTED
+		self.assertEqual(conn.process(), ServerConnection.READY)
+		for i in range(100):
+			self.assertTrue(conn.send(sensorEvent(i % 10, str(i))))
+		conn.send(LiveMessage('Ping'))
+		self.assertEqual(conn.process(), ServerConnection.READY)
+		statistics = conn.statistics()
+		self.assertEqual(statistics['depth'], 0)
+		self.assertEqual(statistics['sent'], 11)
+		data = ''
+		while len(data) < statistics['bytesSent']:
+			data = data + remote.recv(65536)
+		# The ping is sent first
+		envelope = LiveMessage.fromByteArray(data)
+		self.assertTrue(envelope.verifySignature('sha1', 'secret'))
+		self.assertEqual(LiveMessage.fromByteArray(envelope.argument(0).stringVal).name(), 'ping')
+		conn.send(LiveMessage('DeviceEvent'))
+		conn.close()
+		remote.close()
+		self.assertFalse(conn.send(LiveMessage('Ping')))
+		# Kept to be sent after reconnecting
+		self.assertEqual([msg.name() for msg in conn.popUnsent()], ['deviceevent'])
+		self.assertEqual(conn.popUnsent(), [])
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import socket
+import unittest
+import zlib
+
+from base import Application
+from ..base import LiveMessage
+from ..base.FrameDecoder import FrameDecoder
+from ..base.ServerConnection import ServerConnection
+
+class ServerConnectionTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.remote, local = socket.socketpair()
+		self.conn = ServerConnection()
+		self.conn.useSSL = False
+		self.conn.privateKey = 'secret'
+		self.conn.socket = local
+		self.conn.state = ServerConnection.CONNECTED
+		self.conn.process()
+
+	def tearDown(self):
+		self.conn.close()
+		self.remote.close()
+
+	def receive(self, count):
+		decoder = FrameDecoder()
+		frames = []
+		while len(frames) < count:
+			decoder.feed(self.remote.recv(65536))
+			frames.extend(decoder.frames())
+		return [LiveMessage.fromSignedMessage(frame, 'sha1', 'secret') for frame in frames]
+
+	def testCompressOutgoing(self):
+		report = LiveMessage('DevicesReport')
+		report.append([{'id': i, 'name': 'Device %i' % i} for i in range(500)])
+		self.conn.send(report)
+		self.conn.process(0)
+		# Not negotiated
+		self.assertEqual(self.receive(1)[0].toByteArray(), report.toByteArray())
+
+		self.conn.compression = 'zlib'
+		self.conn.send(report)
+		self.conn.send(LiveMessage('Ping'))
+		self.conn.process(0)
+		(ping, compressed) = self.receive(2)
+		self.assertEqual(ping.name(), 'ping')
+		self.assertEqual(compressed.name(), 'compressed')
+		self.assertEqual(compressed.argument(0).stringVal, 'zlib')
+		self.assertEqual(zlib.decompress(compressed.argument(1).stringVal), report.toByteArray())
+		statistics = self.conn.statistics()
+		self.assertEqual(statistics['compressed'], 1)
+		self.assertLess(statistics['bytesAfterCompression'], statistics['bytesBeforeCompression'])
+
+	def testDecompressIncoming(self):
+		report = LiveMessage('events-report')
+		report.append({'1': {'name': 'Event'}})
+		msg = LiveMessage('compressed')
+		msg.append('zlib')
+		msg.append(zlib.compress(report.toByteArray()))
+		self.remote.sendall(msg.toSignedMessage('sha1', 'secret'))
+		broken = LiveMessage('compressed')
+		broken.append('zlib')
+		broken.append('not compressed')
+		self.remote.sendall(broken.toSignedMessage('sha1', 'secret'))
+		self.assertEqual(self.conn.process(1), ServerConnection.MSG_RECEIVED)
+		received = self.conn.popMessage()
+		self.assertEqual(received.name(), 'events-report')
+		self.assertEqual(received.argument(0).toNative(), {'1': {'name': 'Event'}})
+		self.assertIsNone(self.conn.popMessage())
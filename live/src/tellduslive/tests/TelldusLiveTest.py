@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import time
+import unittest
+
+from mock import patch
+
+from base import Application, PluginContext
+from board import Board
+from ..base import LiveMessage, TelldusLive
+from .FakeLiveServer import FakeLiveServer
+
+class TelldusLiveTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.server = FakeLiveServer('secret')
+		self.patchers = [
+			patch.object(Board, 'firmwareVersion', return_value='1.0'),
+			patch.object(TelldusLive, 'RECONNECT_MIN', 0.1),
+		]
+		for patcher in self.patchers:
+			patcher.start()
+		self.live = TelldusLive(PluginContext())
+		self.live.conn.useSSL = False
+		self.live.conn.publicKey = 'public'
+		self.live.conn.privateKey = 'secret'
+		self.live.serverList.popServer = self.server.address
+		self.live.thread.start()
+
+	def tearDown(self):
+		began = time.time()
+		self.live.stop()
+		self.live.thread.join(5)
+		self.assertFalse(self.live.thread.isAlive())
+		# The connection thread must wake up directly
+		self.assertLess(time.time() - began, 1)
+		self.live.conn.close()
+		self.server.close()
+		for patcher in self.patchers:
+			patcher.stop()
+
+	def testAck(self):
+		register = self.server.receive('Register')
+		self.assertEqual(register.argument(0).dictVal['key'].stringVal, 'public')
+		msg = LiveMessage('command')
+		msg.append({'ACK': 42, 'action': 'turnon'})
+		self.server.send(msg)
+		# The main loop is not running, ACK is sent directly from the connection thread
+		self.assertEqual(self.server.receive('ACK').argument(0).intVal, 42)
+
+	def testReconnect(self):
+		self.server.receive('Register')
+		self.server.disconnect()
+		self.server.receive('Register')
+		self.assertEqual(self.server.connections, 2)
+		self.assertEqual(self.live.reconnectAttempts, 1)
+		# The server asks the client to reconnect
+		self.server.send(LiveMessage('disconnect'))
+		self.server.receive('Register')
+		self.assertEqual(self.server.connections, 3)
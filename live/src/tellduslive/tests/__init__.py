@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+from .ConfigBackupTest import ConfigBackupTest
+from .FrameDecoderTest import FrameDecoderTest
+from .LiveMessageTest import LiveMessageTest
+from .SendQueueTest import SendQueueTest
+from .ServerConnectionTest import ServerConnectionTest
+from .TelldusLiveTest import TelldusLiveTest
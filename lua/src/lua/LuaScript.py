@@ -2,11 +2,11 @@
 
 import logging
 import os
-from threading import Thread, Condition, Lock, Timer
+from threading import Thread, Condition, Lock
 import types
 import weakref
 
-from base import Application
+from base import Application, TimerService
 from web.base import Server
 from lupa import LuaRuntime, lua_type
 
@@ -93,8 +93,7 @@ class SleepingLuaThread(LuaThread):
 			self.timer.cancel()
 
 	def start(self, callback):
-		self.timer = Timer(self.milliseconds/1000.0, callback)
-		self.timer.start()
+		self.timer = TimerService().callLater(self.milliseconds/1000.0, callback)
 
 class LuaFunctionWrapper(object):
 	def __init__(self, script, cb):
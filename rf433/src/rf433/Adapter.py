@@ -2,7 +2,10 @@
 
 from base import Application
 import fcntl, os, select, serial, threading, time
+from CommandQueue import CommandQueue
+from LineBuffer import LineBuffer
 from RF433Msg import RF433Msg
+from PacketFilter import PacketFilter
 import logging
 try:
 	from pkg_resources import resource_filename
@@ -13,15 +16,17 @@ except ImportError:
 
 class Adapter(threading.Thread):
 	BOOTLOADER_START = 0x7A00
+	READ_SIZE = 4096  #: Maximum bytes read from the serial port at a time
 
 	def __init__(self, handler, dev):
 		super(Adapter,self).__init__()
 		self.handler = handler
 		self.devUrl = dev
 		self.dev = None
-		self.__queue = []
+		self.commandQueue = CommandQueue()
 		self.__waitForResponse = None
 		self.waitingForData = False
+		self.packetFilter = PacketFilter()
 		Application().registerShutdown(self.__stop)
 		(self.readPipe, self.writePipe) = os.pipe()
 		fl = fcntl.fcntl(self.readPipe, fcntl.F_GETFL)
@@ -29,7 +34,9 @@ class Adapter(threading.Thread):
 		self.start()
 
 	def queue(self, msg):
-		self.__queue.append(msg)
+		if not self.commandQueue.put(msg):
+			# Already waiting in the queue
+			return
 		if self.waitingForData:
 			# Abort current read
 			os.write(self.writePipe, 'w')
@@ -37,55 +44,44 @@ class Adapter(threading.Thread):
 	def run(self):
 		self.running = True
 		app = Application()
-		buffer = ''
-		ttl = None
-		state = 0
+		lineBuffer = LineBuffer()
 
 		while self.running:
 			if self.dev is None:
 				time.sleep(1)
 				try:
 					self.dev = serial.serial_for_url(self.devUrl, 115200, timeout=0)
+					lineBuffer = LineBuffer()
 				except Exception as e:
 					self.dev = None
 				continue
 
-			if state == 0:
-				x = self.__readByte(interruptable=True)
-				if x == '':
-					if self.__waitForResponse is not None and self.__waitForResponse.queued + 5 < time.time():
-						self.__waitForResponse.timeout()
-						self.__waitForResponse = None
-					if len(self.__queue) and self.__waitForResponse is None:
-						state = 1
-					continue
-				if x == '\r':
-					continue
-				if x == '+':
-					# Start of data
-					buffer = ''
+			waiting = self.__waitForResponse
+			if waiting is not None and waiting.sent + waiting.responseTimeout <= time.time():
+				self.commandQueue.timedOut(waiting)
+				waiting.timeout()
+				self.__waitForResponse = None
+			if self.__waitForResponse is None:
+				msg = self.commandQueue.pop()
+				if msg is not None:
+					self.__send(msg.commandString())
+					msg.sent = time.time()
+					self.__waitForResponse = msg
+
+			for frame in lineBuffer.feed(self.__read()):
+				(cmd, params) = RF433Msg.parseResponse(frame)
+				if cmd is None:
 					continue
-				if x == '\n':
-					(cmd, params) = RF433Msg.parseResponse(buffer)
-					if cmd is None:
+				if self.__waitForResponse is not None:
+					if cmd == self.__waitForResponse.cmd():
+						self.commandQueue.done(self.__waitForResponse)
+						self.__waitForResponse.response(params)
+						self.__waitForResponse = None
 						continue
-					if self.__waitForResponse is not None:
-						if cmd == self.__waitForResponse.cmd():
-							self.__waitForResponse.response(params)
-							self.__waitForResponse = None
-							continue
-					app.queue(self.handler.decodeData, cmd, params)
+				if cmd == 'W' and params.get('class') == 'sensor' and not self.packetFilter.accept(params):
+					# Retransmission of a sensor packet already queued
 					continue
-				buffer = buffer + x
-
-			elif state == 1:
-				if len(self.__queue) == 0:
-					state = 0
-					continue
-				self.__waitForResponse = self.__queue.pop(0)
-				self.__send(self.__waitForResponse.commandString())
-				self.__waitForResponse.queued = time.time()
-				state = 0
+				app.queue(self.handler.decodeData, cmd, params)
 
 	def __stop(self):
 		self.running = False
@@ -93,29 +89,34 @@ class Adapter(threading.Thread):
 			# Abort current read
 			os.write(self.writePipe, 'w')
 
-	def __readByte(self, interruptable = False):
+	def __read(self):
+		"""Wait for data and read everything available from the serial port"""
 		try:
-			if interruptable:
-				self.waitingForData = True
-				i = [self.dev.fileno(), self.readPipe]
+			self.waitingForData = True
+			timeout = 1
+			if self.__waitForResponse is None:
+				if len(self.commandQueue):
+					# Queued while sending
+					return ''
 			else:
-				i = [self.dev.fileno()]
-			r, w, e = select.select(i, [], [], 1)
+				# Wake up in time for the timeout of the sent command
+				deadline = self.__waitForResponse.sent + self.__waitForResponse.responseTimeout
+				timeout = max(0, min(timeout, deadline - time.time()))
+			r, w, e = select.select([self.dev.fileno(), self.readPipe], [], [], timeout)
+			if self.readPipe in r:
+				try:
+					while True:
+						t = os.read(self.readPipe, 1)
+				except Exception as e:
+					pass
 			if self.dev.fileno() in r:
 				try:
-					return self.dev.read()
+					return self.dev.read(Adapter.READ_SIZE)
 				except serial.SerialException as e:
 					self.dev.close()
 					self.dev = None
 					logging.warning('Serial port lost')
 					logging.exception(e)
-					return ''
-			if self.readPipe in r:
-				try:
-					while True:
-						t = os.read(self.readPipe, 1)
-				except Exception as e:
-					pass
 			return ''
 		finally:
 			self.waitingForData = False
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+import linecache
+
+# Multiplier for appending the decimal digits of a nibble, a nibble above 9 is two digits
+SCALE = (10,) * 10 + (100,) * 6
+
+# Numbers the generated functions, the filenames in tracebacks must be unique
+_COMPILED = itertools.count(1)
+
+class BitLayout(object):
+	"""
+	Describes the fields in a sensor payload. Every field is either a tuple
+	(name, offset, width), where offset is the number of bits from the least significant bit,
+	or a Digits.
+
+	The layout and the checksum are compiled into functions where every bit field is only
+	extracted once, also when the checksum uses it. See compile(). The generated source shows
+	up in tracebacks and the debugger as the file <BitLayout name #n>.
+	"""
+
+	def __init__(self, fields, checksum=None):
+		self.fields = fields
+		self.checksum = checksum  #: Callable returning False if the payload is corrupt
+		self.__statements = []
+		self.__locals = {}
+		self.__values = []
+		for field in fields:
+			if isinstance(field, Digits):
+				self.__values.append((field.name, field.expression(self.__nibble)))
+			else:
+				(name, offset, width) = field
+				self.__values.append((name, self.__local(offset, width)))
+		if isinstance(checksum, NibbleSum):
+			self.__condition = checksum.expression(self.__nibble)
+		elif checksum is not None:
+			self.__condition = 'checksum(value)'
+		else:
+			self.__condition = None
+		self.decode = self.compile()
+
+	def compile(self, handler=None, invalid=None, **constants):
+		"""
+		Compiles the layout. Without `handler` the function is decode(value) returning a dict
+		with the fields or None if the checksum is wrong.
+
+		With `handler` the function is decode(obj, data, value) returning
+		handler(obj, data, ...) where the rest of the arguments of `handler` are the fields and
+		`constants` with the same names. The constants must be literals, like strings. If the
+		checksum is wrong it returns invalid(obj, data, value), or None if not set. This lets a
+		protocol decode straight into its methods.
+		"""
+		if handler is None:
+			lines = ['def decode(value):']
+			failure = 'None'
+			result = '{%s}' % ', '.join(['%r: %s' % x for x in self.__values])
+		else:
+			values = dict(self.__values)
+			values.update([(name, repr(constants[name])) for name in constants])
+			code = handler.__code__
+			arguments = code.co_varnames[2:code.co_argcount]
+			if sorted(arguments) != sorted(values):
+				raise ValueError(
+					'%s takes %s, not %s' % (handler.__name__, list(arguments), sorted(values))
+				)
+			lines = ['def decode(obj, data, value):']
+			failure = 'None' if invalid is None else 'invalid(obj, data, value)'
+			result = 'handler(obj, data, %s)' % ', '.join([values[name] for name in arguments])
+		lines.extend(self.__statements)
+		if self.__condition is not None:
+			lines.append('\tif not (%s):' % self.__condition)
+			lines.append('\t\treturn %s' % failure)
+		lines.append('\treturn %s' % result)
+		namespace = {
+			'SCALE': SCALE,
+			'checksum': self.checksum,
+			'handler': handler,
+			'invalid': invalid,
+		}
+		source = '\n'.join(lines) + '\n'
+		filename = '<BitLayout %s #%i>' % (
+			'decode' if handler is None else handler.__name__, next(_COMPILED)
+		)
+		# Keep the source so tracebacks can show the failing line
+		linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+		exec(compile(source, filename, 'exec'), namespace)  # pylint: disable=W0122
+		return namespace['decode']
+
+	def decodeAll(self, values):
+		""":returns: a list with the fields for every value in `values`, see decode()"""
+		decode = self.decode
+		return [decode(value) for value in values]
+
+	@staticmethod
+	def nibbles(names, checksum=None, fields=None):
+		"""
+		A layout where every field is a nibble, `names` starts with the least significant.
+		Additional fields, like Digits, may be added in `fields`.
+		"""
+		return BitLayout(
+			[(name, 4*i, 4) for i, name in enumerate(names) if name is not None] + (fields or []),
+			checksum
+		)
+
+	def __local(self, offset, width):
+		if (offset, width) not in self.__locals:
+			name = 'v%i' % len(self.__locals)
+			if offset == 0:
+				self.__statements.append('\t%s = value & %i' % (name, (1 << width) - 1))
+			else:
+				self.__statements.append(
+					'\t%s = (value >> %i) & %i' % (name, offset, (1 << width) - 1)
+				)
+			self.__locals[(offset, width)] = name
+		return self.__locals[(offset, width)]
+
+	def __nibble(self, position):
+		return self.__local(4*position, 4)
+
+class Digits(object):
+	"""
+	A field with the decimal digits of the nibbles at the positions in `nibbles`, the most
+	significant first. The last `decimals` nibbles are placed after the decimal point.
+	This is the same as int('%d%d' % nibbles) or float('%d%d.%d' % nibbles) without going
+	through a string.
+	"""
+
+	def __init__(self, name, nibbles, decimals=0):
+		self.name = name
+		self.nibbles = nibbles
+		self.decimals = decimals
+
+	def expression(self, nibble):
+		"""
+		:returns: the field as a Python expression, `nibble` returns the expression for the
+		nibble at a position
+		"""
+		names = [nibble(x) for x in self.nibbles]
+		retval = names[0]
+		for name in names[1:]:
+			retval = '(%s) * SCALE[%s] + %s' % (retval, name, name)
+		if self.decimals == 0:
+			return 'int(%s)' % retval
+		return '(%s) / float(%s)' % (
+			retval, ' * '.join(['SCALE[%s]' % name for name in names[-self.decimals:]])
+		)
+
+class NibbleSum(object):
+	"""
+	Checksum calculated as the sum of the nibbles at the positions in `nibbles` plus
+	`constant`. It is compared with the nibbles at the positions in `expected`, the most
+	significant first. Only the bits in `mask` are compared if it is set.
+	"""
+
+	def __init__(self, nibbles, constant, expected, mask=None):
+		self.nibbles = list(nibbles)
+		self.constant = constant
+		self.expected = expected
+		self.mask = mask
+
+	def __call__(self, value):
+		calculated = self.constant
+		for position in self.nibbles:
+			calculated += (value >> (4*position)) & 15
+		if self.mask is not None:
+			calculated &= self.mask
+		stored = 0
+		for position in self.expected:
+			stored = (stored << 4) | ((value >> (4*position)) & 15)
+		return calculated == stored
+
+	def expression(self, nibble):
+		"""
+		:returns: the comparison as a Python expression, `nibble` returns the expression for the
+		nibble at a position
+		"""
+		calculated = ' + '.join(['%i' % self.constant] + [nibble(x) for x in self.nibbles])
+		if self.mask is not None:
+			calculated = '((%s) & %i)' % (calculated, self.mask)
+		stored = ' | '.join([
+			'(%s << %i)' % (nibble(x), 4*(len(self.expected) - 1 - i))
+			for i, x in enumerate(self.expected)
+		])
+		return '%s == (%s)' % (calculated, stored)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from .Protocol import Protocol
+
+class CommandMatcher(object):
+	"""
+	Finds the devices an incoming command is for. The devices are kept in a table keyed by
+	protocol, model family and the values of the parameters the protocol addresses a device
+	with, e.g. house and unit. A device must be updated in the table every time its
+	parameters change.
+	"""
+
+	def __init__(self):
+		self.__table = {}  # (protocol, family, values) -> [devices]
+		self.__keys = {}  # id(device) -> key in the table
+
+	def __len__(self):
+		return len(self.__keys)
+
+	def match(self, msg):
+		""":returns: a list with the devices the decoded command `msg` is for"""
+		protocol = msg['protocol']
+		values = []
+		for parameter in Protocol.parametersForProtocol(protocol, msg['model']):
+			if parameter not in msg:
+				return []
+			values.append(msg[parameter])
+		key = (protocol, CommandMatcher.family(msg['model']), tuple(values))
+		return self.__table.get(key, [])
+
+	def remove(self, device):
+		"""Removes a device from the table"""
+		key = self.__keys.pop(id(device), None)
+		if key is None:
+			return
+		devices = [x for x in self.__table[key] if x is not device]
+		if devices:
+			self.__table[key] = devices
+		else:
+			del self.__table[key]
+
+	def update(self, device):
+		"""Adds a device to the table or moves it if the parameters has changed"""
+		key = CommandMatcher.key(device)
+		if self.__keys.get(id(device)) == key:
+			return
+		self.remove(device)
+		if key is None:
+			return
+		self.__keys[id(device)] = key
+		# Copy, the list may be iterated by match() while being updated
+		self.__table[key] = self.__table.get(key, []) + [device]
+
+	@staticmethod
+	def family(model):
+		"""
+		Incoming commands are decoded without knowing the exact model, "selflearning" matches
+		devices with model "selflearning-switch:nexa" for instance.
+		"""
+		return model.split(':', 1)[0].split('-', 1)[0]
+
+	@staticmethod
+	def key(device):
+		""":returns: the key for `device` in the table or None if it cannot receive commands"""
+		protocol = device.protocol()
+		deviceParams = device.parameters()
+		values = []
+		for parameter in Protocol.parametersForProtocol(protocol, device.model()):
+			if parameter not in deviceParams:
+				return None
+			value = deviceParams[parameter]
+			try:
+				value = str(value)
+			except Exception as __error:
+				pass
+			values.append(value)
+		if not values:
+			return None
+		return (protocol, CommandMatcher.family(device.model()), tuple(values))
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+import threading
+import time
+
+class CommandQueue(object):
+	"""
+	Thread safe queue for the commands to send to the TellStick. Commands with a higher
+	priority are sent first, commands with the same priority in the order they were queued.
+
+	The key of a command is the device it is sent to and only the latest command for a device
+	waits in the queue. This keeps the commands for one device in order, the priority only
+	decides between devices. A new command replaces the one waiting for the same device and
+	takes over its place in the queue. If it is the same command they are collapsed instead.
+	Either way the callbacks of both commands are called, oldest first, with the result of the
+	command that is sent.
+	"""
+
+	def __init__(self):
+		self.queued = 0
+		self.collapsed = 0
+		self.replaced = 0
+		self.sent = 0
+		self.answered = 0
+		self.timeouts = 0
+		self.maxDepth = 0
+		self.__heap = []  # [priority, seq, msg]
+		self.__keys = {}  # key -> heap entry waiting in the queue
+		self.__seq = 0
+		self.__wait = [0.0, 0.0]  # total, max
+		self.__airtime = [0.0, 0.0]  # total, max
+		self.__lock = threading.Lock()
+
+	def __len__(self):
+		return len(self.__heap)
+
+	def done(self, msg, now=None):
+		"""The response for a sent command has been received"""
+		if now is None:
+			now = time.time()
+		with self.__lock:
+			self.answered = self.answered + 1
+			CommandQueue.__record(self.__airtime, now - msg.sent)
+
+	def pop(self, now=None):
+		""":returns: the next command to send or None if the queue is empty"""
+		if now is None:
+			now = time.time()
+		with self.__lock:
+			if not self.__heap:
+				return None
+			(__priority, __seq, msg) = heapq.heappop(self.__heap)
+			if msg.key is not None:
+				del self.__keys[msg.key]
+			self.sent = self.sent + 1
+			CommandQueue.__record(self.__wait, now - msg.queued)
+			return msg
+
+	def put(self, msg, now=None):
+		"""
+		Queue a command.
+
+		:returns: False if the command was collapsed with one already waiting
+		"""
+		if now is None:
+			now = time.time()
+		with self.__lock:
+			waiting = self.__keys.get(msg.key) if msg.key is not None else None
+			if waiting is None:
+				msg.queued = now
+				self.__seq = self.__seq + 1
+				entry = [msg.priority, self.__seq, msg]
+				heapq.heappush(self.__heap, entry)
+				if msg.key is not None:
+					self.__keys[msg.key] = entry
+				self.queued = self.queued + 1
+				self.maxDepth = max(self.maxDepth, len(self.__heap))
+				return True
+			# Take over the place in the queue of the waiting command
+			previous = waiting[2]
+			if previous.commandString() == msg.commandString():
+				previous.collapse(msg)
+				self.collapsed = self.collapsed + 1
+			else:
+				msg.queued = now
+				msg.replace(previous)
+				waiting[2] = msg
+				self.queued = self.queued + 1
+				self.replaced = self.replaced + 1
+			if msg.priority < waiting[0]:
+				# Send it sooner
+				waiting[0] = msg.priority
+				heapq.heapify(self.__heap)
+			waiting[2].priority = waiting[0]
+			return waiting[2] is msg
+
+	def statistics(self):
+		""":returns: a dict with the counters, the queue wait and the airtime in seconds"""
+		with self.__lock:
+			return {
+				'depth': len(self.__heap),
+				'maxDepth': self.maxDepth,
+				'queued': self.queued,
+				'collapsed': self.collapsed,
+				'replaced': self.replaced,
+				'sent': self.sent,
+				'answered': self.answered,
+				'timeouts': self.timeouts,
+				'waitAvg': self.__wait[0] / self.sent if self.sent else 0,
+				'waitMax': self.__wait[1],
+				'airtimeAvg': self.__airtime[0] / self.answered if self.answered else 0,
+				'airtimeMax': self.__airtime[1],
+			}
+
+	def timedOut(self, msg):
+		"""No response was received for a sent command"""
+		del msg
+		with self.__lock:
+			self.timeouts = self.timeouts + 1
+
+	@staticmethod
+	def __record(metric, value):
+		metric[0] = metric[0] + value
+		metric[1] = max(metric[1], value)
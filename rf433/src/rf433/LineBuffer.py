@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+class LineBuffer(object):
+	"""
+	Collects the bytes read from the TellStick and splits them into frames. A frame starts
+	with '+' and ends with a newline. Anything before the '+' is noise and lines without it are
+	dropped.
+	"""
+
+	MAX_LENGTH = 4096  #: Bytes kept while waiting for a newline, the rest is garbage
+
+	def __init__(self):
+		self.buffer = bytearray()
+
+	def feed(self, data):
+		""":returns: a list with the complete frames received, without the '+' and newline"""
+		self.buffer.extend(data)
+		end = self.buffer.rfind(b'\n')
+		if end < 0:
+			if len(self.buffer) > LineBuffer.MAX_LENGTH:
+				del self.buffer[:]
+			return []
+		lines = bytes(self.buffer[:end]).split(b'\n')
+		del self.buffer[:end + 1]
+		frames = []
+		for line in lines:
+			start = line.rfind(b'+')
+			if start < 0:
+				continue
+			frame = line[start + 1:].replace(b'\r', b'')
+			if frame:
+				frames.append(frame)
+		return frames
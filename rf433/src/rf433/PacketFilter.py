@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+class PacketFilter(object):
+	"""
+	Drops identical sensor packets received within a time window. Most sensors sends the same
+	frame several times for every reading. Only the first one needs to be decoded.
+
+	Only packets confirmed to be from a known sensor are dropped. New sensors must be received
+	a number of times before they are added and all the packets are needed for that.
+	"""
+
+	WINDOW = 1.0  #: Default window in seconds
+
+	def __init__(self, window=WINDOW):
+		self.window = window
+		self.received = 0
+		self.duplicates = 0
+		self.__seen = {}  # packet key -> [last seen, confirmed]
+		self.__lastPrune = 0
+		self.__lock = threading.Lock()
+
+	def accept(self, params, now=None):
+		"""
+		:returns: False if the same confirmed packet has been seen within the window,
+		          True otherwise
+		"""
+		if now is None:
+			now = time.time()
+		key = PacketFilter.key(params)
+		with self.__lock:
+			self.received = self.received + 1
+			seen = self.__seen.get(key)
+			if seen is not None and now - seen[0] < self.window:
+				# Retransmissions extends the window so a burst is dropped as a whole
+				seen[0] = now
+				if seen[1]:
+					self.duplicates = self.duplicates + 1
+					return False
+				return True
+			self.__seen[key] = [now, False]
+			if now - self.__lastPrune >= self.window:
+				self.__prune(now)
+			return True
+
+	def confirm(self, key):
+		"""
+		Mark a packet as coming from a known sensor. Retransmissions of it will be dropped.
+
+		:param key: The key for the packet, as returned from :func:`key`
+		"""
+		with self.__lock:
+			seen = self.__seen.get(key)
+			if seen is not None:
+				seen[1] = True
+
+	def statistics(self):
+		""":returns: a dict with the counters"""
+		with self.__lock:
+			return {
+				'received': self.received,
+				'duplicates': self.duplicates,
+				'window': self.window,
+			}
+
+	@staticmethod
+	def key(params):
+		"""Returns the key used to compare packets"""
+		return (params.get('protocol'), params.get('model'), params.get('data'))
+
+	def __prune(self, now):
+		self.__lastPrune = now
+		for key in [x for x, seen in self.__seen.items() if now - seen[0] >= self.window]:
+			del self.__seen[key]
@@ -138,43 +138,10 @@ class Protocol(object):
 
 	@staticmethod
 	def protocolInstance(protocol):
-		if (protocol == 'arctech'):
-			return ProtocolArctech()
-		if (protocol == 'brateck'):
-			return ProtocolBrateck()
-		if (protocol == 'comen'):
-			return ProtocolComen()
-		if (protocol == 'everflourish'):
-			return ProtocolEverflourish()
-		if (protocol == 'fuhaote'):
-			return ProtocolFuhaote()
-		if (protocol == 'fineoffset'):
-			return ProtocolFineoffset()
-		if (protocol == 'hasta'):
-			return ProtocolHasta()
-		if (protocol == 'ikea'):
-			return ProtocolIkea()
-		if (protocol == 'kangtai'):
-			return ProtocolKangtai()
-		if (protocol == 'mandolyn'):
-			return ProtocolMandolyn()
-		if (protocol == 'oregon'):
-			return ProtocolOregon()
-		if (protocol == 'risingsun'):
-			return ProtocolRisingSun()
-		if (protocol == 'sartano'):
-			return ProtocolSartano()
-		if (protocol == 'silvanchip'):
-			return ProtocolSilvanChip()
-		if (protocol == 'upm'):
-			return ProtocolUpm()
-		if (protocol == 'waveman'):
-			return ProtocolWaveman()
-		if (protocol == 'x10'):
-			return ProtocolX10()
-		if (protocol == 'yidong'):
-			return ProtocolYidong()
-		return None
+		cls = PROTOCOLS.get(protocol)
+		if cls is None:
+			return None
+		return cls()
 
 # pylint: disable=C0413
 from .ProtocolArctech import ProtocolArctech
@@ -195,3 +162,24 @@ from .ProtocolUpm import ProtocolUpm
 from .ProtocolWaveman import ProtocolWaveman
 from .ProtocolX10 import ProtocolX10
 from .ProtocolYidong import ProtocolYidong
+
+PROTOCOLS = {
+	'arctech': ProtocolArctech,
+	'brateck': ProtocolBrateck,
+	'comen': ProtocolComen,
+	'everflourish': ProtocolEverflourish,
+	'fineoffset': ProtocolFineoffset,
+	'fuhaote': ProtocolFuhaote,
+	'hasta': ProtocolHasta,
+	'ikea': ProtocolIkea,
+	'kangtai': ProtocolKangtai,
+	'mandolyn': ProtocolMandolyn,
+	'oregon': ProtocolOregon,
+	'risingsun': ProtocolRisingSun,
+	'sartano': ProtocolSartano,
+	'silvanchip': ProtocolSilvanChip,
+	'upm': ProtocolUpm,
+	'waveman': ProtocolWaveman,
+	'x10': ProtocolX10,
+	'yidong': ProtocolYidong,
+}
@@ -52,28 +52,28 @@ class ProtocolArctech(Protocol):
 		return self.stringForSelflearning(method, data)
 
 	def stringForBell(self):
-		strReturn = ''
-
 		house = self.stringParameter('house', 'A')
 		intHouse = ord(house[0]) - ord('A')
-		strReturn = strReturn + self.codeSwitchTuple(intHouse)
-		strReturn = strReturn + '$kk$$kk$$kk$$k$k'  # Unit 7
-		strReturn = strReturn + '$kk$$kk$$kk$$kk$$k'  # Bell
-		return {'S': strReturn}
+		return {'S': ''.join([
+			self.codeSwitchTuple(intHouse),
+			'$kk$$kk$$kk$$k$k',  # Unit 7
+			'$kk$$kk$$kk$$kk$$k',  # Bell
+		])}
 
 	def stringForCodeSwitch(self, method):
 		strHouse = self.stringParameter('house', 'A')
 		intHouse = ord(strHouse[0]) - ord('A')
-		strReturn = self.codeSwitchTuple(intHouse)
-		strReturn = strReturn + self.codeSwitchTuple(self.intParameter('unit', 1, 16)-1)
-
 		if method == Device.TURNON:
-			strReturn = strReturn + '$k$k$kk$$kk$$kk$$k'
+			action = '$k$k$kk$$kk$$kk$$k'
 		elif method == Device.TURNOFF:
-			strReturn = strReturn + self.offCode()
+			action = self.offCode()
 		else:
 			return None
-		return {'S': strReturn}
+		return {'S': ''.join([
+			self.codeSwitchTuple(intHouse),
+			self.codeSwitchTuple(self.intParameter('unit', 1, 16)-1),
+			action,
+		])}
 
 	def stringForSelflearning(self, method, level, group=0):
 		intHouse = self.intParameter('house', 1, 67108863)
@@ -84,14 +84,8 @@ class ProtocolArctech(Protocol):
 
 	@staticmethod
 	def codeSwitchTuple(intCode):
-		strReturn = ''
-		for __i in range(4):
-			if intCode & 1:  # Convert 1
-				strReturn = strReturn + '$kk$'
-			else:  # Convert 0
-				strReturn = strReturn + '$k$k'
-			intCode = intCode >> 1
-		return strReturn
+		# Least significant bit first, $kk$ is a 1 and $k$k a 0
+		return ''.join(['$kk$' if (intCode >> i) & 1 else '$k$k' for i in range(4)])
 
 	@staticmethod
 	def offCode():
@@ -99,56 +93,32 @@ class ProtocolArctech(Protocol):
 
 	@staticmethod
 	def stringSelflearningForCode(intHouse, intCode, method, level, group):
-		retval = {}
 		SHORT = chr(24)  # pylint: disable=C0103
 		LONG = chr(127)  # pylint: disable=C0103
 
 		ONE = SHORT + LONG + SHORT + SHORT  # pylint: disable=C0103
 		ZERO = SHORT + SHORT + SHORT + LONG  # pylint: disable=C0103
 
-		code = SHORT + chr(255)
-
-		for i in range(25, -1, -1):
-			if intHouse & (1 << i):
-				code = code + ONE
-			else:
-				code = code + ZERO
-
-		if group == 1:
-			code = code + ONE  # Group (for selflearning bell)
-		else:
-			code = code + ZERO  # Group
-
 		# On/off
 		if method == Device.DIM:
-			code = code + SHORT + SHORT + SHORT + SHORT
+			action = SHORT + SHORT + SHORT + SHORT
 		elif method == Device.TURNOFF:
-			code = code  + ZERO
-		elif method == Device.TURNON or method == Device.BELL:
-			code = code + ONE
-		elif method == Device.LEARN:
-			code = code + ONE
-			#retval['R'] = 25
+			action = ZERO
+		elif method == Device.TURNON or method == Device.BELL or method == Device.LEARN:
+			action = ONE
 		else:
 			return None
 
-		for i in range(3, -1, -1):
-			if intCode & (1 << i):
-				code = code + ONE
-			else:
-				code = code + ZERO
-
+		code = [SHORT + chr(255)]
+		code.extend([ONE if intHouse & (1 << i) else ZERO for i in range(25, -1, -1)])
+		code.append(ONE if group == 1 else ZERO)  # Group (ONE for selflearning bell)
+		code.append(action)
+		code.extend([ONE if intCode & (1 << i) else ZERO for i in range(3, -1, -1)])
 		if method == Device.DIM:
 			newLevel = level/16
-			for i in range(3, -1, -1):
-				if newLevel & (1 << i):
-					code = code + ONE
-				else:
-					code = code + ZERO
-
-		code = code + SHORT
-		retval['S'] = code
-		return retval
+			code.extend([ONE if newLevel & (1 << i) else ZERO for i in range(3, -1, -1)])
+		code.append(SHORT)
+		return {'S': ''.join(code)}
 
 	@staticmethod
 	def decodeData(data):
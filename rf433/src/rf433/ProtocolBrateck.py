@@ -20,25 +20,20 @@ class ProtocolBrateck(Protocol):
 		BSTOP = S+L+S+L+L+S+L+S+S+L+S+L+S+L+S+L+S  # pylint: disable=C0103
 		BDOWN = S+L+S+L+S+L+S+L+S+L+S+L+L+S+L+S+S  # pylint: disable=C0103
 
-		strReturn = ''
 		strHouse = self.stringParameter('house', '')
 		if strHouse == '':
 			return ''
 
-		for i in strHouse:
-			if i == '1':
-				strReturn = B1+strReturn
-			elif i == '-':
-				strReturn = BX+strReturn
-			elif i == '0':
-				strReturn = B0+strReturn
-
 		if method == Device.UP:
-			strReturn += BUP
+			action = BUP
 		elif method == Device.DOWN:
-			strReturn += BDOWN
+			action = BDOWN
 		elif method == Device.STOP:
-			strReturn += BSTOP
+			action = BSTOP
 		else:
 			return None
-		return {'S': strReturn}
+		# The house code is sent backwards
+		bits = {'1': B1, '-': BX, '0': B0}
+		strReturn = [bits[i] for i in reversed(strHouse) if i in bits]
+		strReturn.append(action)
+		return {'S': ''.join(strReturn)}
@@ -33,18 +33,13 @@ class ProtocolEverflourish(Protocol):
 
 		check = ProtocolEverflourish.calculateChecksum(deviceCode)
 
-		strCode = s+s+s+s+s+s+s+s
+		strCode = [ssss + ssss]
+		strCode.extend([bits[(deviceCode>>i)&0x01] for i in range(15, -1, -1)])
+		strCode.extend([bits[(check>>i)&0x01] for i in range(3, -1, -1)])
+		strCode.extend([bits[(action>>i)&0x01] for i in range(3, -1, -1)])
+		strCode.append(ssss)
 
-		for i in range(15, -1, -1):
-			strCode = strCode + bits[(deviceCode>>i)&0x01]
-		for i in range(3, -1, -1):
-			strCode = strCode + bits[(check>>i)&0x01]
-		for i in range(3, -1, -1):
-			strCode = strCode + bits[(action>>i)&0x01]
-
-		strCode = strCode + ssss
-
-		return {'S': strCode}
+		return {'S': ''.join(strCode)}
 
 	@staticmethod
 	def calculateChecksum(x):
@@ -4,41 +4,34 @@ from telldus import Device
 import crcmod.predefined
 import struct
 import logging
+from .BitLayout import BitLayout
+from .SensorProtocol import SensorProtocol
 
-class ProtocolFineoffset():
-	def __init__(self):
-		pass
+# Creating the function builds a lookup table, only do it once
+crc_8_func = crcmod.mkCrcFun(0x131, rev=False, initCrc=0x00)
+
+class ProtocolFineoffset(SensorProtocol):
+	LAYOUT = BitLayout([
+		('humidity', 8, 8),
+		('temperature', 16, 11),
+		('negative', 27, 1),
+		('address', 28, 8),
+	], checksum=lambda value: (value & 0xFF) == crc_8_func(struct.pack('>I', value >> 8)))
 
 	def calculateChecksum(self, data):
-		crc_8_func = crcmod.mkCrcFun(0x131, rev=False, initCrc=0x00)
 		data = struct.pack('>I', data)
 		return crc_8_func(data)
 
-	def decodeData(self, data):
-		if 'data' not in data:
-			return None
-		value = int(data['data'], 16)
-
-		checksum = value & 0xFF
-		value >>= 8
-
-		if checksum != self.calculateChecksum(value):
-			logging.warning("Wrong checksum for fineoffset, %i" % value)
-			return None
+	def checksumError(self, data, value):
+		del data
+		logging.warning("Wrong checksum for fineoffset, %i" % (value >> 8))
 
-		humidity = value & 0xFF
-		value >>= 8
-
-		temperature = (value & 0x7FF)/10.0
-		value >>= 11
-
-		if value & 0x1: #Negative
+	def decodeFields(self, data, humidity, temperature, negative, address):
+		temperature = temperature/10.0
+		if negative:
 			temperature = -temperature
-		value >>= 1
 
-		id = value & 0xFF
-
-		data['id'] = int(id)
+		data['id'] = int(address)
 		valueList = []
 		valueList.append({'type': Device.TEMPERATURE, 'value': temperature, 'scale': Device.SCALE_TEMPERATURE_CELCIUS})
 		if humidity <= 100:
@@ -51,3 +44,5 @@ class ProtocolFineoffset():
 		data['values'] = valueList
 
 		return data
+
+	DECODER = staticmethod(LAYOUT.compile(decodeFields, invalid=checksumError))
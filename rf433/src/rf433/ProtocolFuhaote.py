@@ -15,30 +15,21 @@ class ProtocolFuhaote(Protocol):
 		OFF = S+L+S+L+S+L+L+S
 		ON  = S+L+L+S+S+L+S+L
 
-		strReturn = ''
 		strCode = self.stringParameter('code', '')
 		if strCode == '':
 			return ''
 
-		# House code
-		for i in range(5):
-			if strCode[i:i+1] == '0':
-				strReturn = strReturn + B0
-			elif strCode[i:i+1] == '1':
-				strReturn = strReturn + B1
-		# Unit code
-		for i in range(5, 10):
-			if strCode[i:i+1] == '0':
-				strReturn = strReturn + B0
-			elif strCode[i:i+1] == '1':
-				strReturn = strReturn + S+L+S+L
-
 		if method == Device.TURNON:
-			strReturn = strReturn + ON
+			action = ON
 		elif method == Device.TURNOFF:
-			strReturn =  strReturn + OFF
+			action = OFF
 		else:
 			return ''
 
-		strReturn = strReturn + S
-		return {'S': strReturn}
+		# House code
+		strReturn = [{'0': B0, '1': B1}.get(x, '') for x in strCode[0:5]]
+		# Unit code
+		strReturn.extend([{'0': B0, '1': S+L+S+L}.get(x, '') for x in strCode[5:10]])
+		strReturn.append(action)
+		strReturn.append(S)
+		return {'S': ''.join(strReturn)}
@@ -21,11 +21,10 @@ class ProtocolHasta(Protocol):
 		repeat = 10
 
 		# Preample
-		strReturn = chr(255) + chr(1) + chr(208)
-		strReturn = strReturn + chr(160)
+		strReturn = [chr(255) + chr(1) + chr(208) + chr(160)]
 
-		strReturn = strReturn + ProtocolHasta.convertByteV1(house&0xFF)
-		strReturn = strReturn + ProtocolHasta.convertByteV1((house>>8)&0xFF)
+		strReturn.append(ProtocolHasta.convertByteV1(house&0xFF))
+		strReturn.append(ProtocolHasta.convertByteV1((house>>8)&0xFF))
 
 		byte = unit&0x0F
 
@@ -38,25 +37,19 @@ class ProtocolHasta(Protocol):
 		elif method == Device.LEARN:
 			byte = byte | 0x40  # Confirm
 
-		strReturn = strReturn + ProtocolHasta.convertByteV1(byte)
-		strReturn = strReturn + ProtocolHasta.convertByteV1(0)
-		strReturn = strReturn + ProtocolHasta.convertByteV1(0)
+		strReturn.append(ProtocolHasta.convertByteV1(byte))
+		strReturn.append(ProtocolHasta.convertByteV1(0))
+		strReturn.append(ProtocolHasta.convertByteV1(0))
 
 		# Remove the last pulse
-		strReturn = strReturn[:-1]
-
-		return {'S': strReturn, 'R': repeat, 'P': 25}
+		return {'S': ''.join(strReturn)[:-1], 'R': repeat, 'P': 25}
 
 	@staticmethod
 	def convertByteV1(byte):
-		retval = ''
-		for __i in range(8):
-			if byte & 1:
-				retval = retval + chr(32) + chr(17)
-			else:
-				retval = retval + chr(17) + chr(32)
-			byte = byte >> 1
-		return retval
+		# Least significant bit first
+		return ''.join([
+			chr(32) + chr(17) if (byte >> i) & 1 else chr(17) + chr(32) for i in range(8)
+		])
 
 	def stringForMethodV2(self, method):
 		house = self.intParameter('house', 1, 65536)
@@ -64,14 +57,11 @@ class ProtocolHasta(Protocol):
 		repeat = 10
 
 		# Preample
-		strReturn = chr(255) + chr(1) + chr(208)
-		strReturn = strReturn + chr(250)
-		strReturn = strReturn + chr(155)
-		strReturn = strReturn + chr(35)
+		strReturn = [chr(255) + chr(1) + chr(208) + chr(250) + chr(155) + chr(35)]
 
-		strReturn = strReturn + ProtocolHasta.convertByteV2((house>>8)&0xFF)
+		strReturn.append(ProtocolHasta.convertByteV2((house>>8)&0xFF))
 		csum = ((house>>8)&0xFF)
-		strReturn = strReturn + ProtocolHasta.convertByteV2(house&0xFF)
+		strReturn.append(ProtocolHasta.convertByteV2(house&0xFF))
 		csum = csum + (house&0xFF)
 
 		byte = unit&0x0F
@@ -85,26 +75,22 @@ class ProtocolHasta(Protocol):
 		elif method == Device.LEARN:
 			byte = byte | 0x40  # Confirm
 
-		strReturn = strReturn + ProtocolHasta.convertByteV2(byte)
+		strReturn.append(ProtocolHasta.convertByteV2(byte))
 		csum = csum + byte
 
-		strReturn = strReturn + ProtocolHasta.convertByteV2(0x01)  # unknown
+		strReturn.append(ProtocolHasta.convertByteV2(0x01))  # unknown
 		csum = csum + 0x01
 
 		checksum = ((int(csum/256)+1)*256+1) - csum
 
-		strReturn = strReturn + ProtocolHasta.convertByteV2(checksum)
-		strReturn = strReturn + chr(66) + chr(35)
+		strReturn.append(ProtocolHasta.convertByteV2(checksum))
+		strReturn.append(chr(66) + chr(35))
 
-		return {'S': strReturn, 'R': repeat, 'P': 0}
+		return {'S': ''.join(strReturn), 'R': repeat, 'P': 0}
 
 	@staticmethod
 	def convertByteV2(byte):
-		retval = ''
-		for __i in range(8):
-			if byte & 1:
-				retval = retval + chr(66) + chr(35)
-			else:
-				retval = retval + chr(35) + chr(66)
-			byte = byte >> 1
-		return retval
+		# Least significant bit first
+		return ''.join([
+			chr(66) + chr(35) if (byte >> i) & 1 else chr(35) + chr(66) for i in range(8)
+		])
@@ -38,25 +38,23 @@ class ProtocolIkea(Protocol):
 				intUnit = 0
 			intUnits = intUnits | (1<<(9-int(intUnit)))
 
-		strReturn = 'TTTTTT' + chr(170)  # Startcode, always like this
+		strReturn = ['TTTTTT' + chr(170)]  # Startcode, always like this
 
-		strChannels = ''
 		intCode = (intSystem << 10) | intUnits
 		checksum1 = 0
 		checksum2 = 0
 		for i in range(13, -1, -1):
 			if (intCode>>i) & 1:
-				strChannels += 'TT'
+				strReturn.append('TT')  # System + Units
 				if i % 2 == 0:
 					checksum2 += 1
 				else:
 					checksum1 += 1
 			else:
-				strChannels += chr(170)
-		strReturn += strChannels  # System + Units
+				strReturn.append(chr(170))
 
-		strReturn += 'TT' if checksum1 % 2 == 0 else chr(170)  # 1st checksum
-		strReturn += 'TT' if checksum2 % 2 == 0 else chr(170)  # 2nd checksum
+		strReturn.append('TT' if checksum1 % 2 == 0 else chr(170))  # 1st checksum
+		strReturn.append('TT' if checksum2 % 2 == 0 else chr(170))  # 2nd checksum
 
 		intLevel = 0
 		if level <= 12:
@@ -94,15 +92,15 @@ class ProtocolIkea(Protocol):
 		checksum2 = 0
 		for i in range(6):
 			if (intCode>>i) & 1:
-				strReturn += 'TT'
+				strReturn.append('TT')
 				if i % 2 == 0:
 					checksum1 += 1
 				else:
 					checksum2 += 1
 			else:
-				strReturn += chr(170)
+				strReturn.append(chr(170))
 
-		strReturn += 'TT' if checksum1 % 2 == 0 else chr(170)  # 1st checksum
-		strReturn += 'TT' if checksum2 % 2 == 0 else chr(170)  # 2nd checksum
+		strReturn.append('TT' if checksum1 % 2 == 0 else chr(170))  # 1st checksum
+		strReturn.append('TT' if checksum2 % 2 == 0 else chr(170))  # 2nd checksum
 
-		return {'S': strReturn}
+		return {'S': ''.join(strReturn)}
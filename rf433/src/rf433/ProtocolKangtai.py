@@ -56,12 +56,9 @@ class ProtocolKangtai(Protocol):
 		k[4] = enctable[(g4^k[3])]
 		k[5] = g5^9
 
-		for i in range(5, -1, -1):
-			for j in range(3, -1, -1):
-				if ((k[i] >> j) & 1) == 0:
-					strReturn = strReturn + ZERO
-				else:
-					strReturn = strReturn + ONE
+		strReturn = strReturn + ''.join([
+			ONE if (k[i] >> j) & 1 else ZERO for i in range(5, -1, -1) for j in range(3, -1, -1)
+		])
 
 		retval = {'S': strReturn, 'P': 0}
 		if method == Device.LEARN:
@@ -133,9 +130,9 @@ class ProtocolKangtai(Protocol):
 		m[6] = enctable2[(k[6]^m[5])]
 		m[7] = enctable2[(k[7]^m[6])]
 
-		for i in range(7, -1, -1):
-			for j in range(3, -1, -1):
-				strReturn += ZERO if ((m[i] >> j) & 1) == 0 else ONE
+		strReturn += ''.join([
+			ONE if (m[i] >> j) & 1 else ZERO for i in range(7, -1, -1) for j in range(3, -1, -1)
+		])
 
 		retval = {'S': strReturn, 'P': 0}
 		if method == Device.LEARN:
@@ -33,33 +33,22 @@ class ProtocolRisingSun(Protocol):
 		l = chr(120)
 		s = chr(51)
 
-		strCode = '10'
 		code = intCode
 		code = 0 if code < 0 else code
 		code = 15 if code > 15 else code
 		if method == Device.TURNON:
-			strCode = strCode + codeOn[code]
+			strCode = '10' + codeOn[code]
 		elif method == Device.TURNOFF:
-			strCode = strCode + codeOff[code]
+			strCode = '10' + codeOff[code]
 		elif method == Device.LEARN:
-			strCode = strCode + codeOn[code]
+			strCode = '10' + codeOn[code]
 		else:
 			return None
 
-		house = intHouse
-		for i in range(25):
-			if house & 1:
-				strCode = strCode + '1'
-			else:
-				strCode = strCode + '0'
-			house = house >> 1
+		# The house is sent least significant bit first
+		strCode = strCode + ''.join(['1' if (intHouse >> i) & 1 else '0' for i in range(25)])
 
-		strReturn = ''
-		for i in strCode:
-			if i == '1':
-				strReturn = strReturn + l + s
-			else:
-				strReturn = strReturn + s + l
+		strReturn = ''.join([l + s if i == '1' else s + l for i in strCode])
 
 		retval = {'S': strReturn, 'P': 5}
 		if method == Device.LEARN:
@@ -67,23 +56,19 @@ class ProtocolRisingSun(Protocol):
 		return retval
 
 	def stringCodeSwitch(self, method):
-		strReturn = '.e'
-		strReturn = strReturn + ProtocolRisingSun.codeSwitchTuple(self.intParameter('house', 1, 4)-1)
-		strReturn = strReturn + ProtocolRisingSun.codeSwitchTuple(self.intParameter('unit', 1, 4)-1)
 		if method == Device.TURNON:
-			strReturn = strReturn + 'e..ee..ee..ee..e'
+			action = 'e..ee..ee..ee..e'
 		elif method == Device.TURNOFF:
-			strReturn = strReturn + 'e..ee..ee..e.e.e'
+			action = 'e..ee..ee..e.e.e'
 		else:
 			return None
-		return {'S': strReturn}
+		return {'S': ''.join([
+			'.e',
+			ProtocolRisingSun.codeSwitchTuple(self.intParameter('house', 1, 4)-1),
+			ProtocolRisingSun.codeSwitchTuple(self.intParameter('unit', 1, 4)-1),
+			action,
+		])}
 
 	@staticmethod
 	def codeSwitchTuple(intToConvert):
-		strReturn = ''
-		for i in range(4):
-			if i == intToConvert:
-				strReturn = strReturn + '.e.e'
-			else:
-				strReturn = strReturn + 'e..e'
-		return strReturn
+		return ''.join(['.e.e' if i == intToConvert else 'e..e' for i in range(4)])
@@ -62,19 +62,13 @@ class ProtocolSartano(Protocol):
 
 	@staticmethod
 	def stringForCode(strCode, method):
-		strReturn = ''
-
-		for i in strCode:
-			if i == '1':
-				strReturn = strReturn + '$k$k'
-			else:
-				strReturn = strReturn + '$kk$'
-
 		if method == Device.TURNON:
-			strReturn = strReturn + '$k$k$kk$$k'
+			action = '$k$k$kk$$k'
 		elif method == Device.TURNOFF:
-			strReturn = strReturn + '$kk$$k$k$k'
+			action = '$kk$$k$k$k'
 		else:
 			return None
 
-		return {'S': strReturn}
+		strReturn = ['$k$k' if i == '1' else '$kk$' for i in strCode]
+		strReturn.append(action)
+		return {'S': ''.join(strReturn)}
@@ -60,47 +60,30 @@ class ProtocolSilvanChip(Protocol):
 
 		ONE = LONG + chr(100)  # pylint: disable=C0103
 		ZERO = chr(100) + LONG  # pylint: disable=C0103
-		strReturn = ''
 
 		io = chr(1)  # pylint: disable=C0103
 
-		strReturn += S+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+S
-
-		intHouse = self.intParameter('house', 1, 1048575)
-
-		for i in range(19, -1, -1):
-			if intHouse & (1 << i):
-				strReturn += ONE
-			else:
-				strReturn += ZERO
-
 		if method == Device.TURNON:
-			strReturn += ZERO + ZERO + ONE + ZERO
+			action = ZERO + ZERO + ONE + ZERO
 		elif method == Device.LEARN:
-			strReturn += ZERO + ZERO + ZERO + ONE
+			action = ZERO + ZERO + ZERO + ONE
 		elif method == Device.TURNOFF:
-			strReturn += ONE + ZERO + ZERO + ZERO
+			action = ONE + ZERO + ZERO + ZERO
 		else:
 			return None
 
-		strReturn += ZERO
-		return {'S': strReturn}
+		strReturn = [S+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+L+io+S]
 
-	def getString(self, preamble, one, zero, button):
 		intHouse = self.intParameter('house', 1, 1048575)
-		strReturn = preamble
+		strReturn.extend([ONE if intHouse & (1 << i) else ZERO for i in range(19, -1, -1)])
+		strReturn.append(action)
+		strReturn.append(ZERO)
+		return {'S': ''.join(strReturn)}
 
-		for i in range(19, -1, -1):
-			if intHouse & (1 << i):
-				strReturn += one
-			else:
-				strReturn += zero
-
-		for i in range(3, -1, -1):
-			if button & (1 << i):
-				strReturn += one
-			else:
-				strReturn += zero
-
-		strReturn += zero
-		return {'S': strReturn}
+	def getString(self, preamble, one, zero, button):
+		intHouse = self.intParameter('house', 1, 1048575)
+		strReturn = [preamble]
+		strReturn.extend([one if intHouse & (1 << i) else zero for i in range(19, -1, -1)])
+		strReturn.extend([one if button & (1 << i) else zero for i in range(3, -1, -1)])
+		strReturn.append(zero)
+		return {'S': ''.join(strReturn)}
@@ -18,15 +18,9 @@ class ProtocolUpm(Protocol):
 		B1 = L+S
 		B0 = S+L
 		intUnit = self.intParameter('unit', 1, 4)-1
-		strReturn = ''
-		code = self.intParameter('house', 0, 4095)
-		for i in range(12):
-			if code & 1:
-				strReturn = B1 + strReturn
-			else:
-				strReturn = B0 + strReturn
-			code >>= 1
-		strReturn = START + strReturn  # Startcode, first
+		house = self.intParameter('house', 0, 4095)
+		strReturn = [START]  # Startcode, first
+		strReturn.extend([B1 if (house >> i) & 1 else B0 for i in range(11, -1, -1)])
 		code = 0
 		if method == Device.TURNON:
 			code += 2
@@ -43,20 +37,10 @@ class ProtocolUpm(Protocol):
 					check1 += 1
 				else:
 					check2 += 1
-			if code & 1:
-				strReturn += B1
-			else:
-				strReturn += B0
+			strReturn.append(B1 if code & 1 else B0)
 			code >>= 1
 
-		if check1 % 2 == 0:
-			strReturn += B0
-		else:
-			strReturn += B1
-
-		if check2 % 2 == 0:
-			strReturn += B0
-		else:
-			strReturn += B1
+		strReturn.append(B0 if check1 % 2 == 0 else B1)
+		strReturn.append(B0 if check2 % 2 == 0 else B1)
 
-		return {'S': strReturn}
+		return {'S': ''.join(strReturn)}
@@ -17,9 +17,6 @@ class ProtocolX10(Protocol):
 		START_CODE = chr(255)+chr(1)+chr(255)+chr(1)+chr(255)+chr(1)+chr(100)+chr(255)+chr(1)+chr(180)
 		STOP_CODE = S
 
-		strReturn = START_CODE
-		strComplement = ''
-
 		strHouse = self.stringParameter('house', 'A')
 		intHouse = ord(strHouse[0]) - ord('A')
 		if intHouse < 0:
@@ -30,69 +27,27 @@ class ProtocolX10(Protocol):
 		intHouse = ProtocolX10.HOUSES[intHouse]
 		intCode = self.intParameter('unit', 1, 16)-1
 
-		for i in range(4):
-			if intHouse & 1:
-				strReturn = strReturn + B1
-				strComplement = strComplement + B0
-			else:
-				strReturn = strReturn + B0
-				strComplement = strComplement + B1
-			intHouse = intHouse >> 1
-		strReturn = strReturn + B0
-		strComplement = strComplement + B1
-
-		if intCode >= 8:
-			strReturn = strReturn + B1
-			strComplement = strComplement + B0
-		else:
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
-
-		strReturn = strReturn + B0
-		strComplement = strComplement + B1
-		strReturn = strReturn + B0
-		strComplement = strComplement + B1
-
-		strReturn = strReturn + strComplement
-		strComplement = ''
-
-		strReturn = strReturn + B0
-		strComplement = strComplement + B1
-
-		if (intCode >> 2) & 1:  # Bit 2 of intCode
-			strReturn = strReturn + B1
-			strComplement = strComplement + B0
-		else:
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
-
 		if method == Device.TURNON:
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
+			methodBit = 0
 		elif method == Device.TURNOFF:
-			strReturn = strReturn + B1
-			strComplement = strComplement + B0
+			methodBit = 1
 		else:
 			return None
 
-		if intCode & 1:  # Bit 0 of intCode
-			strReturn = strReturn + B1
-			strComplement = strComplement + B0
-		else:
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
-
-		if (intCode >> 1) & 1:  # Bit 1 of intCode
-			strReturn = strReturn + B1
-			strComplement = strComplement + B0
-		else:
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
-
-		for i in range(3):
-			strReturn = strReturn + B0
-			strComplement = strComplement + B1
-
-		strReturn = strReturn + strComplement
-		strReturn = strReturn + STOP_CODE
-		return {'S': strReturn}
+		# Two bytes, each one followed by its complement
+		first = [(intHouse >> i) & 1 for i in range(4)] + [0, 1 if intCode >= 8 else 0, 0, 0]
+		second = [
+			0,
+			(intCode >> 2) & 1,  # Bit 2 of intCode
+			methodBit,
+			intCode & 1,  # Bit 0 of intCode
+			(intCode >> 1) & 1,  # Bit 1 of intCode
+			0, 0, 0,
+		]
+		bits = [B0, B1]
+		strReturn = [START_CODE]
+		for byte in (first, second):
+			strReturn.extend([bits[x] for x in byte])
+			strReturn.extend([bits[1-x] for x in byte])
+		strReturn.append(STOP_CODE)
+		return {'S': ''.join(strReturn)}
@@ -2,15 +2,16 @@
 
 import logging
 import time
-from threading import Timer
 
-from base import Application, implements, Plugin, signal
+from base import Application, implements, Plugin, Settings, signal, TimerService
 from board import Board
 from telldus import DeviceManager, Device
 from tellduslive.base import TelldusLive, ITelldusLiveObserver
 
 from .Protocol import Protocol
 from .Adapter import Adapter
+from .CommandMatcher import CommandMatcher
+from .PacketFilter import PacketFilter
 from .RF433Msg import RF433Msg
 
 class RF433Node(Device):
@@ -45,6 +46,10 @@ class SensorNode(RF433Node):
 	def battery(self):
 		return self.batteryLevel
 
+	def key(self):
+		"""Returns a key identifying this sensor by (protocol, model, sensorId)"""
+		return (self._protocol, self._model, self._sensorId)
+
 	def compare(self, protocol, model, sensorId):
 		if self._protocol != protocol:
 			return False
@@ -62,6 +67,10 @@ class SensorNode(RF433Node):
 	def isSensor():
 		return True
 
+	def isConfirmed(self):
+		"""Returns True if enough packets has been received to consider this a real sensor"""
+		return self._packageCount > 6
+
 	def isValid(self):
 		if self._name and self._name != "Device " + str(self.localId()) and not self._ignored:
 			return True  # name is set and not ignored, don't clean up automatically
@@ -120,22 +129,27 @@ class SensorNode(RF433Node):
 		self.setSensorValues(data)
 
 class DeviceNode(RF433Node):
-	def __init__(self, controller):
+	MAX_ENCODED = 64  #: Encoded commands cached for every device
+	commandOrigin = True  # The origin sets the priority in the command queue
+
+	def __init__(self, controller, matcher=None):
 		super(DeviceNode, self).__init__()
 		self.controller = controller
+		self.matcher = matcher
 		self._protocol = ''
 		self._model = ''
 		self._protocolParams = {}
+		self.__instance = None
+		self.__instanceKey = None
+		self.__encoded = {}
 
-	def _command(self, action, value, success, failure, **__kwargs):
-		protocol = Protocol.protocolInstance(self._protocol)
+	def _command(self, action, value, success, failure, origin=None, **__kwargs):
+		protocol = self.__protocolInstance()
 		if not protocol:
 			logging.warning("Unknown protocol %s", self._protocol)
 			failure(0)
 			return
-		protocol.setModel(self._model)
-		protocol.setParameters(self._protocolParams)
-		msg = protocol.stringForMethod(action, value)
+		msg = self.__encode(protocol, action, value)
 		if msg is None:
 			failure(0)
 			logging.error("Could not encode rf-data for %s:%s %s", self._protocol, self._model, action)
@@ -152,13 +166,23 @@ class DeviceNode(RF433Node):
 		if 'R' in msg:
 			prefixes['R'] = msg['R']
 		if 'S' in msg:
-			self.controller.queue(RF433Msg('S', msg['S'], prefixes, success=_success, failure=fail))
+			self.controller.queue(RF433Msg(
+				'S', msg['S'], prefixes, success=_success, failure=fail,
+				priority=DeviceNode.priorityForOrigin(origin),
+				key=self.id()
+			))
+
+	@staticmethod
+	def priorityForOrigin(origin):
+		"""Commands from groups, scenes and events are sent after the interactive ones"""
+		if origin is not None and origin.startswith(('Group ', 'Scene ', 'Event - ')):
+			return RF433Msg.LOW
+		return RF433Msg.HIGH
 
 	def deviceType(self):
-		protocol = Protocol.protocolInstance(self._protocol)
+		protocol = self.__protocolInstance()
 		if not protocol:
 			return Device.TYPE_SWITCH_OUTLET
-		protocol.setModel(self._model)
 		return protocol.deviceType()
 
 	@staticmethod
@@ -170,10 +194,9 @@ class DeviceNode(RF433Node):
 		return False
 
 	def methods(self):
-		protocol = Protocol.protocolInstance(self._protocol)
+		protocol = self.__protocolInstance()
 		if not protocol:
 			return 0
-		protocol.setModel(self._model)
 		return protocol.methods()
 
 	def model(self):
@@ -197,12 +220,49 @@ class DeviceNode(RF433Node):
 		if name not in ('code', 'fade', 'house', 'system', 'unit', 'units'):
 			return
 		self._protocolParams[name] = value
+		self.__encoded.clear()
+		if self.matcher is not None:
+			self.matcher.update(self)
 		self.paramUpdated(name)
 
 	def setParams(self, params):
 		self._protocol = params.setdefault('protocol', '')
 		self._model = params.setdefault('model', '')
 		self._protocolParams = params.setdefault('protocolParams', {})
+		self.__instanceKey = None
+		self.__encoded.clear()
+		if self.matcher is not None:
+			self.matcher.update(self)
+
+	def __encode(self, protocol, action, value):
+		# The same few commands are sent over and over again, the rf-data only changes with the
+		# parameters
+		key = (
+			self._protocol, self._model, tuple(sorted(self._protocolParams.items())), action, value
+		)
+		try:
+			if key in self.__encoded:
+				return self.__encoded[key]
+		except TypeError:
+			# Unhashable parameter, don't cache
+			return protocol.stringForMethod(action, value)
+		msg = protocol.stringForMethod(action, value)
+		if len(self.__encoded) >= DeviceNode.MAX_ENCODED:
+			self.__encoded.clear()
+		self.__encoded[key] = msg
+		return msg
+
+	def __protocolInstance(self):
+		key = (self._protocol, self._model)
+		if self.__instanceKey != key:
+			self.__instance = Protocol.protocolInstance(self._protocol)
+			if self.__instance is not None:
+				self.__instance.setModel(self._model)
+			self.__instanceKey = key
+			self.__encoded.clear()
+		if self.__instance is not None:
+			self.__instance.setParameters(self._protocolParams)
+		return self.__instance
 
 class RF433(Plugin):
 	implements(ITelldusLiveObserver)
@@ -216,9 +276,12 @@ class RF433(Plugin):
 		self.hwVersion = None
 		self.devices = []
 		self.sensors = []
+		self.sensorIndex = {}
+		self.matcher = CommandMatcher()
 		self.rawEnabled = False
 		self.rawEnabledAt = 0
 		self.dev = Adapter(self, Board.rf433Port())
+		self.dev.packetFilter.window = float(Settings('rf433').get('duplicateWindow', PacketFilter.WINDOW))
 		self.deviceManager = DeviceManager(self.context)
 		self.registerSensorCleanup()
 		for dev in self.deviceManager.retrieveDevices('433'):
@@ -227,15 +290,15 @@ class RF433(Plugin):
 				continue
 			if params['type'] == 'sensor':
 				device = SensorNode()
-				self.sensors.append(device)
 			elif params['type'] == 'device':
-				device = DeviceNode(self.dev)  # pylint: disable=R0204
+				device = DeviceNode(self.dev, self.matcher)  # pylint: disable=R0204
 				self.devices.append(device)
 			else:
 				continue
 			device.setNodeId(dev.id())
 			device.setParams(params)
 			if params['type'] == 'sensor':
+				self.__addSensor(device)
 				# already loaded, keep it that way!
 				device._packageCount = 7  # pylint: disable=W0212
 				device._sensorValues = dev._sensorValues  # pylint: disable=W0212
@@ -251,7 +314,7 @@ class RF433(Plugin):
 		self.live = TelldusLive(self.context)
 
 	def addDevice(self, uuid, protocol, model, name, params):
-		device = DeviceNode(self.dev)
+		device = DeviceNode(self.dev, self.matcher)
 		if uuid:
 			device.setUuid(uuid)
 		device.setName(name)
@@ -264,10 +327,14 @@ class RF433(Plugin):
 		self.deviceManager.addDevice(device)
 
 	def cleanupSensors(self):
-		for i, sensor in enumerate(self.sensors):
-			if not sensor.isValid():
-				self.deviceManager.removeDevice(sensor.id())
-				del self.sensors[i]
+		removed = [x for x in self.sensors if not x.isValid()]
+		for sensor in removed:
+			self.deviceManager.removeDevice(sensor.id())
+			self.sensors.remove(sensor)
+		if removed:
+			self.sensorIndex = {}
+			for sensor in self.sensors:
+				self.sensorIndex.setdefault(sensor.key(), sensor)
 
 		self.deviceManager.sensorsUpdated()
 
@@ -305,8 +372,16 @@ class RF433(Plugin):
 				if device.id() == deviceId:
 					self.deviceManager.removeDevice(deviceId)
 					self.devices.remove(device)
+					self.matcher.remove(device)
 					return
 
+		elif action == 'statistics':
+			statistics = self.dev.packetFilter.statistics()
+			statistics.update(self.deviceManager.statistics())
+			statistics['sendQueue'] = self.live.statistics()
+			statistics['commandQueue'] = self.dev.commandQueue.statistics()
+			self.live.pushToWeb('rf433', 'statistics', statistics)
+
 		elif action == 'rawEnabled':
 			if data['value']:
 				self.rawEnabled = True
@@ -338,36 +413,11 @@ class RF433(Plugin):
 				self.live.pushToWeb('client', 'rawData', cmdData)
 
 	def decodeCommandData(self, msg):
-		protocol = msg['protocol']
-		model = msg['model']
 		method = msg['method']
-		methods = Protocol.methodsForProtocol(protocol, model)
-		if not method & methods:
+		if not method & Protocol.methodsForProtocol(msg['protocol'], msg['model']):
 			return
-		for device in self.devices:
-			params = device.params()
-			if params['protocol'] != protocol:
-				continue
-			if not method & device.methods():
-				continue
-			deviceParams = params['protocolParams']
-			thisDevice = True
-			for parameter in Protocol.parametersForProtocol(protocol, model):
-				if parameter not in msg:
-					thisDevice = False
-					break
-				if parameter not in deviceParams:
-					thisDevice = False
-					break
-				convertedParameter = deviceParams[parameter]
-				try:
-					convertedParameter = str(convertedParameter)
-				except Exception as __error:
-					pass
-				if msg[parameter] != convertedParameter:
-					thisDevice = False
-					break
-			if thisDevice:
+		for device in self.matcher.match(msg):
+			if method & device.methods():
 				device.setState(method, None)
 
 	def decodeData(self, cmd, params):
@@ -380,6 +430,7 @@ class RF433(Plugin):
 			logging.debug("Unknown data: %s", str(cmd))
 
 	def decodeSensor(self, msg):
+		packet = PacketFilter.key(msg)  # The decoder may change msg
 		protocol = Protocol.protocolInstance(msg['protocol'])
 		if not protocol:
 			logging.error("No known protocol for %s", msg['protocol'])
@@ -391,27 +442,28 @@ class RF433(Plugin):
 		model = data['model']
 		sensorId = data['id']
 		sensorData = data['values']
-		sensor = None
-		for lsensor in self.sensors:
-			if lsensor.compare(protocol, model, sensorId):
-				sensor = lsensor
-				break
+		sensor = self.sensorIndex.get((protocol, model, sensorId), None)
 		if sensor is None:
 			sensor = SensorNode()
 			sensor.setParams({'protocol': protocol, 'model': model, 'sensorId': sensorId})
 			sensor.setManager(self.deviceManager)
-			self.sensors.append(sensor)
+			self.__addSensor(sensor)
 		if 'battery' in data:
 			sensor.batteryLevel = data['battery']
 		sensor.updateValues(sensorData)
+		if sensor.isConfirmed():
+			# Further retransmissions of this packet can be dropped directly by the adapter
+			self.dev.packetFilter.confirm(packet)
 
 	def registerSensorCleanup(self):
 		"""Register scheduled job to clean up sensors that have not been updated for a while"""
 		Application().registerScheduledTask(self.cleanupSensors, hours=12)  # every 12th hour
-		tmr = Timer(600, self.cleanupSensors)  # run a first time after 10 minutes
-		tmr.daemon = True
-		tmr.name = 'Sensor cleanup'
-		tmr.start()
+		# Run a first time after 10 minutes, in the main thread since the sensors are changed
+		TimerService().callLater(600, Application().queue, self.cleanupSensors)
+
+	def __addSensor(self, sensor):
+		self.sensors.append(sensor)
+		self.sensorIndex.setdefault(sensor.key(), sensor)
 
 	@staticmethod
 	def __noVersion():
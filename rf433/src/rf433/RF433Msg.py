@@ -3,17 +3,32 @@
 from base import Application
 
 class RF433Msg(object):
-	def __init__(self, cmd, args = '', prefixes = {}, success=None, failure=None):
+	HIGH, NORMAL, LOW = list(range(3))  # Priorities, a lower value is sent first
+	TIMEOUT = 5  #: Default seconds to wait for the response
+
+	def __init__(self, cmd, args = '', prefixes = {}, success=None, failure=None,
+	             priority=NORMAL, key=None, timeout=TIMEOUT):
 		self._cmd = cmd
 		self._args = args
 		self._prefixes = prefixes
-		self._success = success
-		self._failure = failure
+		self._callbacks = [(success, failure)]
+		self.priority = priority
+		self.key = key  # Only the latest command with the same key waits in the queue
+		self.responseTimeout = timeout
 		self.queued = None
+		self.sent = None
 
 	def cmd(self):
 		return self._cmd
 
+	def collapse(self, msg):
+		"""Report the result of this command also to the callbacks of `msg`"""
+		self._callbacks.extend(msg._callbacks)
+
+	def replace(self, msg):
+		"""This command replaces `msg`, its result is reported to the callbacks of `msg` first"""
+		self._callbacks[:0] = msg._callbacks
+
 	def commandString(self):
 		retval = '%s%s+' % (self._cmd, self._args)
 		for p in self._prefixes:
@@ -21,12 +36,14 @@ class RF433Msg(object):
 		return retval
 
 	def response(self, params):
-		if self._success:
-			Application().queue(self._success, params)
+		for success, __failure in self._callbacks:
+			if success:
+				Application().queue(success, params)
 
 	def timeout(self):
-		if self._failure:
-			Application().queue(self._failure)
+		for __success, failure in self._callbacks:
+			if failure:
+				Application().queue(failure)
 
 	@staticmethod
 	def parseResponse(data):
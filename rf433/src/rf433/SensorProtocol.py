@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+class SensorProtocol(object):
+	"""
+	Base class for sensor protocols where the payload is described by a BitLayout.
+	Subclasses set DECODER to a compiled layout, see BitLayout.compile(), or override
+	decoder().
+	"""
+
+	DECODER = None
+
+	def decodeBatch(self, frames):
+		"""
+		Decodes a list of captured frames
+
+		:returns: a list with the decoded data for every frame, see decodeData()
+		"""
+		retval = []
+		decoders = {}
+		for data in frames:
+			if 'data' not in data:
+				retval.append(None)
+				continue
+			# Frames in a batch are usually from a few sensors only
+			key = data.get('model')
+			if key not in decoders:
+				decoders[key] = self.decoder(data)
+			decoder = decoders[key]
+			if decoder is None:
+				retval.append(None)
+				continue
+			retval.append(decoder(self, data, int(data['data'], 16)))
+		return retval
+
+	def decodeData(self, data):
+		""":returns: `data` with the decoded values added or None if it could not be decoded"""
+		if 'data' not in data:
+			return None
+		decoder = self.DECODER or self.decoder(data)
+		if decoder is None:
+			return None
+		return decoder(self, data, int(data['data'], 16))
+
+	def decoder(self, data):
+		""":returns: the compiled decoder for the payload in `data` or None if not supported"""
+		del data
+		return self.DECODER
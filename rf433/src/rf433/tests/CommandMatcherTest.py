@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from base import Application
+from ..CommandMatcher import CommandMatcher
+from ..Protocol import Protocol
+from ..RF433 import DeviceNode, RF433
+from ..RF433Msg import RF433Msg
+
+# Frames recorded from remotes, PIR and magnet sensors
+FRAMES = [
+	'Wclass:command;protocol:arctech;model:selflearning;data:0x000C0E51;',
+	'Wclass:command;protocol:arctech;model:selflearning;data:0x000C0E41;',
+	'Wclass:command;protocol:arctech;model:selflearning;data:0x000C0E52;',
+	'Wclass:command;protocol:arctech;model:selflearning;data:0x00123590;',
+	'Wclass:command;protocol:arctech;model:selflearning;data:0x0000F9FF;',
+	'Wclass:command;protocol:arctech;model:codeswitch;data:0xE22;',
+	'Wclass:command;protocol:arctech;model:codeswitch;data:0x622;',
+	'Wclass:command;protocol:arctech;model:codeswitch;data:0xF60;',
+	'Wclass:command;protocol:sartano;model:codeswitch;data:0x955;',
+]
+
+DEVICES = [
+	('arctech', 'selflearning-switch', {'house': '12345', 'unit': '2'}),
+	('arctech', 'selflearning-dimmer:telldus', {'house': '12345', 'unit': '2'}),
+	('arctech', 'selflearning-bell', {'house': '12345', 'unit': '3'}),
+	('arctech', 'selflearning-switch:nexa-pir', {'house': 18646, 'unit': 1}),
+	('arctech', 'selflearning-switch:telldus-magnet', {'house': '999', 'unit': '16'}),
+	('arctech', 'selflearning-switch', {'house': '999'}),
+	('arctech', 'codeswitch', {'house': 'C', 'unit': '3'}),
+	('arctech', 'bell', {'house': 'A', 'unit': '7'}),
+	('comen', 'selflearning-switch', {'house': '4661', 'unit': '1'}),
+	('sartano', 'codeswitch', {'code': '1011101110'}),
+	('waveman', 'codeswitch', {'house': 'C', 'unit': '3'}),
+	('brateck', '', {'house': '01-1'}),
+]
+
+class CommandMatcherTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.rf433 = object.__new__(RF433)
+		self.rf433.devices = []
+		self.rf433.matcher = CommandMatcher()
+		self.received = []
+		for i, (protocol, model, params) in enumerate(DEVICES):
+			self.addDevice(i + 1, protocol, model, params)
+
+	def addDevice(self, deviceId, protocol, model, params):
+		device = DeviceNode(None, self.rf433.matcher)
+		device.setId(deviceId)
+		device.setParams({'protocol': protocol, 'model': model, 'protocolParams': dict(params)})
+		device.setState = lambda method, __value, device=device: self.received.append(
+			(device.id(), method)
+		)
+		self.rf433.devices.append(device)
+		return device
+
+	def matches(self):
+		"""Feed all frames, :returns: the matches and the matches found by scanning all devices"""
+		self.received = []
+		expected = []
+		for frame in FRAMES:
+			(__cmd, params) = RF433Msg.parseResponse(frame)
+			for msg in Protocol.decodeData(params):
+				self.rf433.decodeCommandData(msg)
+				expected.extend(self.scan(msg))
+		return sorted(self.received), sorted(expected)
+
+	def scan(self, msg):
+		# How decodeCommandData() matched the devices before the table was introduced
+		method = msg['method']
+		if not method & Protocol.methodsForProtocol(msg['protocol'], msg['model']):
+			return []
+		found = []
+		for device in self.rf433.devices:
+			params = device.params()
+			if params['protocol'] != msg['protocol'] or not method & device.methods():
+				continue
+			for parameter in Protocol.parametersForProtocol(msg['protocol'], msg['model']):
+				if parameter not in msg or parameter not in params['protocolParams']:
+					break
+				if str(params['protocolParams'][parameter]) != msg[parameter]:
+					break
+			else:
+				found.append((device.id(), method))
+		return found
+
+	def testRecordedFrames(self):
+		received, expected = self.matches()
+		self.assertEqual(received, expected)
+		self.assertEqual(received, [
+			(1, 1), (1, 2), (2, 1), (2, 2), (3, 4), (4, 1), (5, 1), (7, 1), (7, 2), (9, 1), (10, 2)
+		])
+
+	def testUpdate(self):
+		devices = self.rf433.devices
+		devices[0].setParameter('unit', '3')
+		devices[2].setParams({
+			'protocol': 'arctech',
+			'model': 'selflearning-switch',
+			'protocolParams': {'house': '1', 'unit': '1'},
+		})
+		self.rf433.matcher.remove(devices[6])
+		del devices[6]
+		self.addDevice(13, 'sartano', 'codeswitch', {'code': '1111011001'})
+		received, expected = self.matches()
+		self.assertEqual(received, expected)
+		self.assertEqual(received, [(1, 1), (2, 1), (2, 2), (4, 1), (5, 1), (9, 1), (10, 2), (13, 2)])
+		self.assertEqual(len(self.rf433.matcher), 10)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from mock import patch
+
+from base import Application
+from ..CommandQueue import CommandQueue
+from ..RF433Msg import RF433Msg
+
+class CommandQueueTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+
+	def testPriority(self):
+		queue = CommandQueue()
+		queue.put(RF433Msg('S', 'scene1', priority=RF433Msg.LOW), now=0)
+		queue.put(RF433Msg('S', 'scene2', priority=RF433Msg.LOW), now=0)
+		queue.put(RF433Msg('V'), now=1)
+		queue.put(RF433Msg('S', 'interactive', priority=RF433Msg.HIGH), now=2)
+		sent = [queue.pop(now=3).commandString() for __i in range(4)]
+		self.assertEqual(sent, ['Sinteractive+', 'V+', 'Sscene1+', 'Sscene2+'])
+		self.assertIsNone(queue.pop())
+		statistics = queue.statistics()
+		self.assertEqual(statistics['maxDepth'], 4)
+		self.assertEqual(statistics['waitMax'], 3)
+		self.assertEqual(statistics['waitAvg'], 2.25)
+
+	def testCollapse(self):
+		queue = CommandQueue()
+		called = []
+		first = RF433Msg('S', 'on', success=called.append, priority=RF433Msg.LOW, key=1)
+		self.assertTrue(queue.put(first))
+		queue.put(RF433Msg('S', 'other', priority=RF433Msg.LOW))
+		# The same command interactively, the waiting command is moved forward
+		repeat = RF433Msg('S', 'on', success=called.append, priority=RF433Msg.HIGH, key=1)
+		self.assertFalse(queue.put(repeat))
+		self.assertEqual(len(queue), 2)
+		msg = queue.pop(now=10)
+		self.assertIs(msg, first)
+		msg.sent = 10
+		queue.done(msg, now=10.5)
+		with patch.object(Application, 'queue', side_effect=lambda func, params: func(params)):
+			msg.response('ok')
+		self.assertEqual(called, ['ok', 'ok'])
+		# Not waiting anymore, queued again
+		self.assertTrue(queue.put(RF433Msg('S', 'on', key=1)))
+		statistics = queue.statistics()
+		self.assertEqual(statistics['collapsed'], 1)
+		self.assertEqual(statistics['airtimeMax'], 0.5)
+
+	def testSameDevice(self):
+		# A scene turns the device off and then the user turns it on
+		queue = CommandQueue()
+		queue.put(RF433Msg('S', 'other', priority=RF433Msg.LOW, key=2))
+		queue.put(RF433Msg('S', 'OFF', priority=RF433Msg.LOW, key=1))
+		self.assertTrue(queue.put(RF433Msg('S', 'ON', priority=RF433Msg.HIGH, key=1)))
+		sent = [queue.pop().commandString() for __i in range(len(queue))]
+		self.assertEqual(sent, ['SON+', 'Sother+'])
+		# The last command is not collapsed into an older one
+		queue.put(RF433Msg('S', 'ON', priority=RF433Msg.LOW, key=1))
+		queue.put(RF433Msg('S', 'OFF', priority=RF433Msg.HIGH, key=1))
+		queue.put(RF433Msg('S', 'ON', priority=RF433Msg.HIGH, key=1))
+		sent = [queue.pop().commandString() for __i in range(len(queue))]
+		self.assertEqual(sent, ['SON+'])
+		self.assertEqual(queue.statistics()['replaced'], 3)
+		# The callbacks of a replaced command are called, oldest first
+		called = []
+		queue.put(RF433Msg('S', 'OFF', success=lambda params: called.append(('OFF', params)), key=1))
+		queue.put(RF433Msg('S', 'ON', failure=lambda: called.append('ON failed'), key=1))
+		msg = queue.pop()
+		with patch.object(Application, 'queue', side_effect=lambda func, *args: func(*args)):
+			msg.response('ok')
+			msg.timeout()
+		self.assertEqual(called, [('OFF', 'ok'), 'ON failed'])
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..LineBuffer import LineBuffer
+
+class LineBufferTest(unittest.TestCase):
+	def setUp(self):
+		self.buffer = LineBuffer()
+
+	def testSplitFrame(self):
+		self.assertEqual(self.buffer.feed(b'+Wclass:sensor;'), [])
+		self.assertEqual(self.buffer.feed(b'protocol:mandolyn;'), [])
+		self.assertEqual(
+			self.buffer.feed(b'data:0x1C617720;\r\n+V'),
+			[b'Wclass:sensor;protocol:mandolyn;data:0x1C617720;']
+		)
+		self.assertEqual(self.buffer.feed(b'2\r\n'), [b'V2'])
+
+	def testSeveralFrames(self):
+		self.assertEqual(self.buffer.feed(b'+S\r\n+V2\r\n+W\r\n+'), [b'S', b'V2', b'W'])
+		self.assertEqual(self.buffer.feed(b'V3\n'), [b'V3'])
+
+	def testNoise(self):
+		self.assertEqual(self.buffer.feed(b'\x00\xff+V2\r\n'), [b'V2'])
+		# Lines without the start of a frame and empty frames are dropped
+		self.assertEqual(self.buffer.feed(b'garbage\r\n\r\n+\r\n+S\r\n'), [b'S'])
+
+	def testMaxLength(self):
+		self.assertEqual(self.buffer.feed(b'+W' + b'x' * LineBuffer.MAX_LENGTH), [])
+		# The buffer was reset, the rest of the too long line is not a frame
+		self.assertEqual(self.buffer.feed(b'xx\r\n+V2\r\n'), [b'V2'])
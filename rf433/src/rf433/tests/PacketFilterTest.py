@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..PacketFilter import PacketFilter
+
+class PacketFilterTest(unittest.TestCase):
+	def setUp(self):
+		self.filter = PacketFilter(window=1.0)
+		self.packet = {'protocol': 'fineoffset', 'data': '0x5A36FC1D18'}
+
+	def testUnconfirmed(self):
+		# All packets are needed to add a new sensor
+		self.assertTrue(self.filter.accept(self.packet, now=0))
+		self.assertTrue(self.filter.accept(self.packet, now=0.1))
+		self.assertEqual(self.filter.statistics()['duplicates'], 0)
+
+	def testWindow(self):
+		self.assertTrue(self.filter.accept(self.packet, now=0))
+		self.filter.confirm(PacketFilter.key(self.packet))
+		self.assertFalse(self.filter.accept(self.packet, now=0.5))
+		# Retransmissions extend the window
+		self.assertFalse(self.filter.accept(self.packet, now=1.2))
+		self.assertTrue(self.filter.accept(self.packet, now=2.3))
+		statistics = self.filter.statistics()
+		self.assertEqual((statistics['received'], statistics['duplicates']), (4, 2))
+
+	def testNewReading(self):
+		self.assertTrue(self.filter.accept(self.packet, now=0))
+		self.filter.confirm(PacketFilter.key(self.packet))
+		# The next reading from the same sensor has another payload
+		self.assertTrue(self.filter.accept(dict(self.packet, data='0x5A36FD1D19'), now=0.2))
+		self.assertFalse(self.filter.accept(self.packet, now=0.3))
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from mock import MagicMock, patch
+
+from base import Application
+from telldus import Device
+from ..Protocol import Protocol
+from ..ProtocolArctech import ProtocolArctech
+from ..RF433 import DeviceNode
+
+SHORT, LONG = chr(24), chr(127)
+ONE = SHORT + LONG + SHORT + SHORT
+ZERO = SHORT + SHORT + SHORT + LONG
+
+# Encoded with the string concatenating encoders, before they were rewritten
+GOLDEN = [
+	('arctech', 'codeswitch', {'house': 'C', 'unit': '3'}, Device.TURNON, None, {
+		'S': '$k$k$kk$$k$k$k$k$k$k$kk$$k$k$k$k$k$k$kk$$kk$$kk$$k'
+	}),
+	('arctech', 'selflearning-switch', {'house': '1', 'unit': '2'}, Device.TURNOFF, None, {
+		'S': SHORT + chr(255) + ZERO*25 + ONE + ZERO + ZERO + ZERO*3 + ONE + SHORT
+	}),
+	('arctech', 'selflearning-dimmer', {'house': '3', 'unit': '1'}, Device.DIM, 128, {
+		'S': SHORT + chr(255) + ZERO*24 + ONE*2 + ZERO + SHORT*4 + ZERO*4 + ONE + ZERO*3 + SHORT
+	}),
+	('brateck', '', {'house': '01-1'}, Device.UP, None, {
+		'S': 'V!V!!VV!V!V!!V!VV!V!!V!V!V!V!V!V!'
+	}),
+	('comen', 'selflearning-switch', {'house': '1', 'unit': '1'}, Device.TURNON, None, {
+		'S': SHORT + chr(255) + ZERO*23 + ONE + ONE + ZERO + ZERO + ONE + ZERO*4 + SHORT
+	}),
+	('everflourish', 'selflearning', {'house': '1234', 'unit': '2'}, Device.TURNON, None, {
+		'S': '<<<<<<<<<<<r<<<r<<<r<r<<<<<r<<<r<r<<<r<<<<<r<r<<<<<r<<<r<r<<<<<r<<<r<r<<<r<<<r<<<'
+		     '<<r<r<<<r<<<r<<<r<<<r<<<<<<'
+	}),
+	('fuhaote', 'codeswitch', {'code': '0101011100'}, Device.TURNOFF, None, {
+		'S': '\x13::\x13:\x13:\x13\x13::\x13:\x13:\x13\x13::\x13\x13:\x13:\x13:\x13:\x13:\x13:'
+		     '\x13::\x13\x13::\x13\x13:\x13:\x13::\x13\x13'
+	}),
+	('hasta', 'selflearningv2', {'house': '4660', 'unit': '2'}, Device.DOWN, None, {
+		'S': '\xff\x01\xd0\xfa\x9b##BB##B#BB##B#B#B#B#BB##BB#B##B#B#BB##B#BB##B#B#BB##B#B#B#B#B'
+		     '#B#B#B#B#BB##BB##BB#B#',
+		'R': 10,
+		'P': 0,
+	}),
+	('ikea', 'selflearning', {'system': '2', 'units': '1,3', 'fade': 'true'}, Device.DIM, 100, {
+		'S': 'TTTTTT\xaa\xaa\xaa\xaaTT\xaaTT\xaaTT\xaa\xaa\xaa\xaa\xaa\xaaTT\xaa\xaa\xaaTT\xaaTTTT'
+		     'TT\xaa'
+	}),
+	('kangtai', 'selflearning', {'house': '4660', 'unit': '3'}, Device.TURNON, None, {
+		'S': '&\xe1p%%p%p%pp%p%p%%p%pp%p%p%%pp%%pp%%p%pp%p%p%p%%p%p',
+		'P': 0,
+	}),
+	('risingsun', 'codeswitch', {'house': '2', 'unit': '3'}, Device.TURNON, None, {
+		'S': '.ee..e.e.ee..ee..ee..ee..e.e.ee..ee..ee..ee..ee..e'
+	}),
+	('sartano', 'codeswitch', {'code': '0101010101'}, Device.TURNOFF, None, {
+		'S': '$kk$$k$k$kk$$k$k$kk$$k$k$kk$$k$k$kk$$k$k$kk$$k$k$k'
+	}),
+	('silvanchip', 'ecosavers', {'house': '123', 'unit': '2'}, Device.TURNON, None, {
+		'S': '%\xff\x01\xff\x01\xff\x01\xff\x01%%i%i%i%i%i%i%i%i%i%i%i%i%ii%i%i%i%%ii%i%i%%ii%'
+		     'i%%i'
+	}),
+	('upm', 'selflearning', {'house': '2049', 'unit': '3'}, Device.TURNON, None, {
+		'S': ';~;;~;~;~;~;~;~;~;~;~;~~;;~~;;~~;;~;~;~;~'
+	}),
+	('waveman', 'codeswitch', {'house': 'B', 'unit': '4'}, Device.TURNOFF, None, {
+		'S': '$kk$$k$k$k$k$k$k$kk$$kk$$k$k$k$k$k$k$k$k$k$k$k$k$k'
+	}),
+	('x10', 'codeswitch', {'house': 'H', 'unit': '9'}, Device.TURNON, None, {
+		'S': '\xff\x01\xff\x01\xff\x01d\xff\x01\xb4;\xa9;;;\xa9;\xa9;;;\xa9;;;;;;;\xa9;;;;;\xa9;;'
+		     ';\xa9;\xa9;;;;;;;;;;;;;;;;;\xa9;\xa9;\xa9;\xa9;\xa9;\xa9;\xa9;\xa9;'
+	}),
+	('yidong', 'selflearning', {'unit': '3'}, Device.TURNON, None, {
+		'S': '$k$k$k$k$k$k$kk$$k$k$kk$$kk$$k$k$k$k$kk$$k$k$kk$$k'
+	}),
+]
+
+class ProtocolTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+
+	def testEncoders(self):
+		for (protocol, model, params, method, level, expected) in GOLDEN:
+			instance = Protocol.protocolInstance(protocol)
+			instance.setModel(model)
+			instance.setParameters(params)
+			self.assertEqual(instance.stringForMethod(method, level), expected, protocol)
+
+	def testProtocolInstance(self):
+		self.assertIsInstance(Protocol.protocolInstance('arctech'), ProtocolArctech)
+		self.assertIsNot(Protocol.protocolInstance('arctech'), Protocol.protocolInstance('arctech'))
+		self.assertIsNone(Protocol.protocolInstance('unknown'))
+
+	def testEncodedCache(self):
+		controller = MagicMock()
+		device = DeviceNode(controller)
+		device.setParams({
+			'protocol': 'arctech',
+			'model': 'selflearning-switch',
+			'protocolParams': {'house': '1', 'unit': '2'},
+		})
+		with patch.object(
+			ProtocolArctech, 'stringForMethod', autospec=True,
+			side_effect=ProtocolArctech.stringForMethod
+		) as encoder:
+			for __i in range(3):
+				device._command(Device.TURNOFF, None, None, None)  # pylint: disable=W0212
+			self.assertEqual(encoder.call_count, 1)
+			self.assertEqual(device.methods(), Device.TURNON | Device.TURNOFF | Device.LEARN)
+			device.setParameter('unit', '1')
+			device._command(Device.TURNOFF, None, None, None)  # pylint: disable=W0212
+			self.assertEqual(encoder.call_count, 2)
+		sent = [args[0]._args for args, __kwargs in controller.queue.call_args_list]
+		self.assertEqual(sent[0], GOLDEN[1][5]['S'])
+		self.assertEqual(sent[2], sent[0])
+		self.assertEqual(sent[3], SHORT + chr(255) + ZERO*25 + ONE + ZERO*6 + SHORT)
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+import shutil
+import sys
+import tempfile
+import unittest
+
+from mock import MagicMock, patch
+
+from base import Application, PluginContext
+from board import Board
+from telldus import DeviceManager
+from ..CommandMatcher import CommandMatcher
+from ..PacketFilter import PacketFilter
+from ..ProtocolFineoffset import ProtocolFineoffset
+from ..RF433 import RF433
+from ..RF433Msg import RF433Msg
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class RF433Test(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.directory = tempfile.mkdtemp()
+		module = sys.modules['telldus.DeviceManager']
+		self.patchers = [
+			patch.object(module, 'Settings', MemorySettings),
+			patch.object(module, 'TelldusLive'),
+			patch.object(module, 'TimerService'),
+			patch.object(Board, 'configDir', return_value=self.directory),
+		]
+		for patcher in self.patchers:
+			patcher.start()
+		self.manager = DeviceManager(PluginContext())
+		self.manager.live.registered = False
+		# Only the parts of the plugin used for sensors, without an adapter
+		self.rf433 = object.__new__(RF433)
+		self.rf433.devices = []
+		self.rf433.sensors = []
+		self.rf433.sensorIndex = {}
+		self.rf433.matcher = CommandMatcher()
+		self.rf433.rawEnabled = False
+		self.rf433.live = MagicMock()
+		self.rf433.deviceManager = self.manager
+		self.rf433.dev = MagicMock(packetFilter=PacketFilter())
+
+	def tearDown(self):
+		for patcher in reversed(self.patchers):
+			patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def receive(self, sensorId, count=7):
+		value = (sensorId << 20) | (215 << 8) | 45
+		value = (value << 8) | ProtocolFineoffset().calculateChecksum(value)
+		for __unused in range(count):
+			cmd, params = RF433Msg.parseResponse('Wclass:sensor;protocol:fineoffset;data:%010X' % value)
+			self.rf433.decodeData(cmd, params)
+
+	def sensor(self, sensorId):
+		return self.rf433.sensorIndex.get(('fineoffset', 'temperaturehumidity', sensorId), None)
+
+	def testSensorIndex(self):
+		self.receive(1)
+		self.receive(2)
+		self.receive(3, count=1)
+		first, second, unconfirmed = self.sensor(1), self.sensor(2), self.sensor(3)
+		self.assertEqual(self.rf433.sensors, [first, second, unconfirmed])
+		# The same sensor is updated by further packets
+		self.receive(1)
+		self.assertIs(self.sensor(1), first)
+		self.assertEqual(len(self.rf433.sensors), 3)
+		# Only confirmed sensors are added to the device manager
+		self.assertEqual(self.manager.retrieveDevices('433'), [first, second])
+		# Not updated for more than a week
+		for values in first._sensorValues.values():  # pylint: disable=protected-access
+			for value in values:
+				value['lastUpdated'] -= 604801
+		unconfirmed.declaredDead = 1
+		self.rf433.cleanupSensors()
+		self.assertEqual(self.rf433.sensorIndex, {second.key(): second})
+		self.assertEqual(self.rf433.sensors, [second])
+		self.assertIsNone(self.manager.device(first.id()))
+		self.assertEqual(self.manager.retrieveDevices('433'), [second])
+		# A removed sensor is added again as a new sensor
+		self.receive(1)
+		self.assertIsNot(self.sensor(1), first)
+		self.assertEqual(self.rf433.sensors, [second, self.sensor(1)])
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+
+import sys
+import traceback
+import unittest
+
+from base import Application
+from ..BitLayout import BitLayout, Digits, NibbleSum
+from ..Protocol import Protocol
+from ..RF433Msg import RF433Msg
+
+# Frames and what they decoded to before the decoders used BitLayout. The values are
+# (type, value).
+CORPUS = [
+	('Wclass:sensor;protocol:oregon;model:EA4C;data:CD61D8F1DAD6;',
+		{'model': 'EA4C', 'id': 97, 'battery': 253, 'values': [(1, -361.3)]}),
+	('Wclass:sensor;protocol:oregon;model:EA4C;data:1027C3860BC5;',
+		{'model': 'EA4C', 'id': 39, 'battery': 253, 'values': [(1, -441.2)]}),
+	('Wclass:sensor;protocol:oregon;model:EA4C;data:1E2F414C7435;',
+		{'model': 'EA4C', 'id': 47, 'battery': 253, 'values': [(1, 52.4)]}),
+	('Wclass:sensor;protocol:oregon;model:0xEA4C;data:91B72265B1F5;', None),
+	('Wclass:sensor;protocol:oregon;model:1A2D;data:C842C19AC1FB714C;',
+		{'model': '1A2D', 'id': 66, 'battery': 253, 'values': [(1, 101.2), (2, 1112)]}),
+	('Wclass:sensor;protocol:oregon;model:1A2D;data:7EBA03520D585E58;',
+		{'model': '1A2D', 'id': 186, 'battery': 253, 'values': [(1, -52.0), (2, 80)]}),
+	('Wclass:sensor;protocol:oregon;model:1A2D;data:64C371CFAE7F7A11;',
+		{'model': '1A2D', 'id': 195, 'battery': 253, 'values': [(1, -135.7), (2, 1510)]}),
+	('Wclass:sensor;protocol:oregon;model:0x1A2D;data:B8378D8291CBE386;', None),
+	('Wclass:sensor;protocol:oregon;model:F824;data:D73ECDD0646879;',
+		{'model': 'F824', 'id': 10, 'values': [(1, 144.2), (2, 46)]}),
+	('Wclass:sensor;protocol:oregon;model:F824;data:F9EEF8FF876B98;',
+		{'model': 'F824', 'id': 23, 'values': [(1, -159.5), (2, 78)]}),
+	('Wclass:sensor;protocol:oregon;model:F824;data:68457E41ADF477;',
+		{'model': 'F824', 'id': 12, 'values': [(1, -54.7), (2, 1310)]}),
+	('Wclass:sensor;protocol:oregon;model:0xF824;data:129C03B9CF3DDE;', None),
+	('Wclass:sensor;protocol:oregon;model:1984;data:2AACBA426A621C61;',
+		{'model': '1984', 'id': 20, 'battery': 255, 'values': [(16, 247.5), (32, 12.6), (64, 106.2)]}),
+	('Wclass:sensor;protocol:oregon;model:1984;data:22197C77984FB475;',
+		{'model': '1984', 'id': 3, 'battery': 253, 'values': [(16, 157.5), (32, 125.4), (64, 89.7)]}),
+	('Wclass:sensor;protocol:oregon;model:1984;data:8FC947F3FC72038F;',
+		{'model': '1984', 'id': 27, 'battery': 253, 'values': [(16, 90.0), (32, 2.7), (64, 135.3)]}),
+	('Wclass:sensor;protocol:oregon;model:0x1984;data:B9126CEA472FC3B4;', None),
+	('Wclass:sensor;protocol:oregon;model:1994;data:64363D4C35F3AE65;',
+		{'model': '1994', 'id': 7, 'battery': 255, 'values': [(16, 67.5), (32, 104.5), (64, 54.2)]}),
+	('Wclass:sensor;protocol:oregon;model:1994;data:F4D2E33E3127864;',
+		{'model': '1994', 'id': 19, 'battery': 255, 'values': [(16, 45.0), (32, 72.1), (64, 44.3)]}),
+	('Wclass:sensor;protocol:oregon;model:1994;data:F85EA4263D145178;',
+		{'model': '1994', 'id': 13, 'battery': 255, 'values': [(16, 225.0), (32, 54.1), (64, 133.6)]}),
+	('Wclass:sensor;protocol:oregon;model:0x1994;data:2EC3CC333BC7BDA8;', None),
+	('Wclass:sensor;protocol:oregon;model:2914;data:85A96BF995BF5068;',
+		{'model': '2914', 'id': 15, 'battery': 253, 'values': [(4, 23243.9), (8, 13083.9)]}),
+	('Wclass:sensor;protocol:oregon;model:2914;data:6E68EB72214000B5;',
+		{'model': '2914', 'id': 20, 'battery': 253, 'values': [(4, 688.6), (8, 10.5)]}),
+	('Wclass:sensor;protocol:oregon;model:2914;data:D98497122240A8F5;',
+		{'model': '2914', 'id': 17, 'battery': 255, 'values': [(4, 553.5), (8, 205750.7)]}),
+	('Wclass:sensor;protocol:oregon;model:0x2914;data:71286AA51EADA597;', None),
+	('Wclass:sensor;protocol:oregon;model:C844;data:628AF44C95;',
+		{'model': 'C844', 'id': 10, 'values': [(1, -45.5)]}),
+	('Wclass:sensor;protocol:oregon;model:C844;data:67DFAF4136;',
+		{'model': 'C844', 'id': 20, 'values': [(1, -56.0)]}),
+	('Wclass:sensor;protocol:oregon;model:C844;data:8787B405E4;',
+		{'model': 'C844', 'id': 15, 'values': [(1, -5.1)]}),
+	('Wclass:sensor;protocol:oregon;model:0xC844;data:FC4249DC01;', None),
+	('Wclass:sensor;protocol:oregon;model:EC40;data:6820930B54;',
+		{'model': 'EC40', 'id': 10, 'values': [(1, -3.9)]}),
+	('Wclass:sensor;protocol:oregon;model:EC40;data:57AB45F8F5;',
+		{'model': 'EC40', 'id': 17, 'values': [(1, -155.4)]}),
+	('Wclass:sensor;protocol:oregon;model:EC40;data:E66D6C8CB6;',
+		{'model': 'EC40', 'id': 12, 'values': [(1, -92.6)]}),
+	('Wclass:sensor;protocol:oregon;model:0xEC40;data:A45BDC2BE4;', None),
+	('Wclass:sensor;protocol:oregon;model:D874;data:702286F51D;',
+		{'model': 'D874', 'id': 2, 'battery': 253, 'values': [(128, 68)]}),
+	('Wclass:sensor;protocol:oregon;model:D874;data:B3D757FEEB;',
+		{'model': 'D874', 'id': 16, 'battery': 255, 'values': [(128, 75)]}),
+	('Wclass:sensor;protocol:oregon;model:D874;data:732DB0BE2D;',
+		{'model': 'D874', 'id': 5, 'battery': 255, 'values': [(128, 11)]}),
+	('Wclass:sensor;protocol:oregon;model:0xD874;data:E9D8D95C1D;', None),
+	('Wclass:sensor;protocol:fineoffset;data:5A36FC1D18;',
+		{'model': 'temperaturehumidity', 'id': 163, 'values': [(1, 178.8), (2, 29)]}),
+	('Wclass:sensor;protocol:fineoffset;data:0895E017A0;',
+		{'model': 'temperaturehumidity', 'id': 137, 'values': [(1, 150.4), (2, 23)]}),
+	('Wclass:sensor;protocol:fineoffset;data:2002252959;',
+		{'model': 'temperaturehumidity', 'id': 0, 'values': [(1, 54.9), (2, 41)]}),
+	('Wclass:sensor;protocol:fineoffset;data:DD7FD15127;', None),
+	('Wclass:sensor;protocol:mandolyn;data:0x619ADB5A;',
+		{'id': 61, 'battery': 255, 'values': [(1, 169.4), (2, 26)]}),
+	('Wclass:sensor;protocol:mandolyn;data:0x1F291B0B;',
+		{'id': 14, 'battery': 253, 'values': [(1, -23.0), (2, 41)]}),
+	('Wclass:sensor;protocol:mandolyn;data:0x1C617720;',
+		{'id': 14, 'battery': 253, 'values': [(1, 69.1), (2, 97)]}),
+	('Wclass:sensor;protocol:mandolyn;', None),
+	('Wclass:sensor;protocol:oregon;model:ABCD;data:1234;', None),
+	('Wclass:sensor;protocol:oregon;data:1234;', None),
+	('Wclass:sensor;protocol:fineoffset;model:x;', None),
+]
+
+class SensorDecoderTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+
+	def assertDecoded(self, frame, decoded, expected):
+		if expected is None:
+			self.assertIsNone(decoded, frame)
+			return
+		for key in ('model', 'id'):
+			if key in expected:
+				self.assertEqual(repr(decoded[key]), repr(expected[key]), frame)
+		self.assertEqual(decoded.get('battery'), expected.get('battery'), frame)
+		values = [(value['type'], value['value']) for value in decoded['values']]
+		# repr() to also compare int, long and float
+		self.assertEqual(repr(values), repr(expected['values']), frame)
+
+	def testCorpus(self):
+		for (frame, expected) in CORPUS:
+			(__cmd, params) = RF433Msg.parseResponse(frame)
+			decoded = Protocol.protocolInstance(params['protocol']).decodeData(params)
+			self.assertDecoded(frame, decoded, expected)
+
+	def testBatch(self):
+		frames = {}
+		for (frame, expected) in CORPUS:
+			(__cmd, params) = RF433Msg.parseResponse(frame)
+			frames.setdefault(params['protocol'], []).append((frame, params, expected))
+		for protocol in frames:
+			params = [x[1] for x in frames[protocol]]
+			decoded = Protocol.protocolInstance(protocol).decodeBatch(params)
+			for (frame, __params, expected), data in zip(frames[protocol], decoded):
+				self.assertDecoded(frame, data, expected)
+
+	def testLayout(self):
+		layout = BitLayout([('low', 0, 4), ('flag', 7, 1), ('high', 8, 8)])
+		self.assertEqual(layout.decode(0x1A8F), {'low': 0xF, 'flag': 1, 'high': 0x1A})
+		nibbles = BitLayout.nibbles(['checksum', None, 'a', 'b'], NibbleSum([2, 3], 1, [0]))
+		self.assertEqual(nibbles.decode(0x2306), {'checksum': 6, 'a': 3, 'b': 2})
+		self.assertIsNone(nibbles.decode(0x2307))
+		self.assertTrue(NibbleSum([2, 3], 1, [0])(0x2306))
+		self.assertFalse(NibbleSum([2, 3], 1, [0])(0x2307))
+		self.assertEqual(nibbles.decodeAll([0x2307, 0x2306]), [None, nibbles.decode(0x2306)])
+		# Sums above 0xF are masked when compared with one nibble
+		self.assertIsNotNone(BitLayout([], NibbleSum([1, 2], 1, [0], mask=0xF)).decode(0xFFF))
+		self.assertIsNone(BitLayout([], NibbleSum([1, 2], 1, [0])).decode(0xFFF))
+
+	def testCompile(self):
+		nibbles = BitLayout.nibbles(['checksum', None, 'a', 'b'], NibbleSum([2, 3], 1, [0]))
+		decode = nibbles.compile(
+			lambda obj, data, a, b, checksum, name: (obj, data, a, b, checksum, name),
+			invalid=lambda obj, data, value: value,
+			name='test'
+		)
+		self.assertEqual(decode('obj', 'data', 0x2306), ('obj', 'data', 3, 2, 6, 'test'))
+		self.assertEqual(decode('obj', 'data', 0x2307), 0x2307)
+		self.assertIsNone(nibbles.compile(lambda obj, data, a, b, checksum: a)(None, None, 0x2307))
+		# The arguments of the handler must match the fields
+		self.assertRaises(ValueError, nibbles.compile, lambda obj, data, a, b: a)
+
+	def testTraceback(self):
+		def fail(obj, data, a):
+			raise ValueError(a)
+		decode = BitLayout([('a', 0, 4)]).compile(fail)
+		try:
+			decode(None, None, 0x5)
+		except ValueError:
+			(filename, __line, function, text) = traceback.extract_tb(sys.exc_info()[2])[1]
+		self.assertTrue(filename.startswith('<BitLayout fail #'), filename)
+		self.assertEqual((function, text), ('decode', 'return handler(obj, data, v0)'))
+
+	def testDigits(self):
+		layout = BitLayout.nibbles([], fields=[
+			Digits('integer', [0, 1]),
+			Digits('fixed', [0, 1, 2, 3], decimals=3),
+		])
+		self.assertEqual(layout.decode(0x0124), {'integer': 42, 'fixed': float('4.210')})
+		# A nibble above 9 is two digits
+		self.assertEqual(layout.decode(0x5C31), {'integer': 13, 'fixed': float('1.3125')})
@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+
+from .CommandMatcherTest import CommandMatcherTest
+from .CommandQueueTest import CommandQueueTest
+from .LineBufferTest import LineBufferTest
+from .PacketFilterTest import PacketFilterTest
+from .ProtocolTest import ProtocolTest
+from .RF433Test import RF433Test
+from .SensorDecoderTest import SensorDecoderTest
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import uuid
+
+class DeltaReport(object):
+	"""
+	Keeps track of what has been reported to Live! so only the changes since the last report
+	acknowledged by the server needs to be sent.
+
+	Every change to an item increases the version. The versions are only valid within a
+	session, a new session is started every time the server is restarted.
+	"""
+
+	def __init__(self):
+		self.session = uuid.uuid4().hex
+		self.version = 0
+		self.acknowledged = None  # Version acknowledged by the server, None for unknown
+		self.__items = {}  # id -> (data, version)
+		self.__removed = {}  # id -> version
+
+	def acknowledge(self, session, version):
+		"""Called when the server has processed the report with `version`"""
+		try:
+			version = int(version)
+		except (TypeError, ValueError):
+			version = None
+		if session != self.session or version is None or version > self.version:
+			# Not ours
+			self.acknowledged = None
+			return
+		self.acknowledged = max(version, self.acknowledged or 0)
+		# Removals acknowledged are not needed anymore
+		for itemId in [x for x, v in self.__removed.items() if v <= version]:
+			del self.__removed[itemId]
+
+	def delta(self):
+		"""
+		:returns: a tuple with the changed items and the ids of the removed items since the
+		          acknowledged version, or None if a full report must be sent
+		"""
+		if self.acknowledged is None:
+			return None
+		changed = [data for data, version in self.__items.values() if version > self.acknowledged]
+		removed = sorted(x for x, version in self.__removed.items() if version > self.acknowledged)
+		return (changed, removed)
+
+	def forget(self):
+		"""The server does not know about any version, the next report must be complete"""
+		self.acknowledged = None
+
+	def header(self):
+		""":returns: the version information sent with a report"""
+		return {'session': self.session, 'version': self.version}
+
+	def update(self, items):
+		"""
+		Update the items to report.
+
+		:param items: a dict with the id and data for all current items
+		"""
+		for itemId, data in items.items():
+			previous = self.__items.get(itemId)
+			if previous is not None and previous[0] == data:
+				continue
+			self.version = self.version + 1
+			self.__items[itemId] = (data, self.version)
+			self.__removed.pop(itemId, None)
+		for itemId in [x for x in self.__items if x not in items]:
+			self.version = self.version + 1
+			del self.__items[itemId]
+			self.__removed[itemId] = self.version
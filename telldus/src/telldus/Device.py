@@ -114,6 +114,8 @@ class Device(object):
 	BATTERY_UNKNOWN = 254  # Battery status, if not percent value
 	BATTERY_OK = 253  # Battery status, if not percent value
 
+	commandOrigin = False  #: Set to True in subclasses where _command() takes `origin`
+
 	def __init__(self):
 		super(Device, self).__init__()
 		self._id = 0
@@ -221,15 +223,21 @@ class Device(object):
 		if method == 0:
 			triggerFail(0)
 			return
+		kwargs = {}
+		if self.commandOrigin:
+			kwargs['origin'] = origin
 		try:
-			self._command(method, value, success=s, failure=triggerFail, ignore=ignore)
+			self._command(method, value, success=s, failure=triggerFail, ignore=ignore, **kwargs)
 		except Exception as error:
 			Application.printException(error)
 			triggerFail(0)
 
 	# pylint: disable=R0201,W0613
 	def _command(self, action, value, success, failure, **__kwargs):
-		"""Reimplement this method to execute an action to this device."""
+		"""
+		Reimplement this method to execute an action to this device. The keyword argument
+		`ignore` is also passed and `origin` if :attr:`commandOrigin` is set.
+		"""
 		failure(0)
 
 	def confirmed(self):
@@ -470,7 +478,7 @@ class Device(object):
 	def setIgnored(self, ignored):
 		self._ignored = ignored
 		if self._manager:
-			self._manager.save()
+			self._manager.save(self)
 
 	def setManager(self, manager):
 		self._manager = manager
@@ -558,7 +566,7 @@ class Device(object):
 				self.valueChangedTime[valueType] = int(time.time())
 		if self._manager and not withinOneSecond:
 			self._manager.sensorValuesUpdated(self, values)
-			self._manager.save()
+			self._manager.save(self)
 
 	def setState(self, state, stateValue=None, ack=None, origin=None,
 		         onlyUpdateIfChanged=False, executedStateValue=None):
@@ -1,16 +1,27 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import json
+import time
 
-from api import IApiCallHandler, apicall
+from api import ApiResponseStream, IApiCallHandler, apicall
 from base import Plugin, implements
 from board import Board
 from .Device import Device
 from .DeviceManager import DeviceManager
+from .SensorHistory import SensorHistory, SensorSeries
 
 class DeviceApiManager(Plugin):
 	implements(IApiCallHandler)
 
+	AGGREGATES = {
+		'min': lambda row: round(row[1], 2),
+		'max': lambda row: round(row[2], 2),
+		'avg': lambda row: round(row[3] / row[4], 2),
+		'count': lambda row: row[4],
+		'last': lambda row: round(row[5], 2),
+	}  #: Aggregate functions for the buckets returned by SensorSeries.aggregate()
+
 	@apicall('devices', 'list')
 	def devicesList(self, supportedMethods=0, **__kwargs):
 		"""
@@ -153,6 +164,7 @@ class DeviceApiManager(Plugin):
 		includeScale = True if includeScale == '1' else False
 		includeLastUpdated = True if includeLastUpdated == '1' else False
 		deviceManager = DeviceManager(self.context)  # pylint: disable=E1121
+		sensorHistory = SensorHistory(self.context)  # pylint: disable=E1121
 		retval = []
 		for device in deviceManager.retrieveDevices():
 			if not device.isSensor():
@@ -184,9 +196,10 @@ class DeviceApiManager(Plugin):
 								'name': Device.sensorTypeIntToStr(sensorType),
 								'value': value['value'],
 								'scale': value['scale'],
-								#'max': 0.0,  # TODO(micke): Implement when we have min/max for sensors
-								#'maxTime': 1442561174.4155,
 							}
+							DeviceApiManager.__addExtremes(
+								valueData, sensorHistory, device, sensorType, value['scale']
+							)
 							if 'lastUpdated' in value:
 								valueData['lastUpdated'] = value['lastUpdated']
 							data.append(valueData)
@@ -206,6 +219,7 @@ class DeviceApiManager(Plugin):
 		Returns information about a specific sensor.
 		"""
 		device = self.__retrieveDevice(id)
+		sensorHistory = SensorHistory(self.context)  # pylint: disable=E1121
 		sensorData = []
 		lastUpdated = 0
 		battery = device.battery()
@@ -215,9 +229,10 @@ class DeviceApiManager(Plugin):
 					'name': Device.sensorTypeIntToStr(sensorType),
 					'value': float(value['value']),
 					'scale': int(value['scale']),
-					#'max': 0.0,  # TODO(micke): Implement when we have min/max for sensors
-					#'maxTime': 1442561174.4155,
 				}
+				DeviceApiManager.__addExtremes(
+					valueData, sensorHistory, device, sensorType, value['scale']
+				)
 				if 'lastUpdated' in value:
 					valueData['lastUpdated'] = value['lastUpdated']
 					if value['lastUpdated'] > lastUpdated:
@@ -236,6 +251,80 @@ class DeviceApiManager(Plugin):
 			sensorInfo['battery'] = battery
 		return sensorInfo
 
+	@apicall('sensor', 'aggregate')
+	def sensorAggregate(self, id, type, scale=0, resolution=None, function='avg', format='json', **kwargs):  # pylint: disable=C0103,W0622
+		"""
+		Returns aggregated values for a sensor value. The values are calculated from stored
+		buckets of 5 minutes, 1 hour or 1 day. The resolution (in seconds) must be a multiple of
+		one of these. The parameters from and to limits the time range. Function can be one or
+		several (comma separated) of min, max, avg, last and count.
+		"""
+		device = self.__retrieveDevice(id)
+		(valueType, scale, series) = self.__sensorSeries(device, type, scale)
+		functions = function.split(',')
+		for func in functions:
+			if func not in DeviceApiManager.AGGREGATES:
+				raise Exception('Unknown aggregate function "%s"' % func)
+		fromTime, toTime = DeviceApiManager.__timeRange(kwargs)
+		# The rows are copied since the buffers are changed by the main thread while streaming
+		with SensorHistory(self.context).lock:  # pylint: disable=E1121
+			if resolution is None:
+				resolution = max(series.resolutionFor(fromTime), SensorSeries.LEVELS[0][0])
+			buckets = list(series.aggregate(int(resolution), fromTime, toTime))
+		rows = (
+			[row[0]] + [DeviceApiManager.AGGREGATES[func](row) for func in functions]
+			for row in buckets
+		)
+		return DeviceApiManager.__stream(format, {
+			'id': device.id(),
+			'name': Device.sensorTypeIntToStr(valueType),
+			'scale': scale,
+			'resolution': int(resolution),
+			'fields': ['ts'] + functions,
+		}, rows)
+
+	@apicall('sensor', 'history')
+	def sensorHistory(self, id, type=None, scale=None, resolution=None, format='json', **kwargs):  # pylint: disable=C0103,W0622
+		"""
+		Returns the locally stored history for a sensor. The parameters from and to limits the time
+		range. If no resolution is given the finest resolution covering the time range is used.
+		Resolution 0 returns the raw values (only the latest values are kept).
+		Format can be json or csv.
+		"""
+		device = self.__retrieveDevice(id)
+		fromTime, toTime = DeviceApiManager.__timeRange(kwargs)
+		sensorHistory = SensorHistory(self.context)  # pylint: disable=E1121
+		history = sensorHistory.sensorHistory(device.id())
+		if type is not None:
+			(valueType, scale, series) = self.__sensorSeries(device, type, scale)
+			history = {(valueType, scale): series}
+		rows = []
+		# The rows are copied since the buffers are changed by the main thread while streaming
+		with sensorHistory.lock:
+			for (valueType, valueScale), series in sorted(history.items()):
+				if resolution is None:
+					seriesResolution = series.resolutionFor(fromTime)
+				else:
+					seriesResolution = int(resolution)
+				if seriesResolution == SensorSeries.RAW:
+					values = [
+						(timestamp, value, value, value, 1, value)
+						for timestamp, value in series.values(fromTime, toTime)
+					]
+				else:
+					values = list(series.aggregate(seriesResolution, fromTime, toTime))
+				rows.append((
+					Device.sensorTypeIntToStr(valueType), valueScale, seriesResolution, values
+				))
+		return DeviceApiManager.__stream(format, {
+			'id': device.id(),
+			'fields': ['name', 'scale', 'resolution', 'ts', 'min', 'max', 'avg', 'count', 'last'],
+		}, (
+			[name, valueScale, seriesResolution] + DeviceApiManager.__bucketRow(row)
+			for name, valueScale, seriesResolution, values in rows
+			for row in values
+		))
+
 	@apicall('sensor', 'setName')
 	def sensorSetName(self, id, name, **kwargs):  # pylint: disable=C0103,W0622
 		"""
@@ -251,6 +340,77 @@ class DeviceApiManager(Plugin):
 			'version': Board.firmwareVersion().strip(),
 		}
 
+	def __sensorSeries(self, device, sensorType, scale):
+		scale = int(scale or 0)
+		for valueType in device.sensorValues():
+			if sensorType in (str(valueType), Device.sensorTypeIntToStr(valueType)):
+				break
+		else:
+			raise Exception('Sensor "%s" has no value of type "%s"' % (device.id(), sensorType))
+		series = SensorHistory(self.context).history(device.id(), valueType, scale)  # pylint: disable=E1121
+		if series is None:
+			raise Exception('No history found for sensor "%s"' % device.id())
+		return (valueType, scale, series)
+
+	@staticmethod
+	def __addExtremes(valueData, sensorHistory, device, valueType, scale):
+		# The history only keeps min and max per bucket, so the time of them (minTime and
+		# maxTime in Telldus Live!) is not known and left out
+		series = sensorHistory.history(device.id(), valueType, int(scale))
+		with sensorHistory.lock:
+			extremes = series.extremes() if series is not None else None
+		if extremes is not None:
+			valueData['min'] = round(extremes[0], 2)
+			valueData['max'] = round(extremes[1], 2)
+
+	@staticmethod
+	def __bucketRow(row):
+		(timestamp, minimum, maximum, total, count, last) = row
+		return [
+			timestamp,
+			round(minimum, 2),
+			round(maximum, 2),
+			round(total / count, 2),
+			count,
+			round(last, 2),
+		]
+
+	@staticmethod
+	def __stream(fmt, header, rows, chunkSize=100):
+		"""Encodes rows of values as compact json or csv, a chunk at a time"""
+		if fmt not in ('json', 'csv'):
+			raise Exception('Unknown format "%s"' % fmt)
+		def chunks(rows):
+			if fmt == 'csv':
+				yield '%s\r\n' % ','.join(header['fields'])
+			else:
+				yield '%s,"data":[' % json.dumps(header, separators=(',', ':'))[:-1]
+			separator = ''
+			chunk = []
+			for row in rows:
+				if fmt == 'csv':
+					chunk.append('%s\r\n' % ','.join(str(x) for x in row))
+				else:
+					chunk.append(separator + json.dumps(row, separators=(',', ':')))
+					separator = ','
+				if len(chunk) >= chunkSize:
+					yield ''.join(chunk)
+					chunk = []
+			if chunk:
+				yield ''.join(chunk)
+			if fmt == 'json':
+				yield ']}'
+		contentType = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/json; charset=utf-8'
+		return ApiResponseStream(chunks(rows), contentType)
+
+	@staticmethod
+	def __timeRange(kwargs):
+		fromTime = kwargs.get('from', None)
+		toTime = kwargs.get('to', None)
+		fromTime = int(fromTime) if fromTime is not None else None
+		toTime = int(toTime) if toTime is not None else int(time.time())
+		return fromTime, toTime
+
 	def __retrieveDevice(self, deviceId):
 		deviceManager = DeviceManager(self.context)  # pylint: disable=E1121
 		device = deviceManager.device(int(deviceId))
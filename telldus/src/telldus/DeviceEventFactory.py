@@ -1,9 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import logging
-from threading import Timer
 
-from base import Plugin, implements, ISignalObserver, slot
+from base import Application, Plugin, implements, ISignalObserver, slot, TimerService
 from events.base import IEventFactory, Action, Condition, Trigger
 from .Device import Device
 from .DeviceManager import DeviceManager, IDeviceChange
@@ -110,8 +109,8 @@ class DeviceActionExecutor(object):
 			self.retries = 0  # No retries for 433
 			i = 1
 			while i < self.repeats:
-				tmr = Timer(3*i, self.execute)
-				tmr.start()
+				# Commands are sent from the main thread, not the shared timer thread
+				TimerService().callLater(3*i, Application().queue, self.execute)
 				i += 1
 		else:
 			self.retries = self.repeats
@@ -129,8 +128,7 @@ class DeviceActionExecutor(object):
 		self.retries -= 1
 		if self.retries > 0:
 			del reason
-			tmr = Timer(60, self.execute)
-			tmr.start()
+			TimerService().callLater(60, Application().queue, self.execute)
 
 class DeviceAction(Action):
 	def __init__(self, manager, **kwargs):
@@ -3,19 +3,27 @@
 import hashlib
 import json
 import logging
+import os
+import threading
 import time
 from tellduslive.base import TelldusLive, LiveMessage, ITelldusLiveObserver
 from base import \
+	Application, \
 	Settings, \
 	ObserverCollection, \
 	IInterface, \
 	ISignalObserver, \
 	Plugin, \
+	SignalManager, \
 	implements, \
 	mainthread, \
 	signal, \
-	slot
+	slot, \
+	TimerService
+from board import Board
+from .DeltaReport import DeltaReport
 from .Device import CachedDevice, DeviceAbortException, Device
+from .EventJournal import EventJournal
 
 __name__ = 'telldus'  # pylint: disable=W0622
 
@@ -50,13 +58,43 @@ class DeviceManager(Plugin):
 
 	public = True
 
+	FLUSH_DELAY = 1.0  #: Seconds to collect changes before the devices are written to storage
+	SENSOR_EVENT_DELAY = 1.0  #: Seconds to collect sensor updates before they are sent to Live!
+	JOURNAL_SAVE_DELAY = 60.0  #: Seconds to collect offline events before the journal is written
+	REPLAY_BATCH = 20  #: Number of offline events sent to Live! at a time
+	REPLAY_INTERVAL = 0.5  #: Seconds between each batch of offline events
+
 	def __init__(self):
 		self.devices = []
+		self.__byId = {}
+		self.__byLocalId = {}
+		self.__byName = {}
+		self.__byType = {}
+		self.__names = {}
 		self.settings = Settings('telldus.devicemanager')
+		self.deviceSettings = Settings('telldus.devicemanager.devices')
 		self.nextId = self.settings.get('nextId', 0)
 		self.live = TelldusLive(self.context)  # pylint: disable=too-many-function-args
 		self.registered = False
+		self.__records = {}
+		self.__dirty = set()
+		self.__allDirty = False
+		self.__savePending = False
+		self.__saveLock = threading.Lock()
+		self.__pendingSensorEvents = {}
+		self.__sensorEventsTimer = None
+		self.sensorUpdates = 0
+		self.sensorEventsSent = 0
+		self.__hashes = {}  # device -> cached parameters and hashes reported to Live!
+		self.__deltaReports = False  # True if the server accepts delta reports
+		self.__devicesReport = DeltaReport()
+		self.__sensorsReport = DeltaReport()
+		self.__journal = EventJournal(os.path.join(Board.configDir(), 'EventJournal.json'))
+		self.__journalTimer = None
+		self.__replayTimer = None
 		self.__load()
+		Application().registerShutdown(self.__flush)
+		Application().registerShutdown(self.__journal.save)
 
 	@mainthread
 	def addDevice(self, device):
@@ -69,14 +107,13 @@ class DeviceManager(Plugin):
 		    :func:`Device.typeString() <telldus.Device.typeString>`
 		"""
 		cachedDevice = None
-		for i, delDevice in enumerate(self.devices):
+		for delDevice in self.__byLocalId.get((device.typeString(), device.localId()), []):
 			# Delete the cached device from loaded devices, since it is replaced
 			# by a confirmed/specialised one
-			if delDevice.localId() == device.localId() \
-			   and device.typeString() == delDevice.typeString() \
-			   and not delDevice.confirmed():
+			if not delDevice.confirmed():
 				cachedDevice = delDevice
-				del self.devices[i]
+				self.devices.remove(delDevice)
+				self.__unindexDevice(delDevice)
 				break
 		self.devices.append(device)
 		device.setManager(self)
@@ -86,17 +123,14 @@ class DeviceManager(Plugin):
 			device.setId(self.nextId)
 		else:  # Transfer parameters from the loaded one
 			device.loadCached(cachedDevice)
-		self.save()
+		self.__indexDevice(device)
+		self.save(device)
 
 		if not cachedDevice:
 			self.__deviceAdded(device)
 			if self.live.registered and device.isDevice():
 				(state, stateValue) = device.state()
-				parameters = json.dumps(
-					device.allParameters(),
-					separators=(',', ':'),
-					sort_keys=True
-				)
+				(parameters, parametersHash) = self.__parameters(device)
 				deviceDict = {
 					'id': device.id(),
 					'uuid': device.uuidAsString(),
@@ -108,7 +142,7 @@ class DeviceManager(Plugin):
 					'protocol': device.protocol(),
 					'model': device.model(),
 					'parameters': parameters,
-					'parametersHash': hashlib.sha1(parameters).hexdigest(),
+					'parametersHash': parametersHash,
 					'transport': device.typeString()
 				}
 				msg = LiveMessage("DeviceAdded")
@@ -124,13 +158,12 @@ class DeviceManager(Plugin):
 		:param int deviceId: The id of the device to be returned.
 		:returns: the device specified by `deviceId` or None of no device was found
 		"""
-		for device in self.devices:
-			if device.id() == deviceId:
-				return device
-		return None
+		return self.__byId.get(deviceId, None)
 
 	def deviceMetadataUpdated(self, device, param):
-		self.save()
+		# The device type in the metadata is also included in the parameters
+		self.__hashes.pop(device, None)
+		self.save(device)
 		if param and param != '':
 			sendParameters = False
 			if param == 'devicetype':
@@ -139,9 +172,11 @@ class DeviceManager(Plugin):
 			self.__sendDeviceParameterReport(device, sendParameters=sendParameters, sendMetadata=True)
 
 	def deviceParamUpdated(self, device, param):
-		self.save()
+		self.__hashes.pop(device, None)
+		self.save(device)
 		self.__deviceUpdated(device, [param])
 		if param == 'name':
+			self.__reindexName(device)
 			if device.isDevice():
 				self.__sendDeviceReport()
 			if device.isSensor:
@@ -151,10 +186,8 @@ class DeviceManager(Plugin):
 			self.__sendDeviceParameterReport(device, sendParameters=True, sendMetadata=False)
 
 	def findByName(self, name):
-		for device in self.devices:
-			if device.name() == name:
-				return device
-		return None
+		devices = self.__byName.get(name, None)
+		return devices[0] if devices else None
 
 	@mainthread
 	def finishedLoading(self, deviceType):
@@ -162,8 +195,8 @@ class DeviceManager(Plugin):
 		Finished loading all devices of this type. If there are any unconfirmed,
 		these should be deleted
 		"""
-		for device in self.devices:
-			if device.typeString() == deviceType and not device.confirmed():
+		for device in self.retrieveDevices(deviceType):
+			if not device.confirmed():
 				self.removeDevice(device.id())
 
 	@mainthread
@@ -176,13 +209,13 @@ class DeviceManager(Plugin):
 		    since removing of a device may be transport specific.
 		"""
 		isDevice = True
-		for i, device in enumerate(self.devices):
-			if device.id() == deviceId:
-				self.__deviceRemoved(deviceId)
-				isDevice = self.devices[i].isDevice()
-				del self.devices[i]
-				break
-		self.save()
+		device = self.__byId.get(deviceId, None)
+		if device is not None:
+			self.__deviceRemoved(deviceId)
+			isDevice = device.isDevice()
+			self.devices.remove(device)
+			self.__unindexDevice(device)
+		self.__scheduleFlush()
 		if self.live.registered and isDevice:
 			msg = LiveMessage("DeviceRemoved")
 			msg.append({'id': deviceId})
@@ -197,12 +230,8 @@ class DeviceManager(Plugin):
 
 		:param str deviceType: The type of devices to remove
 		"""
-		deviceIds = []
-		for device in self.devices:
-			if device.typeString() == deviceType:
-				deviceIds.append(device.id())
-		for deviceId in deviceIds:
-			self.removeDevice(deviceId)
+		for device in self.retrieveDevices(deviceType):
+			self.removeDevice(device.id())
 
 	def retrieveDevices(self, deviceType=None):
 		"""Retrieve a list of devices.
@@ -211,12 +240,9 @@ class DeviceManager(Plugin):
 		:type deviceType: str or None
 		:returns: a list of devices
 		"""
-		lst = []
-		for device in self.devices:
-			if deviceType is not None and device.typeString() != deviceType:
-				continue
-			lst.append(device)
-		return lst
+		if deviceType is None:
+			return list(self.devices)
+		return list(self.__byType.get(deviceType, []))
 
 	@signal
 	def sensorValueUpdated(self, device, valueType, value, scale):
@@ -241,57 +267,55 @@ class DeviceManager(Plugin):
 		if device.isSensor() is False:
 			return
 		shouldUpdateLive = False
+		signals = []
 		for valueElement in values:
 			valueType = valueElement['type']
 			value = valueElement['value']
 			scale = valueElement['scale']
 			self.observers.sensorValueUpdated(device, valueType, value, scale)
-			self.sensorValueUpdated(device, valueType, value, scale)
+			signals.append(('sensorValueUpdated', (device, valueType, value, scale), {}))
 			if valueType not in device.lastUpdatedLive \
 			   or valueType not in device.valueChangedTime \
 			   or device.valueChangedTime[valueType] > device.lastUpdatedLive[valueType] \
 			   or device.lastUpdatedLive[valueType] < (int(time.time()) - 300):
 				shouldUpdateLive = True
 				break
+		# The same as calling sensorValueUpdated() for each value, with one main thread task for
+		# all slots
+		SignalManager(self.context).sendSignals(signals)
 
-		if not self.live.registered or device.ignored() or not shouldUpdateLive:
-			# don't send if not connected to live, sensor is ignored or if
-			# values haven't changed and five minutes hasn't passed yet
+		self.sensorUpdates = self.sensorUpdates + 1
+		if device.ignored():
+			return
+		if self.__sendLater():
+			# Keep the latest values until we are connected again
+			self.__journal.sensorEvent(*self.__sensorEventData(device))
+			self.__scheduleJournalSave()
 			return
+		if not shouldUpdateLive:
+			# don't send if values haven't changed and five minutes hasn't passed yet
+			return
+		# Updates from the same sensor are coalesced and all pending sensors are sent together
+		self.__pendingSensorEvents[device.id()] = device
+		if self.__sensorEventsTimer is None:
+			self.__sensorEventsTimer = TimerService().callLater(
+				DeviceManager.SENSOR_EVENT_DELAY,
+				Application().queue,
+				self.__sendSensorEvents
+			)
 
-		msg = LiveMessage("SensorEvent")
-		# pcc = packageCountChecked - already checked package count,
-		# just accept it server side directly
-		sensor = {
-			'name': device.name(),
-			'protocol': device.protocol(),
-			'model': device.model(),
-			'sensor_id': device.id(),
-			'pcc': 1,
+	def statistics(self):
+		"""
+		:returns: a dict with counters for the sensor updates received and the number of
+		          sensor events sent to Live!
+		"""
+		return {
+			'sensorUpdates': self.sensorUpdates,
+			'sensorEventsSent': self.sensorEventsSent,
+			'journalEvents': len(self.__journal),
+			'journalDropped': self.__journal.dropped,
 		}
 
-		battery = device.battery()
-		if battery is not None:
-			sensor['battery'] = battery
-		msg.append(sensor)
-		# small clarification: valueType etc that is sent in here is only used for sending
-		# information about what have changed on to observers, below is instead all the values
-		# of the sensor picked up and sent in a sensor event-message (the sensor values
-		# have already been updated in other words)
-		values = device.sensorValues()
-		valueList = []
-		for valueType in values:
-			device.lastUpdatedLive[valueType] = int(time.time())
-			for value in values[valueType]:
-				valueList.append({
-					'type': valueType,
-					'lastUp': str(value['lastUpdated']),
-					'value': str(value['value']),
-					'scale': value['scale']
-				})
-		msg.append(valueList)
-		self.live.send(msg)
-
 	def stateUpdated(self, device, ackId=None, origin=None,
 		             executedState=None, executedStateValue=None):
 		if device.isDevice() is False:
@@ -320,9 +344,11 @@ class DeviceManager(Plugin):
 			stateValue = json.dumps(stateValue)
 		else:
 			stateValue = str(stateValue)
-		self.save()
+		self.save(device)
 
-		if not self.live.registered:
+		if self.__sendLater():
+			self.__journal.deviceEvent(device.id(), executedState, str(stateValue), extras)
+			self.__scheduleJournalSave()
 			return
 		msg = LiveMessage("DeviceEvent")
 		msg.append(device.id())
@@ -364,11 +390,7 @@ class DeviceManager(Plugin):
 		extras = msg.argument(1).toNative()
 		if extras and 'origin' in extras:
 			originId = extras['origin']
-		device = None
-		for dev in self.devices:
-			if dev.id() == deviceId:
-				device = dev
-				break
+		device = self.device(deviceId)
 		def success(state, stateValue):
 			if 'ACK' in args:
 				device.setState(state, stateValue, ack=args['ACK'], executedStateValue=value)
@@ -399,20 +421,15 @@ class DeviceManager(Plugin):
 		if args['action'] == 'setName':
 			if 'name' not in args:
 				return
-			for dev in self.devices:
-				if dev.id() != args['device']:
-					continue
-				if isinstance(args['name'], int):
-					dev.setName(str(args['name']))
-				else:
-					dev.setName(args['name'].decode('UTF-8'))
+			dev = self.device(args['device'])
+			if dev is None:
 				return
+			if isinstance(args['name'], int):
+				dev.setName(str(args['name']))
+			else:
+				dev.setName(args['name'].decode('UTF-8'))
 		elif args['action'] in ('setParameter', 'setMetadata'):
-			device = None
-			for dev in self.devices:
-				if dev.id() == args['device']:
-					device = dev
-					break
+			device = self.device(args['device'])
 			if device is None:
 				return
 			name = args.get('name', '')
@@ -447,13 +464,13 @@ class DeviceManager(Plugin):
 			return
 		sensorId = msg.argument(2).toNative()['sensorId']
 		updateType = data['type']
-		for dev in self.devices:
-			if dev.id() == sensorId:
-				if updateType == 'updateignored':
-					value = data['ignored']
-					dev.setIgnored(value)
-				self.__sendSensorChange(sensorId, updateType, value)
-				return
+		dev = self.device(sensorId)
+		if dev is not None:
+			if updateType == 'updateignored':
+				value = data['ignored']
+				dev.setIgnored(value)
+			self.__sendSensorChange(sensorId, updateType, value)
+			return
 		if updateType == 'updateignored' and self.devices:
 			# we don't have this sensor, do something! (can't send sensor change
 			# back (__sendSensorChange), because can't create message when
@@ -464,13 +481,65 @@ class DeviceManager(Plugin):
 			# cleaned up
 			self.__sendSensorReport()
 
-	def liveRegistered(self, __msg, __refreshRequired):
+	def liveDisconnected(self):
+		# Put back the events that were queued but not sent, they are older than the journal
+		events = []
+		for msg in self.live.popUnsent():
+			if msg.name() not in ('deviceevent', 'sensorevent'):
+				continue
+			name = 'DeviceEvent' if msg.name() == 'deviceevent' else 'SensorEvent'
+			events.append((name, [msg.argument(i).toNative() for i in range(msg.count())]))
+		if events:
+			self.__journal.restore(events)
+			self.__scheduleJournalSave()
+
+	def liveRegistered(self, msg, __refreshRequired):
 		self.registered = True
+		# Servers supporting delta reports tells which versions it has
+		deltaReport = msg.get('deltaReport', None) if isinstance(msg, dict) else None
+		self.__deltaReports = isinstance(deltaReport, dict)
+		for name, report in (('devices', self.__devicesReport), ('sensors', self.__sensorsReport)):
+			acknowledged = deltaReport.get(name, None) if self.__deltaReports else None
+			if isinstance(acknowledged, dict):
+				report.acknowledge(acknowledged.get('session'), acknowledged.get('version'))
+			else:
+				report.forget()
 		self.__sendDeviceReport()
 		self.__sendSensorReport()
+		# Send the events that happened while we were disconnected
+		if self.__replayTimer is None:
+			self.__replayJournal()
+
+	@TelldusLive.handler('report-ack')
+	def __handleReportAck(self, msg):
+		data = msg.argument(0).toNative()
+		report = {
+			'devices': self.__devicesReport,
+			'sensors': self.__sensorsReport,
+		}.get(data.get('report') if isinstance(data, dict) else None)
+		if report is not None:
+			report.acknowledge(data.get('session'), data.get('version'))
 
 	def __load(self):
-		self.store = self.settings.get('devices', [])
+		legacy = self.settings['devices']
+		if legacy is not None and (
+			not self.deviceSettings.keys() or
+			self.settings['devicesHash'] != hashlib.sha1(legacy).hexdigest()
+		):
+			# Stored as one list by an older version, also after a firmware rollback. Moved to one
+			# value per device on the first save.
+			self.store = self.settings.get('devices', [])
+			# Records not in the list are removed on the first save
+			self.__records = dict((key, None) for key in self.deviceSettings.keys())
+		else:
+			self.store = []
+			for key in sorted(self.deviceSettings.keys(), key=int):
+				record = self.deviceSettings[key]
+				self.__records[key] = record
+				try:
+					self.store.append(json.loads(record))
+				except ValueError:
+					logging.warning('Could not decode stored device %s', key)
 		for dev in self.store:
 			if 'type' not in dev or 'localId' not in dev:
 				continue  # This should not be possible
@@ -479,6 +548,9 @@ class DeviceManager(Plugin):
 			# considered dead
 			if device.loadCount() < 5:
 				self.devices.append(device)
+				self.__indexDevice(device)
+		# The load count must be written back for all devices
+		self.__allDirty = True
 
 	@signal('deviceAdded')
 	def __deviceAdded(self, device):
@@ -510,42 +582,98 @@ class DeviceManager(Plugin):
 		del origin  # Remove pylint warning
 		self.observers.stateChanged(device, state, stateValue)
 
-	def save(self):
-		data = []
+	def save(self, device=None):
+		"""
+		Schedule the devices to be written to storage. Calls made within
+		:attr:`FLUSH_DELAY` seconds are coalesced into one write, performed later by the main
+		thread.
+
+		:param device: The device that has changed. Only this device will be serialized again,
+		  the stored representation of the other devices is reused. If this is `None` all devices
+		  are serialized.
+		"""
+		with self.__saveLock:
+			if device is None:
+				self.__allDirty = True
+			else:
+				self.__dirty.add(device)
+		self.__scheduleFlush()
+
+	def __scheduleFlush(self):
+		with self.__saveLock:
+			if self.__savePending:
+				return
+			self.__savePending = True
+		if Application().running:
+			TimerService().callLater(DeviceManager.FLUSH_DELAY, Application().queue, self.__flush)
+		else:
+			Application().queue(self.__flush)
+
+	def __flush(self):
+		with self.__saveLock:
+			if not self.__savePending:
+				return
+			self.__savePending = False
+			dirty, self.__dirty = self.__dirty, set()
+			allDirty, self.__allDirty = self.__allDirty, False
+		records = {}
 		for device in self.devices:
-			(state, __stateValue) = device.state()
-			stateValues = device.stateValues()
-			dev = {
-				"id": device.id(),
-				"uuid": device.getOrCreateUUID(),
-				"loadCount": device.loadCount(),
-				"localId": device.localId(),
-				"type": device.typeString(),
-				"name": device.name(),
-				"params": device.params(),
-				"metadata": device.metadata(),
-				"methods": device.methods(),
-				"state": state,
-				"stateValues": stateValues,
-				"ignored": device.ignored(),
-				"isSensor": device.isSensor()
-			}
-			if device.sensorValues():
-				dev['sensorValues'] = device.sensorValues()
-			battery = device.battery()
-			if battery is not None:
-				dev['battery'] = battery
-			if hasattr(device, 'declaredDead') and device.declaredDead:
-				dev['declaredDead'] = device.declaredDead
-			data.append(dev)
-		self.settings['devices'] = data
-		self.settings['nextId'] = self.nextId
+			key = str(device.id())
+			record = self.__records.get(key)
+			if record is None or allDirty or device in dirty:
+				record = json.dumps(self.__serializeDevice(device))
+				if record != self.__records.get(key):
+					# Only changed devices are written
+					self.deviceSettings[key] = record
+			records[key] = record
+		for key in self.__records:
+			if key not in records:
+				del self.deviceSettings[key]
+		if allDirty or set(records) != set(self.__records):
+			# Firmware without the per device records only reads this list. It is kept so a
+			# rollback to such a firmware still finds the devices, and can be dropped once that
+			# rollback is no longer supported. It is only updated when devices are added or
+			# removed, states changed after that are not included.
+			legacy = '[%s]' % ', '.join([records[key] for key in sorted(records, key=int)])
+			self.settings['devices'] = legacy
+			self.settings['devicesHash'] = hashlib.sha1(legacy).hexdigest()
+		self.__records = records
+		if self.settings.get('nextId', 0) != self.nextId:
+			self.settings['nextId'] = self.nextId
+
+	@staticmethod
+	def __serializeDevice(device):
+		(state, __stateValue) = device.state()
+		stateValues = device.stateValues()
+		dev = {
+			"id": device.id(),
+			"uuid": device.getOrCreateUUID(),
+			"loadCount": device.loadCount(),
+			"localId": device.localId(),
+			"type": device.typeString(),
+			"name": device.name(),
+			"params": device.params(),
+			"metadata": device.metadata(),
+			"methods": device.methods(),
+			"state": state,
+			"stateValues": stateValues,
+			"ignored": device.ignored(),
+			"isSensor": device.isSensor()
+		}
+		if device.sensorValues():
+			dev['sensorValues'] = device.sensorValues()
+		battery = device.battery()
+		if battery is not None:
+			dev['battery'] = battery
+		if hasattr(device, 'declaredDead') and device.declaredDead:
+			dev['declaredDead'] = device.declaredDead
+		return dev
 
 	def __sendDeviceReport(self):
 		logging.warning("Send Devices Report")
 		if not self.live.registered:
 			return
-		lst = []
+		items = []
 		for device in self.devices:
 			if not device.isDevice():
 				continue
@@ -554,16 +682,6 @@ class DeviceManager(Plugin):
 				stateValue = json.dumps(stateValue)
 			else:
 				stateValue = str(stateValue)
-			parametersHash = hashlib.sha1(json.dumps(
-				device.allParameters(),
-				separators=(',', ':'),
-				sort_keys=True
-			))
-			metadataHash = hashlib.sha1(json.dumps(
-				device.metadata(),
-				separators=(',', ':'),
-				sort_keys=True
-			))
 			dev = {
 				'id': device.id(),
 				'uuid': device.uuidAsString(),
@@ -574,26 +692,52 @@ class DeviceManager(Plugin):
 				'stateValues': device.stateValues(),
 				'protocol': device.protocol(),
 				'model': device.model(),
-				'parametersHash': parametersHash.hexdigest(),
-				'metadataHash': metadataHash.hexdigest(),
+				'parametersHash': self.__parameters(device)[1],
+				'metadataHash': self.__metadata(device)[1],
 				'transport': device.typeString(),
 				'ignored': device.ignored()
 			}
 			battery = device.battery()
 			if battery is not None:
 				dev['battery'] = battery
-			lst.append(dev)
-		msg = LiveMessage("DevicesReport")
-		msg.append(lst)
+			items.append((device.id(), dev))
+		self.__sendReport("DevicesReport", self.__devicesReport, items)
+
+	def __sendReport(self, name, report, items):
+		"""
+		Send a full report, or only the changes if the server has acknowledged an earlier
+		report.
+
+		:param items: a list of tuples with the id and data for each item
+		"""
+		lst = [data for __itemId, data in items]
+		msg = LiveMessage(name)
+		if not self.__deltaReports:
+			msg.append(lst)
+			self.live.send(msg)
+			return
+		report.update(dict(items))
+		delta = report.delta()
+		header = report.header()
+		if delta is None:
+			msg.append(lst)
+			msg.append(header)
+			self.live.send(msg)
+			return
+		(changed, removed) = delta
+		if not changed and not removed:
+			# The server is up to date
+			return
+		header['base'] = report.acknowledged
+		header['removed'] = removed
+		msg = LiveMessage('%sDelta' % name)
+		msg.append(changed)
+		msg.append(header)
 		self.live.send(msg)
 
 	def __sendSensorChange(self, sensorid, valueType, value):
 		msg = LiveMessage("SensorChange")
-		device = None
-		for dev in self.devices:
-			if dev.id() == sensorid:
-				device = dev
-				break
+		device = self.device(sensorid)
 		if not device:
 			return
 		sensor = {
@@ -606,34 +750,166 @@ class DeviceManager(Plugin):
 		msg.append(value)
 		self.live.send(msg)
 
+	def __hashed(self, device, name, value):
+		hashes = self.__hashes.setdefault(device, {})
+		if name not in hashes:
+			data = json.dumps(value(), separators=(',', ':'), sort_keys=True)
+			hashes[name] = (data, hashlib.sha1(data).hexdigest())
+		return hashes[name]
+
+	def __metadata(self, device):
+		""":returns: a tuple with the metadata as json and its hash. Cached until changed."""
+		return self.__hashed(device, 'metadata', device.metadata)
+
+	def __parameters(self, device):
+		""":returns: a tuple with the parameters as json and its hash. Cached until changed."""
+		return self.__hashed(device, 'parameters', device.allParameters)
+
+	def __indexDevice(self, device):
+		self.__byId[device.id()] = device
+		self.__byLocalId.setdefault((device.typeString(), device.localId()), []).append(device)
+		self.__byType.setdefault(device.typeString(), []).append(device)
+		name = device.name()
+		self.__names[device] = name
+		self.__byName.setdefault(name, []).append(device)
+
+	def __reindexName(self, device):
+		if device not in self.__names:
+			return
+		DeviceManager.__removeFromIndex(self.__byName, self.__names[device], device)
+		name = device.name()
+		self.__names[device] = name
+		# Keep the same order as in self.devices
+		devices = self.__byName.setdefault(name, [])
+		devices.append(device)
+		devices.sort(key=self.devices.index)
+
+	def __unindexDevice(self, device):
+		self.__hashes.pop(device, None)
+		if self.__byId.get(device.id(), None) is device:
+			del self.__byId[device.id()]
+		DeviceManager.__removeFromIndex(self.__byLocalId, (device.typeString(), device.localId()), device)
+		DeviceManager.__removeFromIndex(self.__byType, device.typeString(), device)
+		DeviceManager.__removeFromIndex(self.__byName, self.__names.pop(device, None), device)
+
+	@staticmethod
+	def __removeFromIndex(index, key, device):
+		devices = index.get(key, None)
+		if devices is None or device not in devices:
+			return
+		devices.remove(device)
+		if not devices:
+			del index[key]
+
 	def __sendDeviceParameterReport(self, device, sendParameters, sendMetadata):
 		reply = LiveMessage('device-datareport')
 		data = {
 			'id': device.id()
 		}
 		if sendParameters:
-			parameters = json.dumps(
-				device.allParameters(),
-				separators=(',', ':'),
-				sort_keys=True
-			)
-			data['parameters'] = parameters
-			data['parametersHash'] = hashlib.sha1(parameters).hexdigest()
+			(data['parameters'], data['parametersHash']) = self.__parameters(device)
 		if sendMetadata:
-			metadata = json.dumps(
-				device.metadata(),
-				separators=(',', ':'),
-				sort_keys=True
-			)
-			data['metadata'] = metadata
-			data['metadataHash'] = hashlib.sha1(metadata).hexdigest()
+			(data['metadata'], data['metadataHash']) = self.__metadata(device)
 		reply.append(data)
 		self.live.send(reply)
 
+	def __sendSensorEvents(self):
+		self.__sensorEventsTimer = None
+		devices, self.__pendingSensorEvents = self.__pendingSensorEvents, {}
+		for deviceId in sorted(devices):
+			if self.device(deviceId) is not devices[deviceId]:
+				continue
+			if not self.__sendLater():
+				self.__sendSensorEvent(devices[deviceId])
+			elif not devices[deviceId].ignored():
+				# Disconnected while waiting
+				self.__journal.sensorEvent(*self.__sensorEventData(devices[deviceId]))
+				self.__scheduleJournalSave()
+
+	def __replayJournal(self):
+		self.__replayTimer = None
+		if not self.live.registered:
+			return
+		for name, args in self.__journal.pop(DeviceManager.REPLAY_BATCH):
+			if self.device(args[0] if name == 'DeviceEvent' else args[0]['sensor_id']) is None:
+				continue  # Removed while we were disconnected
+			msg = LiveMessage(name)
+			for arg in args:
+				msg.append(arg)
+			self.live.send(msg)
+		if len(self.__journal):
+			self.__replayTimer = TimerService().callLater(
+				DeviceManager.REPLAY_INTERVAL,
+				Application().queue,
+				self.__replayJournal
+			)
+		self.__scheduleJournalSave()
+
+	def __sendLater(self):
+		# Events are journaled while disconnected and until the journal has been replayed, so
+		# Live! receives them in order
+		return not self.live.registered or len(self.__journal) > 0 or \
+			self.__replayTimer is not None
+
+	def __saveJournal(self):
+		self.__journalTimer = None
+		self.__journal.save()
+
+	def __scheduleJournalSave(self):
+		if self.__journalTimer is not None or not self.__journal.dirty:
+			return
+		self.__journalTimer = TimerService().callLater(
+			DeviceManager.JOURNAL_SAVE_DELAY,
+			Application().queue,
+			self.__saveJournal
+		)
+
+	def __sendSensorEvent(self, device):
+		if device.ignored():
+			return
+		self.sensorEventsSent = self.sensorEventsSent + 1
+		(sensor, valueList) = self.__sensorEventData(device)
+		for valueType in device.sensorValues():
+			device.lastUpdatedLive[valueType] = int(time.time())
+		msg = LiveMessage("SensorEvent")
+		msg.append(sensor)
+		msg.append(valueList)
+		self.live.send(msg)
+
+	def __sensorEventData(self, device):
+		# pcc = packageCountChecked - already checked package count,
+		# just accept it server side directly
+		sensor = {
+			'name': device.name(),
+			'protocol': device.protocol(),
+			'model': device.model(),
+			'sensor_id': device.id(),
+			'pcc': 1,
+		}
+
+		battery = device.battery()
+		if battery is not None:
+			sensor['battery'] = battery
+		# small clarification: valueType etc that is sent in here is only used for sending
+		# information about what have changed on to observers, below is instead all the values
+		# of the sensor picked up and sent in a sensor event-message (the sensor values
+		# have already been updated in other words)
+		values = device.sensorValues()
+		valueList = []
+		for valueType in values:
+			for value in values[valueType]:
+				valueList.append({
+					'type': valueType,
+					'lastUp': str(value['lastUpdated']),
+					'value': str(value['value']),
+					'scale': value['scale']
+				})
+		return (sensor, valueList)
+
 	def __sendSensorReport(self):
 		if not self.live.registered:
 			return
-		lst = []
+		items = []
 		for device in self.devices:
 			if device.isSensor() is False:
 				continue
@@ -668,10 +944,8 @@ class DeviceManager(Plugin):
 					# so don't count this yet (wait for Cassandra only)
 					# device.lastUpdatedLive[valueType] = int(time.time())
 			sensorFrame.append(valueList)
-			lst.append(sensorFrame)
-		msg = LiveMessage("SensorsReport")
-		msg.append(lst)
-		self.live.send(msg)
+			items.append((device.id(), sensorFrame))
+		self.__sendReport("SensorsReport", self.__sensorsReport, items)
 
 	def sensorsUpdated(self):
 		self.__sendSensorReport()
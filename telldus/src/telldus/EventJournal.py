@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+import json
+import logging
+import os
+import threading
+import time
+
+class EventJournal(object):
+	"""
+	Records device and sensor events while Live! is not connected so they can be sent when
+	the connection is back.
+
+	Device events are kept in order. For sensors only the latest value of every value type
+	and scale is kept. When the journal is full the oldest entries are dropped.
+	"""
+
+	MAX_EVENTS = 500  #: Maximum number of entries kept in memory and on disk
+
+	def __init__(self, filename, maxEvents=MAX_EVENTS):
+		self.filename = filename
+		self.maxEvents = maxEvents
+		self.dirty = False
+		self.dropped = 0
+		self.__entries = OrderedDict()  # seq -> (name, data)
+		self.__sensors = {}  # sensorId -> seq
+		self.__seq = 0
+		self.__lock = threading.Lock()
+		self.__load()
+
+	def __len__(self):
+		return len(self.__entries)
+
+	def deviceEvent(self, deviceId, state, stateValue, extras, timestamp=None):
+		"""Record a state change of a device"""
+		extras = dict((key, value) for key, value in extras.items() if key != 'ACK')
+		extras['time'] = int(time.time() if timestamp is None else timestamp)
+		with self.__lock:
+			self.__add('DeviceEvent', [deviceId, state, stateValue, extras])
+
+	def restore(self, events):
+		"""
+		Put back events that were popped, or never sent, before the entries in the journal.
+		For sensors the values already in the journal are newer and are kept.
+
+		:param events: a list with tuples of message name and message arguments, see pop()
+		"""
+		with self.__lock:
+			entries = list(self.__entries.values())
+			self.__entries.clear()
+			self.__sensors.clear()
+			for name, args in list(events) + entries:
+				if name == 'DeviceEvent':
+					(deviceId, state, stateValue, extras) = args
+					extras = dict((key, value) for key, value in extras.items() if key != 'ACK')
+					extras.setdefault('time', int(time.time()))
+					self.__add(name, [deviceId, state, stateValue, extras])
+				elif name == 'SensorEvent':
+					values = args[1].values() if isinstance(args[1], dict) else args[1]
+					self.__sensorEvent(args[0], values)
+
+	def sensorEvent(self, sensor, values):
+		"""
+		Record new values from a sensor. Older values of the same type and scale are replaced.
+
+		:param sensor: a dict describing the sensor, must contain `sensor_id`
+		:param values: a list with dicts containing `type`, `scale`, `value` and `lastUp`
+		"""
+		with self.__lock:
+			self.__sensorEvent(sensor, values)
+
+	def pop(self, count):
+		"""
+		Remove the oldest entries from the journal.
+
+		:returns: a list with up to `count` tuples of message name and message arguments
+		"""
+		events = []
+		with self.__lock:
+			while self.__entries and len(events) < count:
+				__key, (name, args) = self.__entries.popitem(last=False)
+				if name == 'SensorEvent':
+					del self.__sensors[args[0]['sensor_id']]
+					args = [args[0], [args[1][key] for key in sorted(args[1])]]
+				events.append((name, args))
+			if events:
+				self.dirty = True
+		return events
+
+	def save(self):
+		"""Write the journal to disk if it has changed. An empty journal removes the file."""
+		with self.__lock:
+			if not self.dirty:
+				return
+			self.dirty = False
+			entries = list(self.__entries.values())
+		try:
+			if not entries:
+				if os.path.exists(self.filename):
+					os.remove(self.filename)
+				return
+			with open('%s.1' % self.filename, 'w') as fd:
+				json.dump({'version': 1, 'entries': entries}, fd)
+			os.rename('%s.1' % self.filename, self.filename)
+		except Exception as error:
+			logging.error('Could not save event journal: %s', error)
+
+	def __add(self, name, args):
+		self.__seq = self.__seq + 1
+		self.__entries[self.__seq] = (name, args)
+		self.dirty = True
+		while len(self.__entries) > self.maxEvents:
+			__key, (oldName, oldArgs) = self.__entries.popitem(last=False)
+			if oldName == 'SensorEvent':
+				del self.__sensors[oldArgs[0]['sensor_id']]
+			self.dropped = self.dropped + 1
+
+	def __sensorEvent(self, sensor, values):
+		seq = self.__sensors.pop(sensor['sensor_id'], None)
+		merged = {}
+		if seq is not None:
+			merged = self.__entries.pop(seq)[1][1]
+		for value in values:
+			merged['%s:%s' % (value['type'], value['scale'])] = value
+		self.__add('SensorEvent', [sensor, merged])
+		self.__sensors[sensor['sensor_id']] = self.__seq
+
+	def __load(self):
+		if not os.path.isfile(self.filename):
+			return
+		try:
+			with open(self.filename, 'r') as fd:
+				data = json.load(fd)
+			for name, args in data.get('entries', []):
+				name = str(name)
+				self.__add(name, args)
+				if name == 'SensorEvent':
+					self.__sensors[args[0]['sensor_id']] = self.__seq
+			self.dirty = False
+		except Exception as error:
+			logging.error('Could not load event journal: %s', error)
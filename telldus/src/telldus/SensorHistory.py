@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+from array import array
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+from base import \
+	Application, \
+	ISignalObserver, \
+	Plugin, \
+	implements, \
+	slot
+from board import Board
+
+__name__ = 'telldus'  # pylint: disable=W0622
+
+def _toBytes(arr):
+	if hasattr(arr, 'tobytes'):
+		return arr.tobytes()
+	return arr.tostring()
+
+def _fromBytes(typecode, data):
+	arr = array(typecode)
+	if hasattr(arr, 'frombytes'):
+		arr.frombytes(data)
+	else:
+		arr.fromstring(data)
+	return arr
+
+class RingBuffer(object):
+	"""
+	A number of arrays of the same length used as a ring buffer. When the buffer is full
+	the oldest row is overwritten.
+	"""
+	def __init__(self, capacity, typecodes):
+		self.capacity = capacity
+		self.columns = [array(typecode) for typecode in typecodes]
+		self.start = 0
+
+	def __len__(self):
+		return len(self.columns[0])
+
+	def append(self, *values):
+		if len(self) < self.capacity:
+			for column, value in zip(self.columns, values):
+				column.append(value)
+			return
+		for column, value in zip(self.columns, values):
+			column[self.start] = value
+		self.start = (self.start + 1) % self.capacity
+
+	def index(self, i):
+		"""Converts a logical index, 0 being the oldest row, into an index in the arrays"""
+		if i < 0:
+			i = len(self) + i
+		return (self.start + i) % self.capacity
+
+	def rows(self, fromTime=None, toTime=None):
+		"""
+		Iterate over the rows, oldest first. The first column must be a timestamp, sorted
+		in ascending order.
+		"""
+		size = len(self)
+		timestamps = self.columns[0]
+		first = 0
+		if fromTime is not None:
+			# Binary search for the first row within the range
+			low, high = 0, size
+			while low < high:
+				middle = (low + high) // 2
+				if timestamps[self.index(middle)] < fromTime:
+					low = middle + 1
+				else:
+					high = middle
+			first = low
+		for i in range(first, size):
+			index = self.index(i)
+			if toTime is not None and timestamps[index] > toTime:
+				return
+			yield tuple(column[index] for column in self.columns)
+
+	def serialize(self):
+		order = [self.index(i) for i in range(len(self))]
+		return [
+			base64.b64encode(_toBytes(array(column.typecode, [column[i] for i in order])))
+			for column in self.columns
+		]
+
+	def unserialize(self, data):
+		columns = [
+			_fromBytes(column.typecode, base64.b64decode(x))
+			for column, x in zip(self.columns, data)
+		]
+		size = min(len(column) for column in columns)
+		# Keep the newest rows if the capacity has been decreased
+		first = max(0, size - self.capacity)
+		self.columns = [column[first:size] for column in columns]
+		self.start = 0
+
+class SensorSeries(object):
+	"""
+	The history of one sensor value (device, valueType and scale). The latest raw values
+	are kept together with aggregated buckets of five minutes, one hour and one day. Each
+	bucket stores the minimum, maximum, sum, number of values and the last value. The number of
+	values and buckets kept is fixed, so the memory used is bounded.
+	"""
+
+	RAW = 0  #: Resolution for the raw values
+	RAW_SIZE = 288  #: Number of raw values kept
+	LEVELS = (
+		(300, 288),  # 5 minutes, one day
+		(3600, 168),  # 1 hour, one week
+		(86400, 366),  # 1 day, one year
+	)  #: Resolution in seconds and the number of buckets kept for each aggregation level
+
+	RAW_TYPECODES = 'ld'  #: Columns: timestamp, value
+	BUCKET_TYPECODES = 'ldddld'  #: Columns: bucket start, min, max, sum, count, last value
+
+	def __init__(self):
+		self.raw = RingBuffer(SensorSeries.RAW_SIZE, SensorSeries.RAW_TYPECODES)
+		self.levels = [
+			(resolution, RingBuffer(size, SensorSeries.BUCKET_TYPECODES))
+			for resolution, size in SensorSeries.LEVELS
+		]
+
+	def add(self, timestamp, value):
+		"""Add a new value"""
+		timestamp = int(timestamp)
+		self.raw.append(timestamp, value)
+		for resolution, buckets in self.levels:
+			bucket = timestamp - timestamp % resolution
+			if len(buckets):
+				index = buckets.index(-1)
+				start, minimum, maximum, total, count, last = buckets.columns
+				if start[index] == bucket:
+					minimum[index] = min(minimum[index], value)
+					maximum[index] = max(maximum[index], value)
+					total[index] = total[index] + value
+					count[index] = count[index] + 1
+					last[index] = value
+					continue
+				if start[index] > bucket:
+					# Older than the latest bucket (clock changed?). Ignore it.
+					continue
+			buckets.append(bucket, value, value, value, 1, value)
+
+	def aggregate(self, resolution, fromTime=None, toTime=None):
+		"""
+		Iterate over buckets of any resolution being a multiple of one of the stored
+		resolutions. The buckets are merged from the stored buckets, the raw values are not used.
+
+		:returns: tuples of bucket start, min, max, sum, count and last value
+		"""
+		level = None
+		for levelResolution, __buckets in self.levels:
+			if resolution % levelResolution == 0:
+				level = levelResolution
+		if level is None or resolution <= 0:
+			raise ValueError('Unsupported resolution %s' % resolution)
+		if fromTime is not None:
+			fromTime = fromTime - fromTime % resolution
+		rows = self.buckets(level, fromTime, toTime)
+		if level == resolution:
+			return rows
+		return SensorSeries.__merge(rows, resolution)
+
+	def buckets(self, resolution, fromTime=None, toTime=None):
+		"""
+		Iterate over the aggregated buckets for a resolution.
+
+		:returns: tuples of bucket start, min, max, sum, count and last value
+		"""
+		for levelResolution, buckets in self.levels:
+			if levelResolution == resolution:
+				return buckets.rows(fromTime, toTime)
+		raise ValueError('Unknown resolution %s' % resolution)
+
+	def resolutionFor(self, fromTime):
+		"""
+		:returns: the finest resolution still keeping values from `fromTime`
+		"""
+		if fromTime is None:
+			return self.levels[-1][0]
+		rows = [(SensorSeries.RAW, self.raw)] + self.levels
+		for resolution, buffer in rows:
+			if not len(buffer):
+				continue
+			if len(buffer) < buffer.capacity or buffer.columns[0][buffer.index(0)] <= fromTime:
+				return resolution
+		return self.levels[-1][0]
+
+	def extremes(self):
+		"""
+		The lowest and highest value kept in the history, up to one year back.
+
+		:returns: a tuple of min and max, or None if no values have been added
+		"""
+		buckets = self.levels[-1][1]
+		if not len(buckets):
+			return None
+		return (min(buckets.columns[1]), max(buckets.columns[2]))
+
+	def values(self, fromTime=None, toTime=None):
+		"""
+		Iterate over the raw values.
+
+		:returns: tuples of timestamp and value
+		"""
+		return self.raw.rows(fromTime, toTime)
+
+	@staticmethod
+	def __merge(rows, resolution):
+		current = None
+		for (timestamp, minimum, maximum, total, count, last) in rows:
+			bucket = timestamp - timestamp % resolution
+			if current is not None and current[0] == bucket:
+				current = (
+					bucket,
+					min(current[1], minimum),
+					max(current[2], maximum),
+					current[3] + total,
+					current[4] + count,
+					last
+				)
+				continue
+			if current is not None:
+				yield current
+			current = (bucket, minimum, maximum, total, count, last)
+		if current is not None:
+			yield current
+
+	def serialize(self):
+		# The raw values and the five minute buckets changes often and are not stored
+		# to limit the writes to flash
+		return dict(
+			(str(resolution), buckets.serialize())
+			for resolution, buckets in self.levels
+			if resolution in SensorHistory.PERSIST_RESOLUTIONS
+		)
+
+	def unserialize(self, data):
+		for resolution, buckets in self.levels:
+			if str(resolution) in data:
+				buckets.unserialize(data[str(resolution)])
+
+class SensorHistory(Plugin):
+	"""
+	Keeps a local history of all sensor values. The aggregated history is stored to disk
+	every six hours and at shutdown.
+	"""
+	implements(ISignalObserver)
+
+	PERSIST_RESOLUTIONS = (3600, 86400)  #: The resolutions stored to disk
+	FILENAME = 'SensorHistory.json'
+	VERSION = 1  #: Version of the stored file
+
+	def __init__(self):
+		self.series = {}
+		# Held while values are added. Other threads must hold it while reading a series.
+		self.lock = threading.RLock()
+		self.filename = os.path.join(Board.configDir(), SensorHistory.FILENAME)
+		self.__load()
+		Application().registerScheduledTask(self.save, hours=6)
+		Application().registerShutdown(self.save)
+
+	def add(self, deviceId, valueType, scale, value, timestamp=None):
+		"""Add a sensor value to the history"""
+		try:
+			value = float(value)
+		except (TypeError, ValueError):
+			return
+		key = (deviceId, valueType, scale)
+		with self.lock:
+			series = self.series.get(key)
+			if series is None:
+				series = SensorSeries()
+				self.series[key] = series
+			series.add(time.time() if timestamp is None else timestamp, value)
+
+	def history(self, deviceId, valueType, scale):
+		"""
+		:returns: the :class:`SensorSeries` for a sensor value or None if no history exists
+		"""
+		return self.series.get((deviceId, valueType, scale))
+
+	def sensorHistory(self, deviceId):
+		"""
+		:returns: a dict with the :class:`SensorSeries` for all values of a sensor. The keys are
+		          (valueType, scale).
+		"""
+		return dict(
+			((valueType, scale), series)
+			for (seriesId, valueType, scale), series in self.series.items()
+			if seriesId == deviceId
+		)
+
+	def save(self):
+		data = {}
+		with self.lock:
+			for (deviceId, valueType, scale), series in self.series.items():
+				data['%s:%s:%s' % (deviceId, valueType, scale)] = series.serialize()
+		try:
+			with open('%s.1' % self.filename, 'wb') as fd:
+				json.dump({'version': SensorHistory.VERSION, 'series': data}, fd)
+			os.rename('%s.1' % self.filename, self.filename)
+		except Exception as error:
+			logging.error('Could not save sensor history: %s', error)
+
+	@slot('deviceRemoved')
+	def __deviceRemoved(self, deviceId):
+		with self.lock:
+			for key in [x for x in self.series if x[0] == deviceId]:
+				del self.series[key]
+
+	@slot('sensorValueUpdated')
+	def __sensorValueUpdated(self, device, valueType, value, scale):
+		self.add(device.id(), valueType, scale, value)
+
+	def __load(self):
+		if not os.path.isfile(self.filename):
+			return
+		try:
+			with open(self.filename, 'rb') as fd:
+				data = json.load(fd)
+			for key, seriesData in data.get('series', {}).items():
+				(deviceId, valueType, scale) = [int(x) for x in key.split(':')]
+				series = SensorSeries()
+				series.unserialize(seriesData)
+				self.series[(deviceId, valueType, scale)] = series
+		except Exception as error:
+			logging.error('Could not load sensor history: %s', error)
@@ -3,6 +3,7 @@
 from .Device import Device, DeviceAbortException, Sensor, Thermostat
 from .DeviceManager import DeviceManager, IDeviceChange
 from .RoomManager import RoomManager
+from .SensorHistory import SensorHistory, SensorSeries
 try:
 	from .DeviceEventFactory import DeviceEventFactory
 except ImportError:
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..DeltaReport import DeltaReport
+
+class DeltaReportTest(unittest.TestCase):
+	def testDelta(self):
+		report = DeltaReport()
+		report.update({1: {'name': 'a'}, 2: {'name': 'b'}})
+		# Nothing acknowledged
+		self.assertIsNone(report.delta())
+		report.acknowledge(report.session, report.version)
+		self.assertEqual(report.delta(), ([], []))
+		report.update({1: {'name': 'a'}, 2: {'name': 'c'}, 3: {'name': 'd'}})
+		self.assertEqual(sorted(report.delta()[0]), [{'name': 'c'}, {'name': 'd'}])
+		version = report.version
+		report.update({2: {'name': 'c'}, 3: {'name': 'd'}})
+		self.assertEqual(report.delta()[1], [1])
+		report.acknowledge(report.session, version)
+		self.assertEqual(report.delta(), ([], [1]))
+		# Acknowledges may arrive out of order
+		report.acknowledge(report.session, version - 1)
+		self.assertEqual(report.delta(), ([], [1]))
+
+	def testOtherSession(self):
+		report = DeltaReport()
+		report.update({1: {'name': 'a'}})
+		report.acknowledge(report.session, report.version)
+		# The server has a report from before a restart
+		report.acknowledge('other', 1)
+		self.assertIsNone(report.delta())
+		# Versions not reported yet
+		report.acknowledge(report.session, report.version + 1)
+		self.assertIsNone(report.delta())
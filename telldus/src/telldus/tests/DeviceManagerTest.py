@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+import json
+import shutil
+import sys
+import tempfile
+import unittest
+
+from mock import patch
+
+from base import Application, PluginContext
+from board import Board
+from ..Device import CachedDevice, Device
+from ..DeviceManager import DeviceManager
+
+class MemorySettings(dict):
+	def __init__(self, section):
+		super(MemorySettings, self).__init__()
+		del section
+		self.written = []
+
+	def __getitem__(self, name):
+		return dict.get(self, name)
+
+	def __setitem__(self, name, value):
+		self.written.append(name)
+		dict.__setitem__(self, name, value)
+
+	def get(self, name, default):
+		return dict.get(self, name, default)
+
+class TestDevice(Device):
+	def __init__(self, localId, name, deviceType='test'):
+		super(TestDevice, self).__init__()
+		self._localId = localId
+		self._name = name
+		self.deviceType = deviceType
+
+	def localId(self):
+		return self._localId
+
+	def typeString(self):
+		return self.deviceType
+
+class DeviceManagerTest(unittest.TestCase):
+	def setUp(self):
+		Application(run=False)
+		self.directory = tempfile.mkdtemp()
+		module = sys.modules['telldus.DeviceManager']
+		self.patchers = [
+			patch.object(module, 'Settings', MemorySettings),
+			patch.object(module, 'TelldusLive'),
+			patch.object(module, 'TimerService'),
+			patch.object(Board, 'configDir', return_value=self.directory),
+		]
+		for patcher in self.patchers:
+			patcher.start()
+		self.manager = DeviceManager(PluginContext())
+		self.manager.live.registered = False
+		self.flush = self.manager._DeviceManager__flush  # pylint: disable=protected-access
+
+	def tearDown(self):
+		for patcher in reversed(self.patchers):
+			patcher.stop()
+		shutil.rmtree(self.directory)
+
+	def stored(self):
+		deviceSettings = self.manager.deviceSettings
+		return dict((key, json.loads(deviceSettings[key])['name']) for key in deviceSettings)
+
+	def testSaveOne(self):
+		devices = [TestDevice(i, 'Device %i' % i) for i in range(3)]
+		for device in devices:
+			self.manager.addDevice(device)
+		self.flush()
+		self.assertEqual(self.stored(), {'1': 'Device 0', '2': 'Device 1', '3': 'Device 2'})
+		deviceSettings = self.manager.deviceSettings
+		del deviceSettings.written[:]
+		# Changed without telling the manager, not written unless all devices are saved
+		devices[0]._name = 'Changed'  # pylint: disable=protected-access
+		devices[1].setName('Renamed')
+		self.flush()
+		self.assertEqual(deviceSettings.written, ['2'])
+		self.assertEqual(self.stored()['1'], 'Device 0')
+		# Only changed records are written, also when all devices are saved
+		del deviceSettings.written[:]
+		self.manager.save()
+		self.flush()
+		self.assertEqual(deviceSettings.written, ['1'])
+		self.assertEqual(self.stored(), {'1': 'Changed', '2': 'Renamed', '3': 'Device 2'})
+		# Removed devices are removed from the storage
+		self.manager.removeDevice(3)
+		self.flush()
+		self.assertEqual(sorted(self.stored()), ['1', '2'])
+
+	def testIndexes(self):
+		first = TestDevice(1, 'Lamp')
+		second = TestDevice(2, 'Lamp')
+		other = TestDevice(1, 'Heater', deviceType='other')
+		for device in (first, second, other):
+			self.manager.addDevice(device)
+		self.assertIs(self.manager.device(second.id()), second)
+		self.assertIs(self.manager.findByName('Lamp'), first)
+		self.assertEqual(self.manager.retrieveDevices('test'), [first, second])
+		self.assertEqual(self.manager.retrieveDevices('other'), [other])
+		# Renamed devices are found by the new name only
+		first.setName('Ceiling')
+		self.assertIs(self.manager.findByName('Lamp'), second)
+		self.assertIs(self.manager.findByName('Ceiling'), first)
+		# The first added device is returned when several have the same name
+		second.setName('Ceiling')
+		self.assertIsNone(self.manager.findByName('Lamp'))
+		self.assertIs(self.manager.findByName('Ceiling'), first)
+		self.manager.removeDevice(first.id())
+		self.assertIsNone(self.manager.device(first.id()))
+		self.assertIs(self.manager.findByName('Ceiling'), second)
+		self.assertEqual(self.manager.retrieveDevices('test'), [second])
+		self.manager.removeDevicesByType('test')
+		self.assertIsNone(self.manager.findByName('Ceiling'))
+		self.assertEqual(self.manager.retrieveDevices('test'), [])
+		self.assertEqual(self.manager.retrieveDevices(), [other])
+		self.assertIs(self.manager.findByName('Heater'), other)
+
+	def testReplaceCached(self):
+		cached = CachedDevice({'localId': 1, 'type': 'test', 'name': 'Cached'})
+		self.manager.addDevice(cached)
+		device = TestDevice(1, None)
+		self.manager.addDevice(device)
+		self.assertEqual(device.id(), cached.id())
+		self.assertIs(self.manager.device(device.id()), device)
+		self.assertIs(self.manager.findByName('Cached'), device)
+		self.assertEqual(self.manager.retrieveDevices('test'), [device])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ..EventJournal import EventJournal
+
+class EventJournalTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.filename = os.path.join(self.directory, 'EventJournal.json')
+
+	def tearDown(self):
+		shutil.rmtree(self.directory)
+
+	@staticmethod
+	def sensorValue(valueType, value, lastUp):
+		return {'type': valueType, 'scale': 0, 'value': str(value), 'lastUp': str(lastUp)}
+
+	def testOrderAndDeduplication(self):
+		journal = EventJournal(self.filename)
+		journal.deviceEvent(1, 1, '', {'ACK': 5, 'origin': 'Incoming signal'}, timestamp=100)
+		journal.sensorEvent(
+			{'sensor_id': 2},
+			[self.sensorValue(1, 20, 101), self.sensorValue(2, 40, 101)]
+		)
+		journal.deviceEvent(1, 2, '', {'origin': 'Incoming signal'}, timestamp=102)
+		journal.sensorEvent({'sensor_id': 2}, [self.sensorValue(1, 21, 103)])
+		self.assertEqual(len(journal), 3)
+		events = journal.pop(10)
+		self.assertEqual([name for name, __args in events], ['DeviceEvent', 'DeviceEvent', 'SensorEvent'])
+		# The ACK belongs to the old connection
+		self.assertEqual(events[0][1], [1, 1, '', {'origin': 'Incoming signal', 'time': 100}])
+		self.assertEqual(events[2][1][1], [self.sensorValue(1, 21, 103), self.sensorValue(2, 40, 101)])
+		self.assertEqual(journal.pop(10), [])
+
+	def testRestore(self):
+		journal = EventJournal(self.filename)
+		journal.deviceEvent(1, 2, '', {}, timestamp=102)
+		journal.sensorEvent({'sensor_id': 2}, [self.sensorValue(1, 21, 103)])
+		# Events that were not sent before the connection was lost are older
+		journal.restore([
+			('DeviceEvent', [1, 1, '', {'ACK': 5, 'time': 100}]),
+			('SensorEvent', [{'sensor_id': 2}, [self.sensorValue(1, 20, 101), self.sensorValue(2, 40, 101)]]),
+		])
+		events = journal.pop(10)
+		self.assertEqual([args[1] for __name, args in events[:2]], [1, 2])
+		self.assertEqual(events[0][1][3], {'time': 100})
+		self.assertEqual(events[2][1][1], [self.sensorValue(1, 21, 103), self.sensorValue(2, 40, 101)])
+		self.assertEqual(len(events), 3)
+
+	def testBounded(self):
+		journal = EventJournal(self.filename, maxEvents=10)
+		for i in range(25):
+			journal.deviceEvent(1, 1, str(i), {})
+			journal.sensorEvent({'sensor_id': 2}, [self.sensorValue(1, i, i)])
+		self.assertEqual(len(journal), 10)
+		self.assertEqual(journal.dropped, 16)
+		events = journal.pop(20)
+		self.assertEqual(events[0][1][2], '16')
+		self.assertEqual(events[-1][1][1], [self.sensorValue(1, 24, 24)])
+
+	def testPersist(self):
+		journal = EventJournal(self.filename)
+		journal.deviceEvent(1, 1, '', {})
+		journal.sensorEvent({'sensor_id': 2}, [self.sensorValue(1, 20, 101)])
+		journal.save()
+		self.assertFalse(journal.dirty)
+		loaded = EventJournal(self.filename, maxEvents=1)
+		loaded.sensorEvent({'sensor_id': 2}, [self.sensorValue(2, 40, 102)])
+		self.assertEqual(len(loaded), 1)
+		self.assertEqual(loaded.dropped, 1)
+		self.assertEqual(
+			loaded.pop(1)[0][1][1],
+			[self.sensorValue(1, 20, 101), self.sensorValue(2, 40, 102)]
+		)
+		loaded.save()
+		self.assertFalse(os.path.exists(self.filename))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from ..SensorHistory import SensorSeries
+
+# run this with python -m unittest telldus.tests in the tellstick.sh-shell
+
+class SensorHistoryTest(unittest.TestCase):
+	def setUp(self):
+		self.series = SensorSeries()
+		self.start = 1500000000 - 1500000000 % 86400
+
+	def testRollup(self):
+		# Two values every five minutes during two days
+		for i in range(2*288):
+			self.series.add(self.start + i*300, float(i % 288))
+			self.series.add(self.start + i*300 + 60, float(i % 288) + 1)
+		values = list(self.series.values())
+		self.assertEqual(len(values), SensorSeries.RAW_SIZE)
+		self.assertEqual(values[-1], (self.start + 575*300 + 60, 288.0))
+		days = list(self.series.buckets(86400))
+		self.assertEqual(len(days), 2)
+		self.assertEqual(days[0], (self.start, 0.0, 288.0, 288*288.0, 2*288, 288.0))
+		hours = list(self.series.buckets(3600, self.start + 3600, self.start + 7200))
+		self.assertEqual(len(hours), 2)
+		(timestamp, minimum, maximum, total, count, last) = hours[0]
+		self.assertEqual(timestamp, self.start + 3600)
+		self.assertEqual((minimum, maximum, count, last), (12.0, 24.0, 24, 24.0))
+		self.assertEqual(total / count, 18.0)
+		self.assertEqual(len(list(self.series.buckets(300))), 288)
+
+	def testResolution(self):
+		# One value every minute during ten days
+		for i in range(10*1440):
+			self.series.add(self.start + i*60, 1.0)
+		end = self.start + 10*86400
+		self.assertEqual(self.series.resolutionFor(end - 3600), SensorSeries.RAW)
+		self.assertEqual(self.series.resolutionFor(end - 86400/2), 300)
+		self.assertEqual(self.series.resolutionFor(end - 3*86400), 3600)
+		self.assertEqual(self.series.resolutionFor(self.start), 86400)
+
+	def testSerialize(self):
+		for i in range(100):
+			self.series.add(self.start + i*3600, float(i))
+		series = SensorSeries()
+		series.unserialize(self.series.serialize())
+		self.assertEqual(list(series.buckets(3600)), list(self.series.buckets(3600)))
+		self.assertEqual(list(series.buckets(86400)), list(self.series.buckets(86400)))
+		self.assertEqual(list(series.values()), [])
+
+	def testPrecision(self):
+		self.series.add(self.start, 21.3)
+		self.series.add(self.start + 60, 1500000.7)
+		self.assertEqual(list(self.series.values())[0][1], 21.3)
+		self.assertEqual(list(self.series.buckets(3600)), [
+			(self.start, 21.3, 1500000.7, 21.3 + 1500000.7, 2, 1500000.7),
+		])
+
+	def testExtremes(self):
+		self.assertEqual(self.series.extremes(), None)
+		for i in range(3*24):
+			self.series.add(self.start + i*3600, float(i % 24) - 5)
+		self.assertEqual(self.series.extremes(), (-5.0, 18.0))
+
+	def testAggregate(self):
+		for i in range(24):
+			self.series.add(self.start + i*3600, float(i))
+		buckets = list(self.series.aggregate(6*3600))
+		self.assertEqual(len(buckets), 4)
+		self.assertEqual(buckets[1], (self.start + 6*3600, 6.0, 11.0, 51.0, 6, 11.0))
+		buckets = list(self.series.aggregate(6*3600, self.start + 13*3600, self.start + 20*3600))
+		self.assertEqual([x[0] for x in buckets], [self.start + 12*3600, self.start + 18*3600])
+		self.assertRaises(ValueError, self.series.aggregate, 1000)
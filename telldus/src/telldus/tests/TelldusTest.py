@@ -18,9 +18,33 @@ class MockDeviceManager(object):
 	def sensorValuesUpdated(self, __device, values):
 		self.values = values
 
-	def save(self):
+	def save(self, __device=None):
 		pass
 
+class LegacyDevice(Device):
+	def __init__(self):
+		super(LegacyDevice, self).__init__()
+		self.actions = []
+
+	def _command(self, action, value, success, failure, ignore):
+		self.actions.append(action)
+
+class OriginDevice(LegacyDevice):
+	commandOrigin = True
+
+	def _command(self, action, value, success, failure, origin=None, **__kwargs):
+		self.actions.append((action, origin))
+
+def wrapped(func):
+	def wrapper(*args, **kwargs):
+		return func(*args, **kwargs)
+	return wrapper
+
+class DecoratedDevice(LegacyDevice):
+	@wrapped
+	def _command(self, action, value, success, failure, ignore):
+		self.actions.append(action)
+
 class TelldusTest(unittest.TestCase):
 	def setUp(self):
 		self.device = Device()
@@ -29,6 +53,19 @@ class TelldusTest(unittest.TestCase):
 	def tearDown(self):
 		pass
 
+	def testCommandOrigin(self):
+		# Plugins implementing _command() without origin still works
+		device = LegacyDevice()
+		device.command(Device.TURNON, origin='Scene test')
+		self.assertEqual(device.actions, [Device.TURNON])
+		device = OriginDevice()
+		device.command(Device.TURNON, origin='Scene test')
+		self.assertEqual(device.actions, [(Device.TURNON, 'Scene test')])
+		# A wrapper taking **kwargs does not mean the wrapped method takes origin
+		device = DecoratedDevice()
+		device.command(Device.TURNON, origin='Scene test')
+		self.assertEqual(device.actions, [Device.TURNON])
+
 	def testSensorMessage(self):
 		values = [{'scale': 0, 'type': 1, 'value': '21.3'}, {'scale': 0, 'type': 2, 'value': '46'}]
 		self.device.setSensorValues(values)
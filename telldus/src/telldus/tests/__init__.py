@@ -1,3 +1,7 @@
 # -*- coding: utf-8 -*-
 
+from .DeltaReportTest import DeltaReportTest
+from .DeviceManagerTest import DeviceManagerTest
+from .EventJournalTest import EventJournalTest
+from .SensorHistoryTest import SensorHistoryTest
 from .TelldusTest import TelldusTest
@@ -3,5 +3,13 @@
 # Enable once fixed that the server is not started when running. See #199
 # from scheduler.base.tests import SchedulerTest
 
-from telldus.tests import TelldusTest
+from base.tests import ApplicationTest, PluginTest, SettingsJournalTest, SignalManagerTest
+from rf433.tests import \
+	CommandMatcherTest, CommandQueueTest, LineBufferTest, PacketFilterTest, ProtocolTest, RF433Test, \
+	SensorDecoderTest
+from telldus.tests import \
+	DeltaReportTest, DeviceManagerTest, EventJournalTest, SensorHistoryTest, TelldusTest
+from tellduslive.tests import \
+	ConfigBackupTest, FrameDecoderTest, LiveMessageTest, SendQueueTest, ServerConnectionTest, \
+	TelldusLiveTest
 from upgrade.tests import HotFixManagerTest
@@ -112,6 +112,17 @@ class WebResponseLocalFile(WebResponse):
 	def output(self, response):
 		response.headers['Content-Type'] = self.contentType
 
+class WebResponseStream(WebResponse):
+	"""Streams the response from an iterator of strings without buffering all of it"""
+	def __init__(self, data, contentType, statusCode=200):
+		super(WebResponseStream, self).__init__(statusCode)
+		self.data = data
+		self.contentType = contentType
+
+	def output(self, response):
+		response.headers['Content-Type'] = self.contentType
+		response.stream = True
+
 class WebResponseRedirect(object):
 	def __init__(self, url):
 		self.url = url
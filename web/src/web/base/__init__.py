@@ -1,3 +1,3 @@
 # -*- coding: utf-8 -*-
 
-from .Server import Server, IWebRequestHandler, IWebRequestAuthenticationHandler, WebResponseHtml, WebResponseLocalFile, WebResponseJson, WebResponseRedirect
+from .Server import Server, IWebRequestHandler, IWebRequestAuthenticationHandler, WebResponse, WebResponseHtml, WebResponseLocalFile, WebResponseJson, WebResponseRedirect, WebResponseStream